@@ -1,14 +1,168 @@
+import argparse
 import tkinter as tk
 import tkinter.ttk as ttk
 import calendar
 import datetime
+import functools
+import heapq
+import os
+import time
 import tkinter.filedialog as filedialog
-import csv
+import queue
 import tkinter.messagebox as mb
-from dateutil.relativedelta import relativedelta
-import uuid
-import json
-import winsound
+from reminder_core import bulk
+from reminder_core.csv_io import BackgroundJob, read_reminder_chunks, write_reminders
+from reminder_core.firing import FiringLog
+from reminder_core.metrics import Metrics
+from reminder_core.model import make_reminder, parse_tags
+from reminder_core.notify import (LogFileBackend, NotificationDispatcher, SoundBackend, StdoutBackend,
+                                  WebhookBackend)
+from reminder_core.recurrence import ONCE, next_occurrence, parse_date
+from reminder_core.scheduler import ReminderScheduler
+from reminder_core.storage import open_storage
+from reminder_core.tag_index import format_query, parse_query
+
+# Storage backend: "json" keeps everything in memory and persists to REMINDERS_FILE,
+# "sqlite" queries REMINDERS_DB on demand (and migrates REMINDERS_FILE into it once),
+# "sharded" keeps one file per month in REMINDERS_DIR and loads months as they are viewed
+STORAGE_BACKEND = "json"
+REMINDERS_FILE = "reminders.json"
+REMINDERS_DB = "reminders.db"
+REMINDERS_DIR = "reminders.d"
+# Append changes to a write-ahead journal instead of rewriting REMINDERS_FILE on every change
+USE_JOURNAL = True
+# REMINDERS_FILE format: "json", "binary" (compact, faster to load and save) or
+# "auto" to keep whichever format the file is in (File > Convert Storage Format)
+SNAPSHOT_FORMAT = "auto"
+STORAGE_SYNC_MS = 1000
+# Edits are saved once they pause for SAVE_DELAY_MS, so a burst of them costs one save;
+# exporting and closing the app save straight away
+SAVE_DELAY_MS = 500
+# How often to look for reminders saved by other instances or scripts
+STORAGE_WATCH_MS = 2000
+# How far ahead the scheduler loads reminders; it is refilled every day
+SCHEDULER_HORIZON_DAYS = 7
+# CSV import/export runs in a worker thread; the UI applies one chunk per poll
+CSV_CHUNK_SIZE = 1000
+TRANSFER_POLL_MS = 20
+# Search runs once typing pauses and lists results a page at a time
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_PAGE_SIZE = 100
+# Most used tags listed under the search box, counted over the results while a search is active
+TAG_FACET_LIMIT = 12
+# Rows shown before a "Show more" button in the reminder pane and today's sidebar
+REMINDER_PAGE_SIZE = 50
+SIDEBAR_PAGE_SIZE = 20
+# The sidebar agenda lists the occurrences of the next AGENDA_DAYS days, today included
+AGENDA_DAYS = 7
+AGENDA_PAGE_SIZE = 20
+
+# Upper bound on how long the reminder timer sleeps, so clock changes are picked up
+MAX_REMINDER_SLEEP_MS = 60 * 60 * 1000
+# Occurrences that fired, so restarts neither repeat nor skip them. Reminders missed while the
+# app was closed or the machine slept fire late, unless they are older than the catch-up window
+FIRED_FILE = "reminders.fired.json"
+CATCH_UP_HOURS = 12
+# When nothing fired, the last checked instant is saved only once it moved this far
+CATCH_UP_GRANULARITY_MINUTES = 30
+# Notifications go to stdout, a beep on Windows, and optionally a log file and a local
+# webhook (http://host:port/path or unix:///path/to/socket)
+NOTIFY_LOG_FILE = None
+NOTIFY_WEBHOOK_URL = None
+# Reminders due within NOTIFY_COALESCE_S of each other make one alert, alerts are NOTIFY_MIN_INTERVAL_S apart
+NOTIFY_COALESCE_S = 0.5
+NOTIFY_MIN_INTERVAL_S = 2.0
+
+# Opt-in instrumentation, also enabled by REMINDER_METRICS=1 or --metrics: call counts and latency
+# histograms of the methods below plus store and widget sizes, shown in a Debug menu. Stats are
+# written to METRICS_FILE on exit, as JSON if it ends in .json and Prometheus text otherwise
+METRICS_ENABLED = os.environ.get("REMINDER_METRICS", "") not in ("", "0")
+METRICS_FILE = os.environ.get("REMINDER_METRICS_FILE") or None
+INSTRUMENTED_METHODS = (
+    "check_reminders", "update_search_results", "update_calendar", "display_reminders", "update_sidebar",
+    "update_today", "update_agenda", "update_tag_facets",
+    "save_reminders", "load_reminders", "refresh_scheduler", "watch_storage",
+    "import_reminders", "export_reminders", "apply_import_chunk", "apply_bulk_edit", "refresh_views",
+)
+
+CALENDAR_HEADER = "Mo Tu We Th Fr Sa Su"
+
+
+@functools.lru_cache(maxsize=64)
+def month_layout(year, month):
+    """Lays out a month for the calendar grid, one 3-character cell per day.
+
+    Returns (text, day_ranges, cells, weekday_ranges, weekend_ranges).
+    day_ranges[d - 1] is the (start, end) Text index pair of day d, cells maps
+    (line, column // 3) to the day shown there, and the last two are flat lists of
+    index pairs that can be passed to a single tag_add call.
+    """
+    lines = [CALENDAR_HEADER]
+    day_ranges = []
+    cells = {}
+    weekday_ranges = ["1.0", f"1.{len(CALENDAR_HEADER)}"]
+    weekend_ranges = []
+    for line, week in enumerate(calendar.monthcalendar(year, month), start=2):
+        lines.append(" ".join(f"{day:2d}" if day else "  " for day in week))
+        for column, day in enumerate(week):
+            if day:
+                cell = (f"{line}.{column * 3}", f"{line}.{column * 3 + 2}")
+                day_ranges.append(cell)
+                cells[(line, column)] = day
+                (weekend_ranges if column >= 5 else weekday_ranges).extend(cell)
+    return "\n".join(lines), day_ranges, cells, weekday_ranges, weekend_ranges
+
+
+class RowPool:
+    """Shows one row of widgets per key in a frame and recycles them across updates.
+
+    make_row(parent) builds a row, a dict whose "frame" gets packed, and
+    fill_row(row, item) shows an item in it. update() keeps the row of every key
+    still listed, refills a row only when its item changed, repacks only from the
+    first key whose position moved, and hides rows that are no longer listed so
+    the next new key reuses them instead of creating widgets.
+    """
+
+    def __init__(self, parent, make_row, fill_row, **pack_options):
+        self.parent = parent
+        self.make_row = make_row
+        self.fill_row = fill_row
+        self.pack_options = pack_options
+        self.rows = {}  # key -> row
+        self.items = {}  # key -> item shown in the row
+        self.order = []  # keys in packing order
+        self.free = []  # hidden rows ready for reuse
+
+    def update(self, keyed_items):
+        keys = [key for key, _ in keyed_items]
+        listed = set(keys)
+        for key in self.order:
+            if key not in listed:
+                row = self.rows.pop(key)
+                del self.items[key]
+                row["frame"].pack_forget()
+                self.free.append(row)
+
+        for key, item in keyed_items:
+            row = self.rows.get(key)
+            if row is None:
+                row = self.free.pop() if self.free else self.make_row(self.parent)
+                self.rows[key] = row
+            elif self.items[key] == item:
+                continue
+            self.fill_row(row, item)
+            self.items[key] = item
+
+        # pack() appends, so everything after the common prefix is repacked in order
+        same = 0
+        while same < min(len(keys), len(self.order)) and keys[same] == self.order[same]:
+            same += 1
+        for key in self.order[same:]:
+            if key in self.rows:
+                self.rows[key]["frame"].pack_forget()
+        for key in keys[same:]:
+            self.rows[key]["frame"].pack(**self.pack_options)
+        self.order = keys
 
 class CalendarApp:
     def __init__(self, root):
@@ -36,14 +190,29 @@ class CalendarApp:
         self.calendar_frame.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
         self.reminder_frame.grid(row=0, column=2, sticky="nsew", padx=5, pady=5)
 
-        self.calendar_grid = None  # Placeholder for future calendar grid widget
-
         self.year = 2024
         self.month = 7
-        self.reminders = {}
         self.current_date = None
+        self.scheduler = ReminderScheduler()
+        self._scheduler_refresh_date = None
+        self._reminder_timer = None
+        self.transfer_job = None
+        self._search_timer = None
+        # Views to redraw on the next idle pass, and the pending pass and write-behind save
+        self._dirty_views = set()
+        self._refresh_job = None
+        self._save_job = None
+        self.search_results = []
+        self.search_result_dates = []  # date of every row shown, indexed by row id
+        # Instrumented before any callback binds the methods; when disabled nothing is wrapped
+        self.metrics = self.create_metrics() if METRICS_ENABLED else None
+        self.storage = open_storage(STORAGE_BACKEND, REMINDERS_FILE, REMINDERS_DB, use_journal=USE_JOURNAL,
+                                    shard_dir=REMINDERS_DIR, snapshot_format=SNAPSHOT_FORMAT)
+        self.firing_log = FiringLog(FIRED_FILE, datetime.timedelta(hours=CATCH_UP_HOURS),
+                                    datetime.timedelta(minutes=CATCH_UP_GRANULARITY_MINUTES))
 
         self.load_reminders()  # Load reminders from file on startup
+        self.refresh_scheduler()
 
         self.create_sidebar_widgets()
         self.create_reminder_widgets()
@@ -52,7 +221,11 @@ class CalendarApp:
         self.create_menu()
 
         self.update_sidebar()
+        self.notifier = self.create_notifier()
         self.check_reminders()
+        self.sync_storage()
+        self.root.after(STORAGE_WATCH_MS, self.watch_storage)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_themes(self):
         style = ttk.Style()
@@ -135,45 +308,164 @@ class CalendarApp:
         # Search bar
         ttk.Label(self.sidebar_frame, text="🔍 Search Reminders", font=('Arial', 12, 'bold')).pack(pady=(0, 5))
         self.search_var = tk.StringVar()
-        self.search_var.trace_add('write', lambda *args: self.update_search_results())
+        self.search_var.trace_add('write', lambda *args: self.schedule_search())
         search_entry = ttk.Entry(self.sidebar_frame, textvariable=self.search_var)
         search_entry.pack(fill=tk.X, padx=2, pady=(0, 8))
 
-        # Search results frame (scrollable)
-        self.search_results_canvas = tk.Canvas(self.sidebar_frame, height=120, borderwidth=0, highlightthickness=0)
-        self.search_results_frame = ttk.Frame(self.search_results_canvas)
-        self.search_results_scrollbar = ttk.Scrollbar(self.sidebar_frame, orient="vertical", command=self.search_results_canvas.yview)
-        self.search_results_canvas.configure(yscrollcommand=self.search_results_scrollbar.set)
-        self.search_results_canvas.pack(fill=tk.X, padx=2, pady=(0, 8), side=tk.TOP)
-        self.search_results_scrollbar.pack(fill=tk.Y, side=tk.RIGHT, padx=(0, 2))
-        self.search_results_canvas.create_window((0, 0), window=self.search_results_frame, anchor="nw")
-        self.search_results_frame.bind("<Configure>", lambda e: self.search_results_canvas.configure(scrollregion=self.search_results_canvas.bbox("all")))
+        # Search results list; a Treeview only draws the rows that are visible
+        results_frame = ttk.Frame(self.sidebar_frame)
+        results_frame.pack(fill=tk.X, padx=2, side=tk.TOP)
+        self.search_results_tree = ttk.Treeview(results_frame, columns=("when", "title"), show="headings", height=6, selectmode="browse")
+        self.search_results_tree.heading("when", text="When")
+        self.search_results_tree.heading("title", text="Title")
+        self.search_results_tree.column("when", width=110, stretch=False)
+        self.search_results_tree.column("title", width=120)
+        self.search_results_scrollbar = ttk.Scrollbar(results_frame, orient="vertical", command=self.search_results_tree.yview)
+        self.search_results_tree.configure(yscrollcommand=self.search_results_scrollbar.set)
+        self.search_results_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_results_tree.bind("<<TreeviewSelect>>", lambda e: self.search_result_selected())
+
+        status_frame = ttk.Frame(self.sidebar_frame)
+        status_frame.pack(fill=tk.X, padx=2, pady=(2, 8))
+        self.search_status_label = ttk.Label(status_frame, text="", font=('Arial', 9, 'italic'))
+        self.search_status_label.pack(side=tk.LEFT)
+        self.search_more_button = ttk.Button(status_frame, text="More", width=6, command=self.show_more_search_results)
+        self.bulk_edit_button = ttk.Button(status_frame, text="Bulk...", width=6, command=self.open_bulk_edit)
+
+        # Tag facets: click to require a tag, right-click to exclude it, again to drop the filter
+        ttk.Label(self.sidebar_frame, text="🏷️ Tags", font=('Arial', 12, 'bold')).pack(pady=(0, 5))
+        facets_frame = ttk.Frame(self.sidebar_frame)
+        facets_frame.pack(fill=tk.X, padx=2, pady=(0, 8))
+        self.tag_facets = RowPool(facets_frame, self.make_tag_facet, self.fill_tag_facet, anchor="w", fill=tk.X)
+        self.tag_facets_empty_label = ttk.Label(facets_frame, text="No tags yet.", font=('Arial', 10, 'italic'))
 
         # Today's reminders section
         ttk.Label(self.sidebar_frame, text="⏰ Today's Reminders", font=('Arial', 14, 'bold')).pack(pady=(0, 10))
         self.today_reminders_frame = ttk.Frame(self.sidebar_frame)
         self.today_reminders_frame.pack(fill=tk.BOTH, expand=True)
+        today_rows_frame = ttk.Frame(self.today_reminders_frame)
+        today_rows_frame.pack(fill=tk.X)
+        self.today_rows = RowPool(today_rows_frame, self.make_today_row, self.fill_today_row, anchor="w", pady=4, fill=tk.X)
+        self.today_empty_label = ttk.Label(self.today_reminders_frame, text="No reminders for today.", font=('Arial', 10, 'italic'))
+        self.today_more_button = ttk.Button(self.today_reminders_frame, text="", command=lambda: self.jump_to_date(datetime.date.today().isoformat()))
+
+        # Agenda of upcoming occurrences, recurring ones included
+        ttk.Label(self.sidebar_frame, text=f"📆 Upcoming {AGENDA_DAYS} Days", font=('Arial', 14, 'bold')).pack(pady=(10, 10))
+        self.agenda_frame = ttk.Frame(self.sidebar_frame)
+        self.agenda_frame.pack(fill=tk.BOTH, expand=True)
+        agenda_rows_frame = ttk.Frame(self.agenda_frame)
+        agenda_rows_frame.pack(fill=tk.X)
+        self.agenda_rows = RowPool(agenda_rows_frame, self.make_agenda_row, self.fill_agenda_row, anchor="w", pady=2, fill=tk.X)
+        self.agenda_empty_label = ttk.Label(self.agenda_frame, text=f"Nothing in the next {AGENDA_DAYS} days.", font=('Arial', 10, 'italic'))
+        self.agenda_more_button = ttk.Button(self.agenda_frame, text="Show more", command=self.show_more_agenda)
+        self.agenda_limit = AGENDA_PAGE_SIZE
+
+        # Import/export progress, only shown while a transfer is running
+        self.transfer_frame = ttk.Frame(self.sidebar_frame)
+        self.transfer_label = ttk.Label(self.transfer_frame, text="", font=('Arial', 9))
+        self.transfer_label.pack(anchor="w")
+        self.transfer_progress = ttk.Progressbar(self.transfer_frame, mode="determinate", maximum=100)
+        self.transfer_progress.pack(fill=tk.X)
         self.update_search_results()
 
+    def schedule_search(self):
+        """Debounces keystrokes so only the query typed last is searched."""
+        if self._search_timer is not None:
+            self.root.after_cancel(self._search_timer)
+        self._search_timer = self.root.after(SEARCH_DEBOUNCE_MS, self.update_search_results)
+
     def update_search_results(self):
-        # Clear previous search results
-        for widget in self.search_results_frame.winfo_children():
-            widget.destroy()
+        self._search_timer = None
         query = self.search_var.get().strip().lower()
-        if not query:
-            return
-        results = []
-        for date, reminders in self.reminders.items():
-            for reminder in reminders:
-                if (query in reminder.get('title', '').lower() or query in reminder.get('desc', '').lower()):
-                    results.append((date, reminder))
+        self.search_results = self.storage.find(query) if query else []
+        self.search_result_dates = []
+        # Clear previous search results in one call
+        self.search_results_tree.delete(*self.search_results_tree.get_children())
+        self.show_more_search_results()
+        self.update_tag_facets()
+
+    def show_more_search_results(self):
+        """Appends the next page of results, ordered by date and time."""
+        results = self.search_results
+        shown = len(self.search_result_dates)
+        end = min(shown + SEARCH_PAGE_SIZE, len(results))
+        # Only the pages shown so far need to be ordered, not every match
+        page = heapq.nsmallest(end, results, key=lambda x: (x[0], x[1].minutes))[shown:]
+        for date, reminder in page:
+            self.search_results_tree.insert("", tk.END, iid=str(len(self.search_result_dates)), values=(f"{date} {reminder.get('time', '')}", reminder.get('title', '')))
+            self.search_result_dates.append(date)
+
+        if not self.search_var.get().strip():
+            self.search_status_label.config(text="")
+        elif results:
+            self.search_status_label.config(text=f"Showing {end} of {len(results)}")
+        else:
+            self.search_status_label.config(text="No results.")
+        if end < len(results):
+            self.search_more_button.pack(side=tk.RIGHT)
+        else:
+            self.search_more_button.pack_forget()
         if results:
-            for date, reminder in sorted(results, key=lambda x: (x[0], x[1].get('time', ''))):
-                text = f"{date} {reminder.get('time', 'N/A')}\n{reminder.get('title', '')}"
-                btn = ttk.Button(self.search_results_frame, text=text, style="Search.TButton", width=28, command=lambda d=date: self.jump_to_date(d))
-                btn.pack(anchor="w", pady=2, fill=tk.X)
+            self.bulk_edit_button.pack(side=tk.RIGHT, padx=(0, 2))
+        else:
+            self.bulk_edit_button.pack_forget()
+
+    def update_tag_facets(self):
+        """Lists the most used tags with their counts, over the search results while there are any."""
+        query = self.search_var.get().strip()
+        _, groups, exclude = parse_query(query)
+        if query:
+            # Counted from the tag index, intersected with the ids of the results
+            counts = self.storage.tag_counts({reminder.id for _, reminder in self.search_results})
+        else:
+            counts = self.storage.tag_counts()
+        shown = heapq.nsmallest(TAG_FACET_LIMIT, counts.items(), key=lambda item: (-item[1], item[0].lower()))
+        # Tags filtered on stay listed, so their filter can be clicked away again
+        listed = {tag.lower() for tag, _ in shown}
+        lowered = {tag.lower(): count for tag, count in counts.items()}
+        for tag in [tag for group in groups for tag in group] + list(exclude):
+            if tag.lower() not in listed:
+                listed.add(tag.lower())
+                shown.append((tag, lowered.get(tag.lower(), 0)))
+        required = {tag.lower() for group in groups for tag in group}
+        excluded = {tag.lower() for tag in exclude}
+        self.tag_facets.update([
+            (tag.lower(), (tag, count, "+" if tag.lower() in required else "-" if tag.lower() in excluded else ""))
+            for tag, count in shown])
+        if shown:
+            self.tag_facets_empty_label.pack_forget()
         else:
-            ttk.Label(self.search_results_frame, text="No results.", font=('Arial', 10, 'italic')).pack(anchor="w")
+            self.tag_facets_empty_label.pack(anchor="w")
+
+    def make_tag_facet(self, parent):
+        return {"frame": ttk.Label(parent, cursor="hand2")}
+
+    def fill_tag_facet(self, row, item):
+        tag, count, state = item
+        mark = {"+": "✔ ", "-": "✖ "}.get(state, "")
+        row["frame"].config(text=f"{mark}{tag} ({count})")
+        row["frame"].bind("<Button-1>", lambda e: self.toggle_tag_filter(tag))
+        row["frame"].bind("<Button-3>", lambda e: self.toggle_tag_filter(tag, exclude=True))
+
+    def toggle_tag_filter(self, tag, exclude=False):
+        """Adds tag:<tag> (or -tag:<tag>) to the search, or removes it when it is already there."""
+        text, groups, excluded = parse_query(self.search_var.get().strip())
+        key = tag.lower()
+        was_required = any(key in {t.lower() for t in group} for group in groups)
+        was_excluded = key in {t.lower() for t in excluded}
+        groups = [group for group in groups if key not in {t.lower() for t in group}]
+        excluded = [t for t in excluded if t.lower() != key]
+        if exclude and not was_excluded:
+            excluded.append(tag)
+        elif not exclude and not was_required:
+            groups.append((tag,))
+        self.search_var.set(format_query(text, groups, excluded))
+
+    def search_result_selected(self):
+        selection = self.search_results_tree.selection()
+        if selection:
+            self.jump_to_date(self.search_result_dates[int(selection[0])])
 
     def jump_to_date(self, date):
         try:
@@ -189,18 +481,60 @@ class CalendarApp:
             print(f"Error jumping to date: {e}")
 
     def update_sidebar(self):
-        # Clear previous widgets
-        for widget in self.today_reminders_frame.winfo_children():
-            widget.destroy()
+        self.update_today()
+        self.update_agenda()
+
+    def update_today(self):
         today = datetime.date.today().strftime("%Y-%m-%d")
-        reminders = self.reminders.get(today, [])
+        reminders = self.storage.on_date(today)
+        shown = heapq.nsmallest(SIDEBAR_PAGE_SIZE, reminders, key=lambda r: r.minutes)
+        self.today_rows.update([(reminder.id, reminder) for reminder in shown])
         if reminders:
-            reminders_sorted = sorted(reminders, key=lambda r: r.get('time', ''))
-            for reminder in reminders_sorted:
-                text = f"{reminder.get('time', 'N/A')} - {reminder.get('title', 'N/A')}\n{reminder.get('desc', '')}"
-                ttk.Label(self.today_reminders_frame, text="🎈 " + text, justify=tk.LEFT, wraplength=180).pack(anchor="w", pady=4, fill=tk.X)
+            self.today_empty_label.pack_forget()
+        else:
+            self.today_empty_label.pack(anchor="w")
+        if len(reminders) > len(shown):
+            self.today_more_button.config(text=f"Show all {len(reminders)}")
+            self.today_more_button.pack(anchor="w", pady=4)
+        else:
+            self.today_more_button.pack_forget()
+
+    def update_agenda(self):
+        """Lists the next occurrences in time order, expanding only as many as are shown."""
+        today = datetime.date.today()
+        end = today + datetime.timedelta(days=AGENDA_DAYS)
+        # One more than shown tells whether there are more
+        occurrences = list(self.storage.occurrences_between(today.isoformat(), end.isoformat(), self.agenda_limit + 1))
+        shown = occurrences[:self.agenda_limit]
+        self.agenda_rows.update([((reminder.id, day), (day, reminder)) for day, reminder in shown])
+        if shown:
+            self.agenda_empty_label.pack_forget()
         else:
-            ttk.Label(self.today_reminders_frame, text="No reminders for today.", font=('Arial', 10, 'italic')).pack(anchor="w")
+            self.agenda_empty_label.pack(anchor="w")
+        if len(occurrences) > len(shown):
+            self.agenda_more_button.pack(anchor="w", pady=4)
+        else:
+            self.agenda_more_button.pack_forget()
+
+    def show_more_agenda(self):
+        self.agenda_limit += AGENDA_PAGE_SIZE
+        self.update_agenda()
+
+    def make_agenda_row(self, parent):
+        return {"frame": ttk.Label(parent, justify=tk.LEFT, wraplength=180, cursor="hand2")}
+
+    def fill_agenda_row(self, row, item):
+        day, reminder = item
+        row["frame"].config(text=f"{day:%a %d %b} {reminder.get('time', '') or '--:--'}  {reminder.get('title', '')}")
+        date = day.isoformat()
+        row["frame"].bind("<Button-1>", lambda e: self.jump_to_date(date))
+
+    def make_today_row(self, parent):
+        return {"frame": ttk.Label(parent, justify=tk.LEFT, wraplength=180)}
+
+    def fill_today_row(self, row, reminder):
+        text = f"{reminder.get('time', 'N/A')} - {reminder.get('title', 'N/A')}\n{reminder.get('desc', '')}"
+        row["frame"].config(text="🎈 " + text)
 
     def create_calendar_widgets(self):
         # Remove old calendar grid and navigation
@@ -241,6 +575,7 @@ class CalendarApp:
             self.date_entry.delete(0, tk.END)
             self.date_entry.insert(0, self.current_date)
             self.display_reminders(self.current_date)
+            self.update_calendar()
 
         # Year controls
         year_frame = ttk.Frame(self.dials_frame)
@@ -272,6 +607,23 @@ class CalendarApp:
         day_down = ttk.Button(day_frame, text="▼", width=2, command=lambda: self.change_day(-1, update_date_display), style="Small.TButton")
         day_down.pack()
 
+        # Month grid with navigation, days are clickable
+        nav_frame = ttk.Frame(self.calendar_frame)
+        nav_frame.pack(pady=(10, 0))
+        ttk.Button(nav_frame, text="◀", width=2, command=self.prev_month, style="Small.TButton").pack(side=tk.LEFT)
+        self.month_year_label = ttk.Label(nav_frame, text="", font=('Arial', 12, 'bold'), width=16, anchor="center")
+        self.month_year_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="▶", width=2, command=self.next_month, style="Small.TButton").pack(side=tk.LEFT)
+        self.calendar_grid = tk.Text(self.calendar_frame, width=len(CALENDAR_HEADER), height=7, font=('Courier', 12),
+                                     cursor="hand2", relief=tk.FLAT, state='disabled')
+        self.calendar_grid.pack(pady=5)
+        self.calendar_grid.tag_configure("weekday", foreground="black")
+        self.calendar_grid.tag_configure("weekend", foreground="red")
+        self.calendar_grid.tag_configure("reminder_date", background="lightblue") # Highlight dates with reminders
+        self.calendar_grid.tag_configure("selected", background="yellow", foreground="blue")
+        self.calendar_grid.tag_raise("selected")
+        self.calendar_grid.bind("<Button-1>", self.date_selected)
+
         # Style for smaller buttons
         style = ttk.Style()
         style.configure("Small.TButton", font=("Arial", 12))
@@ -354,7 +706,7 @@ class CalendarApp:
         self.desc_entry = ttk.Entry(input_frame)
         self.desc_entry.grid(row=3, column=1, padx=5, pady=5, sticky="we")
 
-        ttk.Label(input_frame, text="🔁 Recurrence (daily, weekly, monthly):").grid(row=4, column=0, padx=5, pady=5, sticky="w")
+        ttk.Label(input_frame, text="🔁 Recurrence (daily, weekly, monthly, FREQ=...):").grid(row=4, column=0, padx=5, pady=5, sticky="w")
         self.recurrence_entry = ttk.Entry(input_frame)
         self.recurrence_entry.grid(row=4, column=1, padx=5, pady=5, sticky="we")
 
@@ -377,81 +729,71 @@ class CalendarApp:
         # For simplicity here, we'll continue using a Frame and pack items into it
         self.reminder_display_frame = ttk.Frame(self.reminder_frame)
         self.reminder_display_frame.pack(fill=tk.BOTH, expand=True)
+        self.reminder_date_label = ttk.Label(self.reminder_display_frame, text="", font=('Arial', 10, 'bold'))
+        self.reminder_date_label.pack(pady=(0, 5), anchor="w")
+        reminder_rows_frame = ttk.Frame(self.reminder_display_frame)
+        reminder_rows_frame.pack(fill=tk.X)
+        self.reminder_rows = RowPool(reminder_rows_frame, self.make_reminder_row, self.fill_reminder_row, fill=tk.X, pady=2)
+        self.reminder_empty_label = ttk.Label(self.reminder_display_frame, text="No reminders for this date.", font=('Arial', 10, 'italic'))
+        self.reminder_more_button = ttk.Button(self.reminder_display_frame, text="", command=self.show_more_reminders)
+        self.displayed_date = None
+        self.reminder_limit = REMINDER_PAGE_SIZE
 
     def create_menu(self):
         menubar = tk.Menu(self.root)
         filemenu = tk.Menu(menubar, tearoff=0)
         filemenu.add_command(label="Export Reminders", command=self.export_reminders)
         filemenu.add_command(label="Import Reminders", command=self.import_reminders)
+        filemenu.add_command(label="Convert Storage Format", command=self.convert_storage_format)
         menubar.add_cascade(label="File", menu=filemenu)
+        editmenu = tk.Menu(menubar, tearoff=0)
+        editmenu.add_command(label="Bulk Edit Search Results...", command=self.open_bulk_edit)
+        menubar.add_cascade(label="Edit", menu=editmenu)
         # Theme toggle
         thememenu = tk.Menu(menubar, tearoff=0)
         thememenu.add_command(label="Toggle Light/Dark Theme", command=self.toggle_theme)
         menubar.add_cascade(label="Theme", menu=thememenu)
+        if self.metrics is not None:
+            debugmenu = tk.Menu(menubar, tearoff=0)
+            debugmenu.add_command(label="Show Stats", command=self.show_stats)
+            debugmenu.add_command(label="Save Stats as JSON", command=lambda: self.save_stats("json"))
+            debugmenu.add_command(label="Save Stats as Prometheus Text", command=lambda: self.save_stats("prometheus"))
+            debugmenu.add_command(label="Reset Stats", command=self.metrics.reset)
+            menubar.add_cascade(label="Debug", menu=debugmenu)
         self.root.config(menu=menubar)
 
     def update_calendar(self):
+        """Redraws the month grid in one pass from its precomputed layout."""
         self.month_year_label.config(text=f"{calendar.month_name[self.month]} {self.year}")
-        cal_content = calendar.month(self.year, self.month)
+        text = month_layout(self.year, self.month)[0]
         self.calendar_grid.config(state='normal')
-        self.calendar_grid.delete(1.0, tk.END)
-        self.calendar_grid.insert(tk.END, cal_content)
+        self.calendar_grid.delete("1.0", tk.END)
+        self.calendar_grid.insert("1.0", text)
         self.highlight_calendar_dates() # Add highlighting
         self.calendar_grid.config(state='disabled')
 
     def highlight_calendar_dates(self):
-        """Highlights weekdays, weekends, and selected date in the calendar."""
-        self.calendar_grid.tag_configure("weekday", foreground="black")
-        self.calendar_grid.tag_configure("weekend", foreground="red")
-        self.calendar_grid.tag_configure("selected", background="yellow", foreground="blue")
-        self.calendar_grid.tag_configure("reminder_date", background="lightblue") # Highlight dates with reminders
-
-        cal_lines = self.calendar_grid.get(1.0, tk.END).split('\n')
-        # Skip header lines (month/year and weekday names)
-        if len(cal_lines) > 2:
-            # Tag weekday names
-            weekday_names_line = cal_lines[1]
-            for i, day_name in enumerate(['Mo', 'Tu', 'We', 'Th', 'Fr', 'Sa', 'Su']):
-                start_index = weekday_names_line.find(day_name)
-                if start_index != -1:
-                     # Apply weekday tag
-                     self.calendar_grid.tag_add("weekday", f"2.{start_index}", f"2.{start_index + len(day_name)}")
-
-
-            # Tag days in the grid
-            for line_num in range(3, len(cal_lines) + 1): # Start from the line with days
-                week_line = cal_lines[line_num - 1]
-                day_start_index = 0
-                for i in range(7): # Iterate through days of the week
-                    # Find the start index of the number for the current day
-                    # Handle potential spaces before single-digit days
-                    day_str = week_line[day_start_index:day_start_index + 3].strip()
-                    try:
-                         day = int(day_str)
-                         current_date_str = f"{self.year}-{self.month:02d}-{day:02d}"
-
-                         # Check if this date has reminders
-                         if current_date_str in self.reminders and self.reminders[current_date_str]:
-                            self.calendar_grid.tag_add("reminder_date", f"{line_num}.{day_start_index}", f"{line_num}.{day_start_index + len(day_str)}")
-
-
-                         # Check if this is the selected date
-                         if self.current_date == current_date_str:
-                             self.calendar_grid.tag_add("selected", f"{line_num}.{day_start_index}", f"{line_num}.{day_start_index + len(day_str)}")
-
-
-                         # Check if weekend (Sa or Su column)
-                         if i >= 5: # Saturday or Sunday columns
-                             self.calendar_grid.tag_add("weekend", f"{line_num}.{day_start_index}", f"{line_num}.{day_start_index + len(day_str)}")
-                         else: # Weekday columns
-                             self.calendar_grid.tag_add("weekday", f"{line_num}.{day_start_index}", f"{line_num}.{day_start_index + len(day_str)}")
-
-
-                    except ValueError:
-                         # Not a day number (e.g., empty space from previous/next month)
-                         pass
-                    day_start_index += 3 # Move to the next day's position (assuming 3 chars per day slot)
-
+        """Highlights weekdays, weekends, dates with reminders and the selected date, one tag_add per tag."""
+        _, day_ranges, _, weekday_ranges, weekend_ranges = month_layout(self.year, self.month)
+        for tag in ("weekday", "weekend", "reminder_date", "selected"):
+            self.calendar_grid.tag_remove(tag, "1.0", tk.END)
+        self.calendar_grid.tag_add("weekday", *weekday_ranges)
+        self.calendar_grid.tag_add("weekend", *weekend_ranges)
+
+        # Cached per month, and includes the days recurring reminders fall on
+        reminder_days, _ = self.storage.month_occupancy(self.year, self.month)
+        reminder_ranges = []
+        for day, cell in enumerate(day_ranges, start=1):
+            if reminder_days >> (day - 1) & 1:
+                reminder_ranges.extend(cell)
+        if reminder_ranges:
+            self.calendar_grid.tag_add("reminder_date", *reminder_ranges)
+
+        month_prefix = f"{self.year}-{self.month:02d}-"
+        if self.current_date and self.current_date.startswith(month_prefix):
+            day = int(self.current_date[len(month_prefix):])
+            if 1 <= day <= len(day_ranges):
+                self.calendar_grid.tag_add("selected", *day_ranges[day - 1])
 
     def prev_month(self):
         self.month -= 1
@@ -479,169 +821,115 @@ class CalendarApp:
         """Handles date selection from the calendar grid."""
         try:
             index = self.calendar_grid.index("@%s,%s" % (event.x, event.y))
-            line, col = map(int, index.split("."))
-            # Extract the day number from the clicked position
-            day_str = self.calendar_grid.get(f"{line}.{col}", f"{line}.{col + 2}").strip()
-            try:
-                day = int(day_str)
-                # Construct the full date string
-                selected_date_str = f"{self.year}-{self.month:02d}-{day:02d}"
-                # Validate the date
-                datetime.datetime.strptime(selected_date_str, "%Y-%m-%d")
-                self.current_date = selected_date_str
-                self.display_reminders(self.current_date)
-                self.date_entry.delete(0, tk.END)
-                self.date_entry.insert(0, self.current_date) # Populate date entry
-                self.update_calendar() # Re-highlight the selected date
-            except ValueError:
-                # Click was not on a valid day number or date is invalid for the month
-                pass
         except tk.TclError:
             # Handle cases where the click is outside the text area
-            pass
+            return
+        line, col = map(int, index.split("."))
+        day = month_layout(self.year, self.month)[2].get((line, col // 3))
+        if day is None:
+            # Click was not on a day of this month
+            return
+        self.current_date = f"{self.year}-{self.month:02d}-{day:02d}"
+        self.display_reminders(self.current_date)
+        self.date_entry.delete(0, tk.END)
+        self.date_entry.insert(0, self.current_date) # Populate date entry
+        self.update_calendar() # Re-highlight the selected date
 
 
     def display_reminders(self, date):
-        """Displays reminders for the given date with edit and delete buttons."""
-        # Clear the current display frame
-        for widget in self.reminder_display_frame.winfo_children():
-            widget.destroy()
-
-        ttk.Label(self.reminder_display_frame, text=f"📅 Reminders for {date}:", font=('Arial', 10, 'bold')).pack(pady=(0, 5), anchor="w")
-
-
-        if date in self.reminders and self.reminders[date]:
-            reminders_list = sorted(self.reminders[date], key=lambda r: r['time']) # Sort by time
-            for i, reminder in enumerate(reminders_list):
-                # Create a frame for each reminder item
-                reminder_item_frame = ttk.Frame(self.reminder_display_frame)
-                reminder_item_frame.pack(fill=tk.X, pady=2)
-                reminder_item_frame.grid_columnconfigure(0, weight=1) # Text label column
-
-                # Reminder details label
-                reminder_text = f"Time: {reminder.get('time', 'N/A')}, Title: {reminder.get('title', 'N/A')}\nDesc: {reminder.get('desc', 'N/A')}\nRecurrence: {reminder.get('recurrence', 'None')}"
-                if reminder.get('end_date', ''):
-                    reminder_text += f"\nEnd Date: {reminder.get('end_date', '')}"
-                if reminder.get('tags', []):
-                    reminder_text += f"\nTags: {', '.join(reminder.get('tags', []))}"
-                ttk.Label(reminder_item_frame, text=reminder_text, justify=tk.LEFT, wraplength=300, font=('Arial', 9)).grid(row=0, column=0, sticky="w")
-
-                # Button frame for edit/delete
-                button_frame = ttk.Frame(reminder_item_frame)
-                button_frame.grid(row=0, column=1, sticky="e")
-
-                # Add Edit button
-                edit_button = ttk.Button(button_frame, text="✏️ Edit", command=lambda r_id=reminder['id']: self.edit_reminder(date, r_id))
-                edit_button.pack(side=tk.LEFT, padx=2)
-
-                # Add Delete button
-                delete_button = ttk.Button(button_frame, text="🗑️ Delete", command=lambda r_id=reminder['id']: self.delete_reminder(date, r_id))
-                delete_button.pack(side=tk.LEFT)
-
+        """Displays reminders for the given date with edit and delete buttons, a page at a time."""
+        if date != self.displayed_date:
+            self.displayed_date = date
+            self.reminder_limit = REMINDER_PAGE_SIZE
+        self.reminder_date_label.config(text=f"📅 Reminders for {date}:")
+
+        reminders_list = self.storage.on_date(date)
+        shown = heapq.nsmallest(self.reminder_limit, reminders_list, key=lambda r: r.minutes) # Sort by time
+        self.reminder_rows.update([(reminder.id, reminder) for reminder in shown])
+        if reminders_list:
+            self.reminder_empty_label.pack_forget()
         else:
-            ttk.Label(self.reminder_display_frame, text="No reminders for this date.", font=('Arial', 10, 'italic')).pack()
+            self.reminder_empty_label.pack()
+        if len(reminders_list) > len(shown):
+            self.reminder_more_button.config(text=f"Show more ({len(reminders_list) - len(shown)} hidden)")
+            self.reminder_more_button.pack(pady=5)
+        else:
+            self.reminder_more_button.pack_forget()
+
+    def show_more_reminders(self):
+        self.reminder_limit += REMINDER_PAGE_SIZE
+        self.display_reminders(self.displayed_date)
+
+    def make_reminder_row(self, parent):
+        # Create a frame for each reminder item
+        reminder_item_frame = ttk.Frame(parent)
+        reminder_item_frame.grid_columnconfigure(0, weight=1) # Text label column
+        label = ttk.Label(reminder_item_frame, justify=tk.LEFT, wraplength=300, font=('Arial', 9))
+        label.grid(row=0, column=0, sticky="w")
+
+        # Button frame for edit/delete
+        button_frame = ttk.Frame(reminder_item_frame)
+        button_frame.grid(row=0, column=1, sticky="e")
+        edit_button = ttk.Button(button_frame, text="✏️ Edit")
+        edit_button.pack(side=tk.LEFT, padx=2)
+        delete_button = ttk.Button(button_frame, text="🗑️ Delete")
+        delete_button.pack(side=tk.LEFT)
+        return {"frame": reminder_item_frame, "label": label, "edit": edit_button, "delete": delete_button}
+
+    def fill_reminder_row(self, row, reminder):
+        # Reminder details label
+        reminder_text = f"Time: {reminder.get('time', 'N/A')}, Title: {reminder.get('title', 'N/A')}\nDesc: {reminder.get('desc', 'N/A')}\nRecurrence: {reminder.get('recurrence', 'None')}"
+        if reminder.get('end_date', ''):
+            reminder_text += f"\nEnd Date: {reminder.get('end_date', '')}"
+        if reminder.get('tags', []):
+            reminder_text += f"\nTags: {', '.join(reminder.get('tags', []))}"
+        row["label"].config(text=reminder_text)
+        date, r_id = reminder['date'], reminder['id']
+        row["edit"].config(command=lambda: self.edit_reminder(date, r_id))
+        row["delete"].config(command=lambda: self.delete_reminder(date, r_id))
 
     def add_reminder(self):
-        date = self.date_entry.get()
-        time = self.time_entry.get()
-        title = self.title_entry.get()
-        desc = self.desc_entry.get()
-        recurrence = self.recurrence_entry.get().lower()
-        end_date = self.end_date_entry.get().strip()
-        tags = [t.strip() for t in self.tags_entry.get().split(',') if t.strip()]
-
-        if not date or not title:
-            mb.showerror("Input Error", "Date and Title are required.")
-            return
-
         try:
-            datetime.datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            mb.showerror("Input Error", "Invalid date format. Please use YYYY-MM-DD.")
+            reminder = make_reminder(
+                self.date_entry.get(),
+                self.time_entry.get(),
+                self.title_entry.get(),
+                desc=self.desc_entry.get(),
+                recurrence=self.recurrence_entry.get(),
+                end_date=self.end_date_entry.get(),
+                tags=parse_tags(self.tags_entry.get()),
+                reminder_id=self.editing_reminder_id
+            )
+        except ValueError as e:
+            mb.showerror("Input Error", str(e))
             return
-
-        if time:
-            try:
-                datetime.datetime.strptime(time, "%H:%M")
-            except ValueError:
-                mb.showerror("Input Error", "Invalid time format. Please use HH:MM.")
-                return
-
-        valid_recurrences = ["", "daily", "weekly", "monthly"]
-        if recurrence not in valid_recurrences:
-             mb.showerror("Input Error", "Invalid recurrence. Please use daily, weekly, or monthly.")
-             return
-
-        if end_date:
-            try:
-                datetime.datetime.strptime(end_date, "%Y-%m-%d")
-            except ValueError:
-                mb.showerror("Input Error", "Invalid end date format. Please use YYYY-MM-DD.")
-                return
+        date = reminder['date']
 
         if self.editing_reminder_id:
-            # Find the reminder across all dates (in case the date was changed during edit)
-            found_reminder = None
-            original_date = None
-            for d, reminders_list in list(self.reminders.items()): # Iterate over a copy
-                 for i, reminder in enumerate(reminders_list):
-                     if reminder['id'] == self.editing_reminder_id:
-                         found_reminder = reminder
-                         original_date = d
-                         break
-                 if found_reminder:
-                     break
+            # Look the reminder up by id, the date may have been changed during edit
+            found_reminder = self.storage.get(self.editing_reminder_id)
 
             if found_reminder:
-                # If the date changed, remove from old date's list
-                if original_date != date:
-                     self.reminders[original_date] = [r for r in self.reminders[original_date] if r['id'] != self.editing_reminder_id]
-                     if not self.reminders[original_date]:
-                         del self.reminders[original_date]
-                     # Add to new date's list
-                     if date not in self.reminders:
-                         self.reminders[date] = []
-                     self.reminders[date].append(found_reminder)
-
-                # Update the reminder details
-                found_reminder.update({
-                    'date': date, # Update date in reminder object as well
-                    'time': time,
-                    'title': title,
-                    'desc': desc,
-                    'recurrence': recurrence,
-                    'end_date': end_date,
-                    'tags': tags
-                })
+                # Replace the reminder details, the storage moves it if the date changed
+                updated_reminder = self.storage.put(dict(found_reminder, **reminder))
+                self.scheduler.schedule(updated_reminder, datetime.datetime.now())
+                self.schedule_reminder_check()
+                # Both versions, the views that showed the old one must drop it
+                self.invalidate_reminders([found_reminder, updated_reminder])
+                self.schedule_save()
                 mb.showinfo("Success", "Reminder updated successfully.")
             else:
                  mb.showerror("Error", "Could not find reminder to update.")
 
             self.editing_reminder_id = None
             self.add_reminder_button.config(text="➕ Add Reminder") # No bg for ttk
-            self.save_reminders()
-            self.update_sidebar()
-            self.update_search_results()
         else:
-            new_reminder = {
-                'id': str(uuid.uuid4()),
-                'date': date,
-                'time': time,
-                'title': title,
-                'desc': desc,
-                'recurrence': recurrence,
-                'end_date': end_date,
-                'tags': tags
-            }
-
-            if date not in self.reminders:
-                self.reminders[date] = []
-
-            self.reminders[date].append(new_reminder)
+            new_reminder = self.storage.put(reminder)
+            self.scheduler.schedule(new_reminder, datetime.datetime.now())
+            self.schedule_reminder_check()
+            self.invalidate_reminders([new_reminder])
+            self.schedule_save()
             mb.showinfo("Success", "Reminder added successfully.")
-            self.save_reminders()
-            self.update_sidebar()
-            self.update_search_results()
 
         # Clear input fields
         self.date_entry.delete(0, tk.END)
@@ -652,267 +940,477 @@ class CalendarApp:
         self.end_date_entry.delete(0, tk.END)
         self.tags_entry.delete(0, tk.END)
 
-        # Update display for the date where the reminder was added/updated
-        self.current_date = date # Set current date to the modified date
-        self.display_reminders(self.current_date)
-        self.update_calendar() # Update calendar highlighting
+        # Show the date where the reminder was added/updated
+        if date != self.current_date:
+            self.current_date = date
+            self.invalidate("reminders", "calendar") # The calendar highlights the selected date
 
 
     def edit_reminder(self, date, reminder_id):
         """Populates input fields with reminder details for editing."""
-        if date in self.reminders:
-            for reminder in self.reminders[date]:
-                if reminder['id'] == reminder_id:
-                    # Populate input fields
-                    self.date_entry.delete(0, tk.END)
-                    self.date_entry.insert(0, reminder['date'])
-                    self.time_entry.delete(0, tk.END)
-                    self.time_entry.insert(0, reminder['time'])
-                    self.title_entry.delete(0, tk.END)
-                    self.title_entry.insert(0, reminder['title'])
-                    self.desc_entry.delete(0, tk.END)
-                    self.desc_entry.insert(0, reminder['desc'])
-                    self.recurrence_entry.delete(0, tk.END)
-                    self.recurrence_entry.insert(0, reminder['recurrence'])
-                    self.end_date_entry.delete(0, tk.END)
-                    self.end_date_entry.insert(0, reminder.get('end_date', ''))
-                    self.tags_entry.delete(0, tk.END)
-                    self.tags_entry.insert(0, ', '.join(reminder.get('tags', [])))
-
-                    self.editing_reminder_id = reminder_id
-                    self.add_reminder_button.config(text="✏️ Update Reminder") # No bg for ttk
-                    break
+        reminder = self.storage.get(reminder_id)
+        if reminder is not None:
+            # Populate input fields
+            self.date_entry.delete(0, tk.END)
+            self.date_entry.insert(0, reminder['date'])
+            self.time_entry.delete(0, tk.END)
+            self.time_entry.insert(0, reminder['time'])
+            self.title_entry.delete(0, tk.END)
+            self.title_entry.insert(0, reminder['title'])
+            self.desc_entry.delete(0, tk.END)
+            self.desc_entry.insert(0, reminder['desc'])
+            self.recurrence_entry.delete(0, tk.END)
+            self.recurrence_entry.insert(0, reminder['recurrence'])
+            self.end_date_entry.delete(0, tk.END)
+            self.end_date_entry.insert(0, reminder.get('end_date', ''))
+            self.tags_entry.delete(0, tk.END)
+            self.tags_entry.insert(0, ', '.join(reminder.get('tags', [])))
+
+            self.editing_reminder_id = reminder_id
+            self.add_reminder_button.config(text="✏️ Update Reminder") # No bg for ttk
 
     def delete_reminder(self, date, reminder_id):
         """Deletes a reminder based on its ID."""
-        if date in self.reminders:
-            # Find the index of the reminder to delete
-            index_to_delete = -1
-            for i, reminder in enumerate(self.reminders[date]):
-                 if reminder['id'] == reminder_id:
-                     index_to_delete = i
-                     break
-
-            if index_to_delete != -1:
-                 del self.reminders[date][index_to_delete]
-                 if not self.reminders[date]:
-                     del self.reminders[date]
-                 self.save_reminders()
-                 self.update_sidebar()
-                 self.update_search_results()
-                 mb.showinfo("Success", "Reminder deleted successfully.")
-                 # Update the display for the current date
-                 if self.current_date:
-                    self.display_reminders(self.current_date)
-                 self.update_calendar() # Update calendar highlighting
-            else:
-                 mb.showerror("Error", "Could not find reminder to delete.")
+        deleted = self.storage.delete(reminder_id)
+        if deleted is not None:
+            self.scheduler.unschedule(reminder_id)
+            self.invalidate_reminders([deleted])
+            self.schedule_save()
+            mb.showinfo("Success", "Reminder deleted successfully.")
+        else:
+            mb.showerror("Error", "Could not find reminder to delete.")
 
 
-    def calculate_next_occurrence(self, original_date_str, recurrence, current_date):
-        """Calculates the next occurrence date for a recurring reminder."""
+    def open_bulk_edit(self):
+        """Asks for one change to apply to every reminder in the search results."""
+        count = len({reminder.id for _, reminder in self.search_results})
+        if not count:
+            mb.showinfo("Bulk Edit", "Search for the reminders to change first, e.g. tag:old or a word in their title.")
+            return
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Bulk Edit")
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text=f"Apply to the {count} reminders found for \"{self.search_var.get().strip()}\":").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 8))
+        labels = list(bulk.ACTIONS.values())
+        action = ttk.Combobox(frame, values=labels, state="readonly", width=36)
+        action.set(labels[0])
+        action.grid(row=1, column=0, columnspan=2, sticky="we")
+        value = ttk.Entry(frame)
+        value.grid(row=2, column=0, columnspan=2, sticky="we", pady=8)
+
+        def apply():
+            name = next(name for name, label in bulk.ACTIONS.items() if label == action.get())
+            if self.apply_bulk_edit(name, value.get()):
+                dialog.destroy()
+
+        ttk.Button(frame, text="Apply", command=apply).grid(row=3, column=0, sticky="w")
+        ttk.Button(frame, text="Cancel", command=dialog.destroy).grid(row=3, column=1, sticky="e")
+
+    def apply_bulk_edit(self, action, value):
+        """Applies one bulk action to the search results with a single save and refresh pass.
+
+        Returns True once applied, False if the input was invalid or the user cancelled.
+        """
         try:
-            original_date = datetime.datetime.strptime(original_date_str, "%Y-%m-%d").date()
-        except ValueError:
-            return None
+            updated, deleted = bulk.plan([reminder for _, reminder in self.search_results],
+                                         bulk.operation(action, value))
+        except ValueError as e:
+            mb.showerror("Input Error", str(e))
+            return False
+        count = len(updated) + len(deleted)
+        if not count:
+            mb.showinfo("Bulk Edit", "None of the reminders needed changing.")
+            return True
+        if not mb.askyesno("Bulk Edit", f"Apply \"{bulk.ACTIONS[action]}\" to {count} reminders?"):
+            return False
+        stored, removed = bulk.commit(self.storage, updated, deleted)
+        now = datetime.datetime.now()
+        for reminder in stored:
+            self.scheduler.schedule(reminder, now)
+        for reminder in removed:
+            self.scheduler.unschedule(reminder.id)
+        self.schedule_reminder_check()
+        changed = {reminder.id for reminder in stored}
+        previous = [reminder for _, reminder in self.search_results if reminder.id in changed]
+        self.invalidate_reminders(previous + stored + removed)
+        self.schedule_save()
+        mb.showinfo("Bulk Edit", f"Updated {len(stored)} and deleted {len(removed)} reminders.")
+        return True
 
-        if recurrence == "daily":
-            if original_date <= current_date:
-                 return current_date + datetime.timedelta(days=1)
-            else:
-                 return original_date
-        elif recurrence == "weekly":
-            days_difference = (original_date.weekday() - current_date.weekday() + 7) % 7
-            if days_difference == 0 and original_date <= current_date:
-                 days_difference = 7
-            elif days_difference == 0 and original_date > current_date:
-                 days_difference = 0
-            return current_date + datetime.timedelta(days=days_difference)
-
-        elif recurrence == "monthly":
-            next_date = current_date
-            while next_date.day != original_date.day or next_date < original_date:
-                 next_date += relativedelta(months=1)
-            if next_date < current_date:
-                 next_date += relativedelta(months=1)
-            return next_date
-        else:
+    def calculate_next_occurrence(self, original_date_str, recurrence, current_date):
+        """Calculates the next occurrence date (on or after current_date) for a recurring reminder."""
+        original_date = parse_date(original_date_str)
+        if original_date is None:
             return None
+        return next_occurrence(original_date, recurrence, current_date)
+
+    def refresh_scheduler(self):
+        """Loads the reminders that can fire from the last processed instant to the scheduler horizon."""
+        now = datetime.datetime.now()
+        today = now.date()
+        since = self.firing_log.resume_point(now)
+        horizon = today + datetime.timedelta(days=SCHEDULER_HORIZON_DAYS)
+        self.scheduler.rebuild(self.storage.between(since.date().isoformat(), horizon.isoformat()), since)
+        self._scheduler_refresh_date = today + datetime.timedelta(days=1)
+
+    def create_notifier(self):
+        backends = [StdoutBackend()]
+        if NOTIFY_LOG_FILE:
+            backends.append(LogFileBackend(NOTIFY_LOG_FILE))
+        if NOTIFY_WEBHOOK_URL:
+            backends.append(WebhookBackend(NOTIFY_WEBHOOK_URL))
+        if SoundBackend.available():
+            backends.append(SoundBackend())
+        notifier = NotificationDispatcher(backends, NOTIFY_COALESCE_S, NOTIFY_MIN_INTERVAL_S)
+        notifier.start()
+        return notifier
 
     def check_reminders(self):
+        """Hands the reminders that are due to the notifier and sleeps until the next one."""
+        self._reminder_timer = None
         now = datetime.datetime.now()
-        current_date = now.date()
-        current_time_str = now.strftime("%H:%M")
-
-        current_date_str = current_date.strftime("%Y-%m-%d")
-        if current_date_str in self.reminders:
-            reminders_today = self.reminders[current_date_str]
-            for reminder in reminders_today:
-                if reminder.get('recurrence', '') == "" and reminder.get('time', '') == current_time_str: # Use .get with default
-                    # Play sound notification
-                    winsound.Beep(1000, 500)  # 1000 Hz, 500 ms
-                    print(f"Notification: Reminder: {reminder.get('title', 'N/A')} at {reminder.get('time', 'N/A')}") # Use .get
-
-        for date, reminders_list in self.reminders.items():
-            for reminder in reminders_list:
-                recurrence = reminder.get('recurrence', '')
-                if recurrence in ["daily", "weekly", "monthly"]:
-                    end_date_str = reminder.get('end_date', '')
-                    if end_date_str:
-                        try:
-                            end_date = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
-                        except ValueError:
-                            end_date = None
-                    else:
-                        end_date = None
-                    next_occurrence_date = self.calculate_next_occurrence(reminder.get('date', ''), recurrence, current_date) # Use .get
-
-                    # Only trigger if current_date <= end_date (or no end_date)
-                    if next_occurrence_date and next_occurrence_date == current_date and reminder.get('time', '') == current_time_str:
-                        if not end_date or current_date <= end_date:
-                            # Play sound notification
-                            winsound.Beep(1200, 500)  # 1200 Hz, 500 ms
-                            print(f"Notification: Recurring Reminder: {reminder.get('title', 'N/A')} at {reminder.get('time', 'N/A')} (originally on {reminder.get('date', 'N/A')})") # Use .get
-
-        self.root.after(60000, self.check_reminders)
+        # Everything due in (last processed, now], however late the timer woke up
+        due = self.firing_log.claim(self.scheduler.pop_due(now), now)
+        for fire_time, reminder in due:
+            # Delivery (and the beep) happens on the notifier thread, the UI never waits for it
+            self.notifier.notify(fire_time, reminder)
+        # Timer wakes where nothing fired do not rewrite (and fsync) the log every time
+        if self.firing_log.needs_save():
+            self.save_firing_log()
+        if now.date() >= self._scheduler_refresh_date:
+            self.refresh_scheduler()
+        self.schedule_reminder_check()
+
+    def save_firing_log(self):
+        try:
+            self.firing_log.save()
+        except Exception as e:
+            print(f"Error saving fired reminders: {e}")
+
+    def schedule_reminder_check(self):
+        """(Re)arms the reminder timer for the earliest scheduled reminder."""
+        if self._reminder_timer is not None:
+            self.root.after_cancel(self._reminder_timer)
+        delay = MAX_REMINDER_SLEEP_MS
+        next_due = self.scheduler.next_due()
+        if next_due is not None:
+            remaining_ms = int((next_due - datetime.datetime.now()).total_seconds() * 1000) + 1
+            delay = max(0, min(delay, remaining_ms))
+        self._reminder_timer = self.root.after(delay, self.check_reminders)
 
     def export_reminders(self):
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("Gzipped CSV files", "*.csv.gz"), ("All files", "*.*")]
         )
 
         if not file_path:
             return
+        if self.transfer_job is not None:
+            mb.showerror("Busy", "An import or export is already running.")
+            return
 
-        try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["ID", "Date", "Time", "Title", "Description", "Recurrence"])
-
-                for date, reminders_list in self.reminders.items():
-                    for reminder in reminders_list:
-                         writer.writerow([
-                             reminder.get('id', ''),
-                             reminder.get('date', ''),
-                             reminder.get('time', ''),
-                             reminder.get('title', ''),
-                             reminder.get('desc', ''),
-                             reminder.get('recurrence', '')
-                         ])
-
-
-            print(f"Reminders exported to {file_path}")
-        except Exception as e:
-            print(f"Error exporting reminders: {e}")
+        # The worker thread reads a snapshot, make sure it includes every change
+        self.flush_save()
+        self.transfer_path = file_path
+        self.transfer_count = 0
+        self.start_transfer(BackgroundJob(write_reminders(file_path, self.storage.snapshot())), "Exporting")
 
     def import_reminders(self):
         file_path = filedialog.askopenfilename(
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("Gzipped CSV files", "*.csv.gz"), ("All files", "*.*")]
         )
 
         if not file_path:
             return
+        if self.transfer_job is not None:
+            mb.showerror("Busy", "An import or export is already running.")
+            return
+
+        self.transfer_path = file_path
+        self.transfer_count = 0
+        self.transfer_skipped = 0
+        self.transfer_errors = []
+        self.start_transfer(BackgroundJob(read_reminder_chunks(file_path, CSV_CHUNK_SIZE)), "Importing")
+
+    def start_transfer(self, job, action):
+        self.transfer_job = job
+        self.transfer_started = time.perf_counter()
+        self.transfer_action = action
+        self.transfer_label.config(text=f"{action} {self.transfer_path}...")
+        self.transfer_progress.config(value=0)
+        self.transfer_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(8, 0))
+        job.start()
+        self.poll_transfer()
+
+    def poll_transfer(self):
+        """Applies at most one message from the running import/export job per call."""
+        job = self.transfer_job
+        try:
+            kind, payload = job.queue.get_nowait()
+        except queue.Empty:
+            self.root.after(TRANSFER_POLL_MS, self.poll_transfer)
+            return
+
+        if kind == "step" and self.transfer_action == "Importing":
+            self.apply_import_chunk(*payload)
+        elif kind == "step":
+            self.transfer_count = payload
+            self.transfer_label.config(text=f"Exported {payload} reminders...")
+        elif kind == "failed":
+            print(f"Error {self.transfer_action.lower()} reminders: {payload}")
+            self.finish_transfer()
+            mb.showerror("Error", f"{self.transfer_action} failed: {payload}")
+            return
+        else:
+            self.finish_transfer()
+            return
+        self.root.after(1, self.poll_transfer)
+
+    def apply_import_chunk(self, reminders, errors, progress):
+        now = datetime.datetime.now()
+        added, duplicates = self.storage.put_new(reminders)
+        for reminder in added:
+            self.scheduler.schedule(reminder, now)
+        for reminder in duplicates:
+            print(f"Skipping duplicate reminder with ID: {reminder['id']}")
+        self.transfer_count += len(added)
+        self.transfer_skipped += len(duplicates)
+        for line_num, message, row in errors:
+            print(f"Skipping line {line_num} ({message}): {row}")
+        self.transfer_errors.extend(errors)
+        # Persist per chunk so the pending changes never hold the whole file
+        self.save_reminders()
+        self.transfer_progress.config(value=progress * 100)
+        self.transfer_label.config(text=f"Imported {self.transfer_count} reminders...")
+
+    def finish_transfer(self):
+        action = self.transfer_action
+        self.transfer_job = None
+        self.transfer_frame.pack_forget()
+        if self.metrics is not None:
+            # The whole file, including the worker thread and the polling delays
+            self.metrics.observe("import_file" if action == "Importing" else "export_file",
+                                 time.perf_counter() - self.transfer_started)
+        if action == "Exporting":
+            print(f"Reminders exported to {self.transfer_path}")
+            return
 
+        print(f"Successfully imported {self.transfer_count} reminders from {self.transfer_path}")
+        self.schedule_reminder_check()
+        self.invalidate_all()
+        if self.transfer_errors or self.transfer_skipped:
+            details = "\n".join(f"Line {line_num}: {message}" for line_num, message, _ in self.transfer_errors[:10])
+            if len(self.transfer_errors) > 10:
+                details += f"\n... and {len(self.transfer_errors) - 10} more"
+            mb.showwarning(
+                "Import finished",
+                f"Imported {self.transfer_count} reminders, skipped {self.transfer_skipped} duplicates "
+                f"and {len(self.transfer_errors)} invalid rows.\n{details}")
+
+    def convert_storage_format(self):
+        """Switches REMINDERS_FILE between the JSON and the binary snapshot format."""
+        if not hasattr(self.storage, "convert"):
+            mb.showinfo("Storage Format", f"The {STORAGE_BACKEND} backend has no snapshot file to convert.")
+            return
+        target = "json" if self.storage.snapshot_format == "binary" else "binary"
         try:
-            with open(file_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                header = next(reader)
-
-                try:
-                     id_col = header.index("ID")
-                     date_col = header.index("Date")
-                     time_col = header.index("Time")
-                     title_col = header.index("Title")
-                     desc_col = header.index("Description")
-                     recurrence_col = header.index("Recurrence")
-                except ValueError:
-                     id_col = -1
-                     date_col = 0
-                     time_col = 1
-                     title_col = 2
-                     desc_col = 3
-                     recurrence_col = 4
-
-                imported_count = 0
-                for row in reader:
-                    # Check if row has enough columns based on the highest index
-                    if len(row) > max(date_col, time_col, title_col, desc_col, recurrence_col) and (id_col == -1 or len(row) > id_col):
-                        reminder_id = row[id_col] if id_col != -1 and len(row) > id_col else str(uuid.uuid4())
-                        try:
-                            date = row[date_col] if len(row) > date_col else ""
-                            time = row[time_col] if len(row) > time_col else ""
-                            title = row[title_col] if len(row) > title_col else ""
-                            desc = row[desc_col] if len(row) > desc_col else ""
-                            recurrence = row[recurrence_col] if len(row) > recurrence_col else ""
-
-
-                            # Basic validation for imported data
-                            datetime.datetime.strptime(date, "%Y-%m-%d")
-                            if time:
-                                 datetime.datetime.strptime(time, "%H:%M")
-                            valid_recurrences = ["", "daily", "weekly", "monthly"]
-                            if recurrence not in valid_recurrences:
-                                 recurrence = ""
-
-                            new_reminder = {
-                                'id': reminder_id,
-                                'date': date,
-                                'time': time,
-                                'title': title,
-                                'desc': desc,
-                                'recurrence': recurrence
-                            }
-
-                            if date not in self.reminders:
-                                self.reminders[date] = []
-
-                            if reminder_id not in [r.get('id', '') for r in self.reminders[date]]: # Use .get for ID check
-                                 self.reminders[date].append(new_reminder)
-                                 imported_count += 1
-                            else:
-                                 print(f"Skipping duplicate reminder with ID: {reminder_id}")
-
-                        except ValueError:
-                            print(f"Skipping row with invalid date or time format: {row}")
-                        except IndexError:
-                             print(f"Skipping invalid row format: {row}")
-                    else:
-                        print(f"Skipping invalid row length: {row}")
-
-
-            print(f"Successfully imported {imported_count} reminders from {file_path}")
-            self.save_reminders()
-            self.update_sidebar()
-            self.update_search_results()
-            if self.current_date:
-                self.display_reminders(self.current_date)
-            self.update_calendar() # Update calendar highlighting
-
-
-        except FileNotFoundError:
-            print(f"Error: File not found at {file_path}")
+            self.storage.convert(target)
         except Exception as e:
-            print(f"Error importing reminders: {e}")
+            mb.showerror("Error", f"Failed to convert reminders: {e}")
+            return
+        mb.showinfo("Storage Format", f"{REMINDERS_FILE} is now saved in the {target} format.")
 
     def save_reminders(self):
         try:
-            with open("reminders.json", "w", encoding="utf-8") as f:
-                json.dump(self.reminders, f, indent=2)
+            self.storage.save()
         except Exception as e:
             print(f"Error saving reminders: {e}")
 
+    def schedule_save(self):
+        """Saves after SAVE_DELAY_MS, once for all the changes made until then."""
+        if self._save_job is None:
+            self._save_job = self.root.after(SAVE_DELAY_MS, self.flush_save)
+
+    def flush_save(self):
+        """Saves the pending changes now instead of when the write-behind timer fires."""
+        if self._save_job is not None:
+            self.root.after_cancel(self._save_job)
+            self._save_job = None
+        self.save_reminders()
+
     def load_reminders(self):
         try:
-            with open("reminders.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # Convert keys to str and values to list of dicts
-                self.reminders = {str(k): v for k, v in data.items()}
-        except FileNotFoundError:
-            self.reminders = {}
+            self.storage.load()
         except Exception as e:
             print(f"Error loading reminders: {e}")
-            self.reminders = {}
+        self.firing_log.load()
+        # Indexing waits for the window to show, but not for the first keystroke
+        self.root.after_idle(self.prepare_search)
+
+    def prepare_search(self):
+        try:
+            self.storage.prepare_search()
+        except Exception as e:
+            print(f"Error indexing reminders: {e}")
+
+    def sync_storage(self):
+        """Periodically forces batched storage writes to disk."""
+        try:
+            self.storage.sync()
+        except Exception as e:
+            print(f"Error syncing reminders: {e}")
+        self.root.after(STORAGE_SYNC_MS, self.sync_storage)
+
+    def watch_storage(self):
+        """Periodically merges reminders other instances saved and refreshes what shows them."""
+        try:
+            changed = self.storage.poll_changes()
+        except Exception as e:
+            print(f"Error reading changes to reminders: {e}")
+            changed = set()
+        if changed is None or changed:
+            self.apply_external_changes(changed)
+        self.root.after(STORAGE_WATCH_MS, self.watch_storage)
+
+    def apply_external_changes(self, changed):
+        """Refreshes the views after other processes changed the reminders in `changed`, None for unknown."""
+        if changed is None:
+            self.refresh_scheduler()
+        else:
+            now = datetime.datetime.now()
+            for reminder_id in changed:
+                reminder = self.storage.get(reminder_id)
+                if reminder is None:
+                    self.scheduler.unschedule(reminder_id)
+                else:
+                    self.scheduler.schedule(reminder, now)
+        self.schedule_reminder_check()
+        # The versions replaced are gone, so what showed them is unknown
+        self.invalidate_all()
+
+    def invalidate(self, *views):
+        """Marks views to redraw: "calendar", "today", "agenda", "reminders" (the selected date) or "search".
+
+        They are redrawn together on the next idle pass, each once however often it
+        was invalidated until then.
+        """
+        self._dirty_views.update(views)
+        if self._refresh_job is None:
+            self._refresh_job = self.root.after_idle(self.refresh_views)
+
+    def invalidate_all(self):
+        self.invalidate("calendar", "today", "agenda", "reminders", "search")
+
+    def invalidate_reminders(self, reminders):
+        """Invalidates the views that show any of `reminders`, Reminder records added, changed or deleted.
+
+        Pass the previous version of a changed reminder too, so the views it left are redrawn.
+        """
+        today = datetime.date.today()
+        agenda = (today.toordinal(), today.toordinal() + AGENDA_DAYS - 1)
+        month = (datetime.date(self.year, self.month, 1).toordinal(),
+                 datetime.date(self.year, self.month, calendar.monthrange(self.year, self.month)[1]).toordinal())
+        today = today.isoformat()
+        searching = bool(self.search_var.get().strip())
+        views = set()
+        for reminder in reminders:
+            date = reminder['date']
+            if date == today:
+                views.add("today")
+            if date == self.current_date:
+                views.add("reminders")
+            if reminder.tags or searching:
+                views.add("search")  # the results, or the tag counts
+            if reminder.ordinal:
+                # The days it can fall on; recurring reminders without an end date never stop
+                last = reminder.ordinal if reminder.rule == ONCE else reminder.end_ordinal or datetime.date.max.toordinal()
+                for view, (start, end) in (("agenda", agenda), ("calendar", month)):
+                    if reminder.ordinal <= end and last >= start:
+                        views.add(view)
+        if views:
+            self.invalidate(*views)
+
+    def refresh_views(self):
+        """Redraws the invalidated views, at once when called directly."""
+        if self._refresh_job is not None:
+            self.root.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        dirty, self._dirty_views = self._dirty_views, set()
+        if "calendar" in dirty:
+            self.update_calendar()
+        if "today" in dirty:
+            self.update_today()
+        if "agenda" in dirty:
+            self.update_agenda()
+        if "reminders" in dirty and self.current_date:
+            self.display_reminders(self.current_date)
+        if "search" in dirty:
+            if self.search_var.get().strip():
+                self.update_search_results()  # recounts the tag facets too
+            else:
+                self.update_tag_facets()
+
+    def create_metrics(self):
+        metrics = Metrics()
+        metrics.instrument(self, INSTRUMENTED_METHODS)
+        # Gauges are read when the stats are shown or saved, not kept up to date
+        metrics.gauge("store_reminders", lambda: self.storage.count())
+        metrics.gauge("scheduled_reminders", lambda: len(self.scheduler))
+        metrics.gauge("cached_months", lambda: len(self.storage.occupancy))
+        metrics.gauge("search_results", lambda: len(self.search_results))
+        metrics.gauge("widgets", self.count_widgets)
+        metrics.gauge("notifications_delivered", lambda: self.notifier.stats()['delivered'])
+        metrics.gauge("notifications_failed", lambda: self.notifier.stats()['failures'])
+        return metrics
+
+    def count_widgets(self):
+        count = 0
+        pending = [self.root]
+        while pending:
+            widget = pending.pop()
+            count += 1
+            pending.extend(widget.winfo_children())
+        return count
+
+    def show_stats(self):
+        window = tk.Toplevel(self.root)
+        window.title("Debug Stats")
+        text = tk.Text(window, width=80, height=30, font=("Courier", 10))
+        text.pack(fill=tk.BOTH, expand=True)
+        text.insert("1.0", self.metrics.summary())
+        text.config(state=tk.DISABLED)
+
+    def save_stats(self, fmt):
+        extension = ".json" if fmt == "json" else ".prom"
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=extension,
+            filetypes=[("JSON files", "*.json")] if fmt == "json" else [("Prometheus text", "*.prom *.txt")]
+        )
+        if not file_path:
+            return
+        try:
+            self.metrics.dump(file_path, fmt)
+        except OSError as e:
+            mb.showerror("Error", f"Failed to save stats: {e}")
+
+    def on_close(self):
+        self.flush_save()
+        if self.firing_log.last_processed is not None:
+            self.save_firing_log()
+        if self.metrics is not None and METRICS_FILE:
+            try:
+                self.metrics.dump(METRICS_FILE)
+            except OSError as e:
+                print(f"Error saving stats: {e}")
+        self.notifier.close()
+        try:
+            self.storage.close()
+        except Exception as e:
+            print(f"Error closing reminders storage: {e}")
+        self.root.destroy()
 
 
 # Assuming notify_reminder is defined elsewhere, e.g.:
@@ -921,6 +1419,15 @@ class CalendarApp:
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Calendar and reminder application.")
+    parser.add_argument("--metrics", action="store_true", help="record timings and sizes, shown in a Debug menu")
+    parser.add_argument("--metrics-file", help="write the stats here on exit, JSON if it ends in .json, "
+                                               "Prometheus text otherwise")
+    args = parser.parse_args()
+    if args.metrics or args.metrics_file:
+        METRICS_ENABLED = True
+    if args.metrics_file:
+        METRICS_FILE = args.metrics_file
     root = tk.Tk()
     app = CalendarApp(root)
     print("Styling and layout improvements applied. - BABA ")
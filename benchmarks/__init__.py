@@ -0,0 +1 @@
+"""Benchmarks for CalendarApp, see benchmarks/run.py."""
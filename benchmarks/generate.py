@@ -0,0 +1,82 @@
+"""Generates synthetic reminders.json stores for benchmarking.
+
+    python -m benchmarks.generate 100000 -o reminders.json
+"""
+import argparse
+import datetime
+import json
+import random
+import uuid
+
+# Share of one-off, daily, weekly and monthly reminders
+RECURRENCE_WEIGHTS = {"": 70, "daily": 15, "weekly": 10, "monthly": 5}
+COMMON_WORDS = ["call", "meeting", "pay", "dentist", "gym", "birthday", "review", "standup", "lunch", "rent",
+                "school", "pickup", "report", "flight", "doctor", "invoice", "groceries", "yoga", "team", "plan"]
+
+
+def _words(rng, count):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(count)]
+
+
+def generate_store(count, seed=0, anchor=None):
+    """Returns a date -> reminders mapping with `count` reminders.
+
+    Dates cluster around `anchor` (default today): most fall within two months of
+    it and the rest spread over three years either side. Tags follow a Zipf-like
+    distribution, and half of the recurring reminders have an end date.
+    """
+    rng = random.Random(seed)
+    anchor = anchor or datetime.date.today()
+    vocabulary = COMMON_WORDS * 10 + _words(rng, 500)
+    tag_pool = ["work", "home", "family", "health", "finance", "birthday", "important", "travel"] + _words(rng, 42)
+    tag_weights = [1 / (rank + 1) for rank in range(len(tag_pool))]
+    recurrences = list(RECURRENCE_WEIGHTS)
+    recurrence_weights = list(RECURRENCE_WEIGHTS.values())
+
+    reminders = {}
+    for _ in range(count):
+        if rng.random() < 0.8:
+            offset = int(rng.triangular(-60, 60, 5))
+        else:
+            offset = rng.randint(-3 * 365, 3 * 365)
+        day = anchor + datetime.timedelta(days=offset)
+        recurrence = rng.choices(recurrences, recurrence_weights)[0]
+        end_date = ""
+        if recurrence and rng.random() < 0.5:
+            end_date = (day + datetime.timedelta(days=rng.randint(7, 365))).isoformat()
+        time = "" if rng.random() < 0.1 else f"{rng.randint(6, 22):02d}:{rng.choice([0, 15, 30, 45]):02d}"
+        tags = sorted(set(rng.choices(tag_pool, tag_weights, k=rng.randint(0, 3))))
+        reminder = {
+            'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            'date': day.isoformat(),
+            'time': time,
+            'title': " ".join(rng.choices(vocabulary, k=rng.randint(2, 4))).capitalize(),
+            'desc': " ".join(rng.choices(vocabulary, k=rng.randint(0, 10))),
+            'recurrence': recurrence,
+            'end_date': end_date,
+            'tags': tags,
+        }
+        reminders.setdefault(reminder['date'], []).append(reminder)
+    return reminders
+
+
+def write_store(path, reminders):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(reminders, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic reminders.json store.")
+    parser.add_argument("count", type=int)
+    parser.add_argument("-o", "--output", default="reminders.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--anchor", help="date the store clusters around, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+    anchor = datetime.date.fromisoformat(args.anchor) if args.anchor else None
+    write_store(args.output, generate_store(args.count, args.seed, anchor))
+    print(f"Wrote {args.count} reminders to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
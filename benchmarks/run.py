@@ -0,0 +1,253 @@
+"""Times the hot paths of CalendarApp against synthetic stores of several sizes.
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.run --sizes 1000000 --repeat 3 --compare results.json
+
+Widgets are replaced by stubs unless --tk is given, in which case a withdrawn Tk
+root is used (this needs a display, e.g. xvfb-run). Each store is generated in a
+temporary directory, which becomes the working directory while it is measured.
+"""
+import argparse
+import collections
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter
+
+import App
+from benchmarks.generate import generate_store, write_store
+from reminder_core.csv_io import read_reminder_chunks, write_reminders
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SEARCH_QUERIES = ["meeting", "dentist", "work", "zzq"]
+# Share of the store written to the CSV file that import_reminders reads
+IMPORT_FRACTION = 0.1
+
+
+class StubWidget:
+    """Accepts any widget call and does nothing, counting the calls made."""
+
+    calls = 0
+
+    def __init__(self, *args, text="", **kwargs):
+        StubWidget.calls += 1
+        self.text = text
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            StubWidget.calls += 1
+            return ""
+        return call
+
+    def get(self, *args):
+        return self.text
+
+    def get_children(self, *args):
+        return ()
+
+    def winfo_children(self):
+        return []
+
+
+class StubModule:
+    """Stands in for tkinter, ttk, messagebox and filedialog in App."""
+
+    TclError = tkinter.TclError
+
+    def __getattr__(self, name):
+        if name.isupper():
+            return name.lower()  # constants such as tk.END
+        if name.startswith("ask") or name.startswith("show"):
+            return lambda *args, **kwargs: ""
+        return StubWidget
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def make_app(use_tk):
+    """Builds a CalendarApp in the working directory, with real or stub widgets."""
+    if use_tk:
+        root = tkinter.Tk()
+        root.withdraw()
+        return App.CalendarApp(root)
+
+    stub = StubModule()
+    App.tk = App.ttk = App.mb = App.filedialog = stub
+    return App.CalendarApp(StubWidget())
+
+
+def measure(fn, repeat, setup=None):
+    """Runs fn `repeat` times and returns the duration of each run in seconds."""
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def bench_size(size, repeat, use_tk, seed, backend):
+    """Generates a store of `size` reminders and times every operation against it."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="reminder-bench-") as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            today = datetime.date.today()
+            write_store(App.REMINDERS_FILE, generate_store(size, seed))
+            import_path = os.path.join(workdir, "import.csv")
+            for _ in write_reminders(import_path, (r for rs in generate_store(max(1, int(size * IMPORT_FRACTION)), seed + 1).values() for r in rs)):
+                pass
+
+            App.STORAGE_BACKEND = backend
+            start = time.perf_counter()
+            app = make_app(use_tk)
+            results.append(_result(size, "startup", [time.perf_counter() - start], 0))
+            # Delivering notifications is not measured, and must not beep
+            app.notifier.backends = []
+            rules = [(r['date'], r['recurrence']) for r in app.storage.all() if r.get('recurrence', '')]
+            some_reminder = next(app.storage.all())
+            busiest_date = collections.Counter(r['date'] for r in app.storage.all()).most_common(1)[0][0]
+
+            def fresh_storage():
+                app.storage.close()
+                app.storage = App.open_storage(backend, App.REMINDERS_FILE, App.REMINDERS_DB,
+                                               use_journal=App.USE_JOURNAL, shard_dir=App.REMINDERS_DIR,
+                                               snapshot_format=App.SNAPSHOT_FORMAT)
+
+            def touch():
+                app.storage.put(dict(app.storage.get(some_reminder['id']), title="Benchmark edit"))
+
+            def search():
+                for query in SEARCH_QUERIES:
+                    if use_tk:
+                        app.search_var.set(query)
+                    else:
+                        app.search_var.text = query
+                    app.update_search_results()
+
+            def next_occurrences():
+                for date, recurrence in rules:
+                    app.calculate_next_occurrence(date, recurrence, today)
+
+            def switch_months():
+                for _ in range(12):
+                    app.next_month()
+                for _ in range(12):
+                    app.prev_month()
+
+            def import_csv():
+                app.transfer_path, app.transfer_action = import_path, "Importing"
+                app.transfer_count, app.transfer_skipped, app.transfer_errors = 0, 0, []
+                for chunk in read_reminder_chunks(import_path, App.CSV_CHUNK_SIZE):
+                    app.apply_import_chunk(*chunk)
+                app.finish_transfer()
+                app.refresh_views()  # the redraw the app leaves to the next idle pass
+
+            ops = [
+                ("load_reminders", app.load_reminders, fresh_storage),
+                ("save_reminders", app.save_reminders, touch),
+                ("update_search_results", search, None),
+                ("refresh_scheduler", app.refresh_scheduler, None),
+                ("check_reminders", app.check_reminders, None),
+                ("calculate_next_occurrence", next_occurrences, None),
+                ("highlight_calendar_dates", app.highlight_calendar_dates, None),
+                ("update_calendar", app.update_calendar, None),
+                # A year forward and back, the first pass fills the occupancy cache
+                ("switch_months", switch_months, None),
+                ("update_sidebar", app.update_sidebar, None),
+                ("display_reminders", lambda: app.display_reminders(busiest_date), None),
+                # Re-importing the same file only finds duplicates, so it runs once
+                ("import_reminders", import_csv, None),
+            ]
+            with contextlib.redirect_stdout(io.StringIO()):
+                for name, fn, setup in ops:
+                    calls = StubWidget.calls
+                    durations = measure(fn, 1 if name == "import_reminders" else repeat, setup)
+                    results.append(_result(size, name, durations, StubWidget.calls - calls))
+            app.notifier.close()
+            app.storage.close()
+            if use_tk:
+                app.root.destroy()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def _result(size, name, durations, widget_calls):
+    return {
+        "size": size,
+        "op": name,
+        "runs": len(durations),
+        "min_s": min(durations),
+        "median_s": statistics.median(durations),
+        "max_s": max(durations),
+        "widget_calls": widget_calls,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["size"], r["op"]): r for r in json.load(f)["results"]}
+    print(f"{'size':>9} {'operation':<28} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for r in results:
+        old = baseline.get((r["size"], r["op"]))
+        if old is None:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        print(f"{r['size']:>9} {r['op']:<28} {old['median_s']:>10.4f} {r['median_s']:>10.4f} {ratio:>7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CalendarApp against synthetic reminder stores.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="store sizes (default: 1k, 10k, 100k)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per operation (default: 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["json", "sqlite", "sharded"], default="json")
+    parser.add_argument("--tk", action="store_true", help="use real Tk widgets instead of stubs")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="print the change against an earlier results file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size} reminders...", file=sys.stderr)
+        results.extend(bench_size(size, args.repeat, args.tk, args.seed, args.backend))
+
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "backend": args.backend,
+        "widgets": "tk" if args.tk else "stub",
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Reminder store, recurrence, search and persistence, usable without Tk.
+
+Run ``python -m reminder_core --help`` for the command-line interface.
+"""
+from .model import make_reminder, parse_tags
+from .occupancy import MonthOccupancy
+from .record import Reminder
+from .recurrence import next_occurrence, occurrences_between
+from .rules import Rule, compile_rule
+from .scheduler import ReminderScheduler
+from .sharded import ShardedStorage
+from .storage import JsonStorage, ReminderStorage, SqliteStorage, open_storage
@@ -0,0 +1,155 @@
+"""Compact binary encoding of a reminders.json snapshot.
+
+Layout, all integers little-endian:
+
+    header   magic, version, flags, string count, string bytes, record count,
+             tag count, CRC-32 of everything after the header
+    strings  string count + 1 offsets (u32) into a UTF-8 blob, padded to 4 bytes
+    records  one fixed-size _RECORD per reminder
+    tags     tag count string references (u32), sliced by each record
+    dates    date count (u32) and a string reference (u32) per date key, in
+             order, empty ones included
+
+Every text value is stored once in the string table and referenced by index.
+A reference with the _JSON bit set points at the JSON text of a value that is
+not a string (an integer id, the `extra` mapping of a record), so any snapshot
+the JSON format can hold round-trips unchanged, down to the order of its date
+keys and dates whose list is empty. Records and tag lists are read through
+memoryviews of the file, normally an mmap, without copying them.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+from .record import Reminder, as_record
+
+MAGIC = b"RMDB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIIIII")
+# date key, id, ordinal, minutes, title, desc, end ordinal, extra, first tag, tag count, rule
+_RECORD = struct.Struct("<IIiiIIiIIHBx")
+_JSON = 0x80000000
+_NONE = 0xFFFFFFFF
+
+
+def _u32(view):
+    """Returns a sequence of the little-endian u32 values in `view`."""
+    if sys.byteorder == "little":
+        return view.cast("I")
+    values = array("I", view)
+    values.byteswap()
+    return values
+
+
+def encode(reminders):
+    """Returns the binary snapshot of a date -> reminders mapping."""
+    strings = {"": 0}
+
+    def ref(value):
+        flag = 0
+        if not isinstance(value, str):
+            value = json.dumps(value, separators=(',', ':'))
+            flag = _JSON
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index | flag
+
+    records = []
+    tags = array("I")
+    dates = array("I")
+    for date, reminders_list in reminders.items():
+        key = ref(date)
+        dates.append(key)
+        for reminder in map(as_record, reminders_list):
+            records.append(_RECORD.pack(
+                key, ref(reminder.id), reminder.ordinal, reminder.minutes, ref(reminder.title),
+                ref(reminder.desc), reminder.end_ordinal, ref(reminder.extra) if reminder.extra else _NONE,
+                len(tags), len(reminder.tags), reminder.rule))
+            tags.extend(ref(tag) for tag in reminder.tags)
+
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = array("I", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    blob = b"".join(encoded)
+    blob += b"\0" * (-len(blob) % 4)
+    dates.insert(0, len(dates))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        tags.byteswap()
+        dates.byteswap()
+    body = b"".join([offsets.tobytes(), blob, b"".join(records), tags.tobytes(), dates.tobytes()])
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(strings), len(blob), len(records), len(tags), zlib.crc32(body))
+    return header + body
+
+
+def decode(buffer):
+    """Returns the date -> reminders mapping stored in a binary snapshot.
+
+    `buffer` is any bytes-like object. Raises ValueError if it is not a binary
+    snapshot, was written by a newer version or fails the checksum.
+    """
+    with memoryview(buffer) as view:
+        if len(view) < _HEADER.size:
+            raise ValueError("Truncated binary snapshot")
+        magic, version, flags, string_count, string_bytes, record_count, tag_count, checksum = \
+            _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Not a binary reminder snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary snapshot version {version}")
+        body = view[_HEADER.size:]
+        views = []  # released before returning, so the caller can close an mmap
+
+        def part(start, end):
+            views.append(body[start:end])
+            return views[-1]
+
+        try:
+            records_at = (string_count + 1) * 4 + string_bytes
+            tags_at = records_at + record_count * _RECORD.size
+            dates_at = tags_at + tag_count * 4
+            if len(body) >= dates_at + 4:
+                views.append(_u32(part(dates_at, dates_at + 4)))
+                size = dates_at + 4 + 4 * views[-1][0]
+            else:
+                size = None
+            if len(body) != size or zlib.crc32(body) != checksum:
+                raise ValueError("Binary snapshot is corrupt (checksum mismatch)")
+            offsets = _u32(part(0, (string_count + 1) * 4))
+            views.append(offsets)
+            blob = part((string_count + 1) * 4, records_at)
+            strings = [str(blob[offsets[i]:offsets[i + 1]], "utf-8") for i in range(string_count)]
+            tag_refs = _u32(part(tags_at, dates_at))
+            views.append(tag_refs)
+            intern = sys.intern
+
+            def value(index):
+                return strings[index] if index < _JSON else json.loads(strings[index & ~_JSON])
+
+            reminders = {}
+            date_refs = _u32(part(dates_at + 4, None))
+            views.append(date_refs)
+            for key in date_refs:
+                reminders[strings[key]] = []
+            for (key, reminder_id, ordinal, minutes, title, desc, end_ordinal, extra, first_tag, tag_len,
+                 rule) in _RECORD.iter_unpack(part(records_at, tags_at)):
+                reminder = Reminder.from_fields(
+                    value(reminder_id), ordinal, minutes, value(title), value(desc), rule, end_ordinal,
+                    tuple(intern(strings[i]) for i in tag_refs[first_tag:first_tag + tag_len]),
+                    value(extra) if extra != _NONE else None)
+                date = strings[key]
+                reminders_list = reminders.get(date)
+                if reminders_list is None:
+                    reminders_list = reminders[date] = []
+                reminders_list.append(reminder)
+            return reminders
+        finally:
+            for released in reversed(views):
+                if isinstance(released, memoryview):
+                    released.release()
+            body.release()
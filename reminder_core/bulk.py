@@ -0,0 +1,156 @@
+"""Edits applied to many reminders at once, such as the results of a search.
+
+An operation is a function taking a Reminder record and returning its new
+version as a dict, None to delete it, or the reminder itself to leave it alone.
+The helpers below validate their arguments once, when the operation is made,
+so a batch either applies completely or raises before anything changed.
+"""
+import datetime
+
+from .model import VALID_RECURRENCES, parse_tags
+from .rules import format_rule, normalize_rule, parse_rule
+
+# Operations the app and the command line offer, by name, with the text value each takes
+ACTIONS = {
+    "delete": "Delete",
+    "tag": "Add tags (comma-separated)",
+    "untag": "Remove tags (comma-separated)",
+    "shift": "Shift dates by days",
+    "recurrence": "Set recurrence",
+    "end-date": "Set end date (YYYY-MM-DD, blank to clear)",
+}
+
+
+def _shift(ordinal, days):
+    return datetime.date.fromordinal(ordinal + days).isoformat()
+
+
+def delete():
+    return lambda reminder: None
+
+
+def retag(add=(), remove=()):
+    """Adds the tags `add` and drops the tags `remove`, both compared case-insensitively."""
+    removed = {tag.lower() for tag in remove}
+
+    def change(reminder):
+        tags = [tag for tag in reminder.get('tags', []) if tag.lower() not in removed]
+        present = {tag.lower() for tag in tags}
+        for tag in add:
+            if tag.lower() not in present:
+                present.add(tag.lower())
+                tags.append(tag)
+        return dict(reminder, tags=tags) if tags != reminder.get('tags', []) else reminder
+    return change
+
+
+def shift_dates(days):
+    """Moves reminders by `days`, their end date, UNTIL and EXDATE dates included.
+
+    Rules with BYDAY or BYMONTHDAY keep matching the same weekdays and days of
+    the month; only the dates bounding them move.
+    """
+    if not days:
+        return lambda reminder: reminder
+
+    def change(reminder):
+        if not reminder.ordinal:
+            return reminder  # nothing to shift from an unparsable date
+        changed = dict(reminder, date=_shift(reminder.ordinal, days))
+        if reminder.end_ordinal:
+            changed['end_date'] = _shift(reminder.end_ordinal, days)
+        recurrence = reminder['recurrence']
+        if isinstance(recurrence, str) and recurrence not in VALID_RECURRENCES:
+            try:
+                rule = parse_rule(recurrence)
+            except ValueError:
+                return changed
+            delta = datetime.timedelta(days=days)
+            if rule['until'] is not None:
+                rule['until'] += delta
+            rule['exdates'] = tuple(day + delta for day in rule['exdates'])
+            changed['recurrence'] = format_rule(rule)
+        return changed
+    return change
+
+
+def set_recurrence(recurrence):
+    """Gives reminders a new recurrence, "" to make them one-off."""
+    recurrence = recurrence.strip().lower()
+    if recurrence not in VALID_RECURRENCES:
+        recurrence = normalize_rule(recurrence)
+
+    def change(reminder):
+        return dict(reminder, recurrence=recurrence) if reminder['recurrence'] != recurrence else reminder
+    return change
+
+
+def set_end_date(end_date):
+    """Gives reminders a new end date, "" to remove it."""
+    end_date = end_date.strip()
+    if end_date:
+        try:
+            datetime.datetime.strptime(end_date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("Invalid end date format. Please use YYYY-MM-DD.")
+
+    def change(reminder):
+        return dict(reminder, end_date=end_date) if reminder['end_date'] != end_date else reminder
+    return change
+
+
+def operation(action, value=""):
+    """Returns the operation named `action` in ACTIONS, parsing its argument from the text `value`."""
+    if action == "delete":
+        return delete()
+    if action in ("tag", "untag"):
+        tags = parse_tags(value)
+        if not tags:
+            raise ValueError("Enter the tags to add or remove.")
+        return retag(add=tags) if action == "tag" else retag(remove=tags)
+    if action == "shift":
+        try:
+            days = int(value)
+        except ValueError:
+            raise ValueError("Enter the number of days to shift by, negative to move back.")
+        return shift_dates(days)
+    if action == "recurrence":
+        return set_recurrence(value)
+    if action == "end-date":
+        return set_end_date(value)
+    raise ValueError(f"Unknown bulk action: {action}")
+
+
+def plan(reminders, operation):
+    """Returns (updated, deleted) for `reminders`: new versions to put and ids to delete.
+
+    Reminders the operation leaves unchanged are in neither. Nothing is stored.
+    """
+    updated = []
+    deleted = []
+    seen = set()
+    for reminder in reminders:
+        if reminder.id in seen:
+            continue
+        seen.add(reminder.id)
+        changed = operation(reminder)
+        if changed is None:
+            deleted.append(reminder.id)
+        elif changed is not reminder:
+            updated.append(changed)
+    return updated, deleted
+
+
+def commit(storage, updated, deleted):
+    """Stores a plan() and returns (stored records, removed records).
+
+    Nothing is saved: the caller saves once for the whole batch.
+    """
+    stored = [storage.put(reminder) for reminder in updated]
+    removed = [reminder for reminder in map(storage.delete, deleted) if reminder is not None]
+    return stored, removed
+
+
+def apply(storage, reminders, operation):
+    """Applies `operation` to `reminders` as one batch, every new version computed before the first change."""
+    return commit(storage, *plan(reminders, operation))
@@ -0,0 +1,209 @@
+import argparse
+import datetime
+import sys
+
+from .model import make_reminder, parse_tags
+from .storage import open_storage
+
+
+def _format(date, reminder):
+    text = f"{date} {reminder.get('time', '') or '--:--'}  {reminder.get('title', '')}"
+    if reminder.get('recurrence', ''):
+        text += f" ({reminder['recurrence']})"
+    if reminder.get('tags', []):
+        text += f" [{', '.join(reminder['tags'])}]"
+    return text + f"  {reminder.get('id', '')}"
+
+
+def _parse_day(text):
+    try:
+        return datetime.datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid date format. Please use YYYY-MM-DD.")
+
+
+def cmd_list(storage, args):
+    """Lists every occurrence, one-off or recurring, from a date for a number of days."""
+    start = _parse_day(args.date) if args.date else datetime.date.today()
+    end = start + datetime.timedelta(days=args.days)
+    for day, reminder in storage.occurrences_between(start.isoformat(), end.isoformat(), args.limit):
+        print(_format(day.isoformat(), reminder))
+
+
+def cmd_add(storage, args):
+    reminder = make_reminder(args.date, args.time, args.title, desc=args.desc, recurrence=args.recurrence,
+                             end_date=args.end_date, tags=parse_tags(args.tags))
+    storage.put(reminder)
+    storage.save()
+    print(reminder['id'])
+
+
+def cmd_due(storage, args):
+    """Prints the reminders that fired within the last `minutes` minutes, for cron jobs.
+
+    With --log or --webhook they are also delivered there, as one batch.
+    """
+    from .scheduler import ReminderScheduler
+
+    now = datetime.datetime.now()
+    since = now - datetime.timedelta(minutes=args.minutes - 1)
+    scheduler = ReminderScheduler()
+    tomorrow = now.date() + datetime.timedelta(days=1)
+    scheduler.rebuild(storage.between(since.date().isoformat(), tomorrow.isoformat()), since)
+    due = scheduler.pop_due(now)
+    for fire_time, reminder in due:
+        print(_format(fire_time.strftime("%Y-%m-%d"), reminder))
+
+    backends = []
+    if args.log:
+        from .notify import LogFileBackend
+        backends.append(LogFileBackend(args.log))
+    if args.webhook:
+        from .notify import WebhookBackend
+        backends.append(WebhookBackend(args.webhook))
+    if due:
+        for backend in backends:
+            backend.send(due)
+
+
+def cmd_search(storage, args):
+    for date, reminder in sorted(storage.find(args.query), key=lambda x: (x[0], x[1].minutes)):
+        print(_format(date, reminder))
+
+
+def cmd_bulk(storage, args):
+    """Applies one change to every reminder matching --query and the date filters, with one save."""
+    from . import bulk
+
+    if not (args.query or args.before or args.after or args.all):
+        raise ValueError("Select the reminders with --query, --before or --after, or pass --all")
+    operation = bulk.operation(args.action, args.value)
+    reminders = [reminder for _, reminder in storage.find(args.query)] if args.query else storage.all()
+    if args.after:
+        after = _parse_day(args.after).toordinal()
+        reminders = [reminder for reminder in reminders if reminder.ordinal >= after]
+    if args.before:
+        before = _parse_day(args.before).toordinal()
+        reminders = [reminder for reminder in reminders if reminder.ordinal < before]
+    updated, deleted = bulk.plan(list(reminders), operation)
+    if args.dry_run:
+        print(f"Would update {len(updated)} and delete {len(deleted)} reminders.")
+        return
+    stored, removed = bulk.commit(storage, updated, deleted)
+    storage.save()
+    print(f"Updated {len(stored)} and deleted {len(removed)} reminders.")
+
+
+def cmd_import(storage, args):
+    from .csv_io import read_reminder_chunks
+
+    imported = skipped = invalid = 0
+    for reminders, errors, progress in read_reminder_chunks(args.path):
+        added, duplicates = storage.put_new(reminders)
+        storage.save()
+        imported += len(added)
+        skipped += len(duplicates)
+        invalid += len(errors)
+        for line_num, message, row in errors:
+            print(f"Skipping line {line_num} ({message}): {row}", file=sys.stderr)
+    print(f"Imported {imported} reminders, skipped {skipped} duplicates and {invalid} invalid rows.")
+
+
+def cmd_export(storage, args):
+    from .csv_io import write_reminders
+
+    count = 0
+    for count in write_reminders(args.path, storage.snapshot()):
+        pass
+    print(f"Exported {count} reminders to {args.path}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m reminder_core", description="Manage reminders without the GUI.")
+    parser.add_argument("--backend", choices=["json", "sqlite", "sharded"], default="json", help="storage backend (default: json)")
+    parser.add_argument("--file", default="reminders.json", help="JSON store (default: reminders.json)")
+    parser.add_argument("--db", default="reminders.db", help="SQLite store (default: reminders.db)")
+    parser.add_argument("--dir", default="reminders.d", help="sharded store (default: reminders.d)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="list occurrences for a range of days")
+    p.add_argument("date", nargs="?", help="first day, YYYY-MM-DD (default: today)")
+    p.add_argument("--days", type=int, default=1, help="number of days (default: 1)")
+    p.add_argument("--limit", type=int, help="stop after this many occurrences")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("add", help="add a reminder")
+    p.add_argument("date", help="YYYY-MM-DD")
+    p.add_argument("title")
+    p.add_argument("--time", default="", help="HH:MM")
+    p.add_argument("--desc", default="")
+    p.add_argument("--recurrence", default="", help="daily, weekly, monthly or a rule such as FREQ=WEEKLY;INTERVAL=2;BYDAY=TU")
+    p.add_argument("--end-date", default="", help="YYYY-MM-DD")
+    p.add_argument("--tags", default="", help="comma-separated")
+    p.set_defaults(func=cmd_add)
+
+    p = commands.add_parser("due", help="print reminders that are due now")
+    p.add_argument("--minutes", type=int, default=1, help="look back this many minutes, e.g. the cron interval (default: 1)")
+    p.add_argument("--log", help="also append the reminders to this file")
+    p.add_argument("--webhook", help="also POST them to http://host:port/path or unix:///path/to/socket")
+    p.set_defaults(func=cmd_due)
+
+    p = commands.add_parser("search", help="search titles, descriptions and tags, tag:work and -tag:done filter")
+    p.add_argument("query")
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser("bulk", help="change or delete every reminder matching a query")
+    p.add_argument("action", choices=["delete", "tag", "untag", "shift", "recurrence", "end-date"])
+    p.add_argument("value", nargs="?", default="",
+                   help="tags for tag/untag, days for shift, the new recurrence or end date")
+    p.add_argument("--query", default="", help="search query, tag:work and -tag:done terms included")
+    p.add_argument("--after", help="only reminders dated on or after YYYY-MM-DD")
+    p.add_argument("--before", help="only reminders dated before YYYY-MM-DD")
+    p.add_argument("--all", action="store_true", help="every reminder, when there is no other filter")
+    p.add_argument("--dry-run", action="store_true", help="only count what would change")
+    p.set_defaults(func=cmd_bulk)
+
+    p = commands.add_parser("import", help="import a CSV file (optionally gzipped)")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser("export", help="export to CSV, gzipped if the path ends in .gz")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser("convert", help="convert the store between the JSON and binary snapshot formats")
+    p.add_argument("to", choices=["json", "binary"])
+    p.add_argument("--output", help="write the snapshot here instead of replacing --file")
+    p.set_defaults(func=cmd_convert)
+    return parser
+
+
+def cmd_convert(storage, args):
+    """Rewrites the JSON store in another snapshot format, or copies any store to --output."""
+    from .journal import write_snapshot
+
+    if args.output:
+        reminders = {}
+        for reminder in storage.all():
+            reminders.setdefault(reminder['date'], []).append(reminder)
+        write_snapshot(args.output, reminders, args.to)
+        print(f"Wrote {sum(map(len, reminders.values()))} reminders to {args.output} ({args.to})")
+    elif hasattr(storage, "convert"):
+        storage.convert(args.to)
+        print(f"Converted {storage.path} to {args.to}")
+    else:
+        raise ValueError(f"The {args.backend} backend has no snapshot file, use --output")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    storage = open_storage(args.backend, args.file, args.db, shard_dir=args.dir)
+    try:
+        storage.load()
+        args.func(storage, args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+    return 0
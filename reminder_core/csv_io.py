@@ -0,0 +1,158 @@
+import csv
+import datetime
+import gzip
+import io
+import os
+import queue
+import threading
+import uuid
+
+from .model import VALID_RECURRENCES, parse_tags
+from .rules import normalize_rule
+
+CSV_HEADER = ["ID", "Date", "Time", "Title", "Description", "Recurrence", "End Date", "Tags"]
+# Column positions assumed when a file has no recognisable header row
+DEFAULT_COLUMNS = {"Date": 0, "Time": 1, "Title": 2, "Description": 3, "Recurrence": 4}
+
+
+class RowError(ValueError):
+    """Raised for a CSV row that cannot be turned into a reminder."""
+
+
+def reminder_to_row(reminder):
+    return [
+        reminder.get('id', ''),
+        reminder.get('date', ''),
+        reminder.get('time', ''),
+        reminder.get('title', ''),
+        reminder.get('desc', ''),
+        reminder.get('recurrence', ''),
+        reminder.get('end_date', ''),
+        ', '.join(reminder.get('tags', [])),
+    ]
+
+
+def row_to_reminder(row, columns):
+    """Validates a CSV row and returns it as a reminder dict."""
+    def cell(name):
+        col = columns.get(name, -1)
+        return row[col].strip() if 0 <= col < len(row) else ""
+
+    if len(row) <= max(columns.get(name, -1) for name in DEFAULT_COLUMNS):
+        raise RowError("too few columns")
+    date = cell("Date")
+    time = cell("Time")
+    end_date = cell("End Date")
+    recurrence = cell("Recurrence").lower()
+    try:
+        datetime.datetime.strptime(date, "%Y-%m-%d")
+        if time:
+            datetime.datetime.strptime(time, "%H:%M")
+        if end_date:
+            datetime.datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        raise RowError("invalid date or time format")
+    if recurrence not in VALID_RECURRENCES:
+        try:
+            recurrence = normalize_rule(recurrence)
+        except ValueError:
+            recurrence = ""
+    return {
+        'id': cell("ID") or str(uuid.uuid4()),
+        'date': date,
+        'time': time,
+        'title': cell("Title"),
+        'desc': cell("Description"),
+        'recurrence': recurrence,
+        'end_date': end_date,
+        'tags': parse_tags(cell("Tags")),
+    }
+
+
+def read_reminder_chunks(path, chunk_size=1000):
+    """Streams a CSV file (optionally gzipped) as (reminders, errors, progress) chunks.
+
+    `errors` holds (line number, message, row) for rejected rows and `progress`
+    is the fraction of the file consumed so far.
+    """
+    total = os.path.getsize(path) or 1
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+        raw.seek(0)
+        binary = gzip.GzipFile(fileobj=raw) if compressed else raw
+        with io.TextIOWrapper(binary, encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first is None:
+                return
+            if "Date" in first:
+                columns = {name: first.index(name) for name in CSV_HEADER if name in first}
+                pending_rows = []
+            else:
+                # No header, the first row is already data
+                columns = dict(DEFAULT_COLUMNS)
+                pending_rows = [first]
+
+            reminders = []
+            errors = []
+            for row in _chain(pending_rows, reader):
+                if not any(row):
+                    continue
+                try:
+                    reminders.append(row_to_reminder(row, columns))
+                except RowError as e:
+                    errors.append((reader.line_num, str(e), row))
+                if len(reminders) + len(errors) >= chunk_size:
+                    yield reminders, errors, min(raw.tell() / total, 1.0)
+                    reminders = []
+                    errors = []
+            yield reminders, errors, 1.0
+
+
+def _chain(first_rows, reader):
+    yield from first_rows
+    yield from reader
+
+
+def write_reminders(path, reminders, progress_every=5000):
+    """Streams reminders to a CSV file, gzipped when the path ends in .gz.
+
+    Yields the number of rows written every `progress_every` rows and once at the end.
+    """
+    if path.endswith(".gz"):
+        f = gzip.open(path, "wt", encoding="utf-8", newline="")
+    else:
+        f = open(path, "w", encoding="utf-8", newline="")
+    count = 0
+    with f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for reminder in reminders:
+            writer.writerow(reminder_to_row(reminder))
+            count += 1
+            if count % progress_every == 0:
+                yield count
+    yield count
+
+
+class BackgroundJob(threading.Thread):
+    """Runs a generator in a worker thread and hands whatever it yields to a bounded queue.
+
+    The queue is read from the Tk main thread. Because it is bounded, a producer
+    that runs ahead of the UI blocks instead of buffering the whole file. The
+    last message is ("done", None) or ("failed", error message).
+    """
+
+    def __init__(self, steps, max_pending=4):
+        super().__init__(daemon=True)
+        self.steps = steps
+        self.queue = queue.Queue(maxsize=max_pending)
+
+    def run(self):
+        try:
+            for step in self.steps:
+                self.queue.put(("step", step))
+        except Exception as e:
+            self.queue.put(("failed", str(e)))
+        else:
+            self.queue.put(("done", None))
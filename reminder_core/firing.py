@@ -0,0 +1,87 @@
+import datetime
+import json
+
+from .journal import write_snapshot
+
+_FORMAT = "%Y-%m-%dT%H:%M"
+
+
+class FiringLog:
+    """Remembers which occurrences have fired, so none fires twice or gets skipped.
+
+    It records the last instant that was processed and the (reminder id, fire
+    time) of every occurrence fired within the catch-up window, and persists both
+    to `path`. After a gap (the app was closed, the machine slept, a timer ran
+    late) the scheduler is rebuilt from resume_point(), so everything that came
+    due in between fires once, unless it is older than `catch_up`.
+
+    Only fired occurrences have to be durable right away. When nothing fired the
+    saved instant may lag behind by up to `granularity`, which just makes a
+    restart look again at a span in which nothing was due.
+    """
+
+    def __init__(self, path, catch_up=datetime.timedelta(hours=12), granularity=datetime.timedelta(minutes=30)):
+        self.path = path
+        self.catch_up = catch_up
+        self.granularity = granularity
+        self.last_processed = None
+        self.fired = set()  # (reminder id, fire time as YYYY-MM-DDTHH:MM)
+        self._saved_processed = None  # last_processed as of the last load() or save()
+        self._unsaved_fires = False
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_processed = datetime.datetime.strptime(data['last_processed'], _FORMAT)
+            self.fired = {(reminder_id, fire) for reminder_id, fire in data['fired']}
+            self._saved_processed = self.last_processed
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            # Only costs duplicate or missed notifications, never reminders
+            print(f"Ignoring unreadable firing log {self.path}: {e}")
+
+    def save(self):
+        write_snapshot(self.path, {
+            'last_processed': self.last_processed.strftime(_FORMAT),
+            'fired': sorted(self.fired),
+        })
+        self._saved_processed = self.last_processed
+        self._unsaved_fires = False
+
+    def needs_save(self):
+        """Tells whether something fired, or the last processed instant moved more than `granularity`, since save()."""
+        if self.last_processed is None:
+            return False
+        if self._unsaved_fires or self._saved_processed is None:
+            return True
+        return self.last_processed - self._saved_processed > self.granularity
+
+    def resume_point(self, now):
+        """Returns the instant the scheduler should resume from: the last one processed, within the window."""
+        if self.last_processed is None:
+            return now
+        return min(now, max(self.last_processed, now - self.catch_up))
+
+    def claim(self, due, now):
+        """Filters (fire_time, reminder) pairs from the scheduler down to the ones to notify.
+
+        Occurrences that already fired or are older than the catch-up window are
+        dropped. The rest are recorded and `now` becomes the last processed
+        instant; call save() afterwards, when needs_save() says so, to make that durable.
+        """
+        oldest = now - self.catch_up
+        fresh = []
+        for fire_time, reminder in due:
+            key = (reminder['id'], fire_time.strftime(_FORMAT))
+            if fire_time < oldest:
+                print(f"Skipping reminder missed at {key[1]}: {reminder.get('title', '')}")
+            elif key not in self.fired:
+                self.fired.add(key)
+                fresh.append((fire_time, reminder))
+                self._unsaved_fires = True
+        cutoff = oldest.strftime(_FORMAT)
+        self.fired = {key for key in self.fired if key[1] >= cutoff}
+        self.last_processed = now
+        return fresh
@@ -0,0 +1,263 @@
+import json
+import mmap
+import os
+import sys
+import time
+
+from . import binary
+from .locking import file_signature
+from .record import to_json
+
+# "auto" keeps the format of the existing snapshot and writes new ones as JSON
+SNAPSHOT_FORMATS = ("auto", "json", "binary")
+
+
+def write_snapshot(path, reminders, snapshot_format="json"):
+    """Atomically replaces `path` with a snapshot of `reminders`, as JSON or in the binary format."""
+    tmp_path = path + ".tmp"
+    if snapshot_format == "binary":
+        with open(tmp_path, "wb") as f:
+            f.write(binary.encode(reminders))
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(reminders, f, indent=2, default=to_json)
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def snapshot_format_of(path):
+    """Returns "binary" or "json" for an existing snapshot, or None if there is none."""
+    try:
+        with open(path, "rb") as f:
+            return "binary" if f.read(len(binary.MAGIC)) == binary.MAGIC else "json"
+    except FileNotFoundError:
+        return None
+
+
+def resolve_format(path, snapshot_format):
+    """Turns "auto" into the format of the snapshot at `path`, JSON if there is none yet."""
+    if snapshot_format not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+    if snapshot_format == "auto":
+        return snapshot_format_of(path) or "json"
+    return snapshot_format
+
+
+def read_snapshot(path):
+    """Returns the date -> reminders mapping of a snapshot in either format.
+
+    Binary snapshots are mapped into memory and decoded from there, so they
+    come back as Reminder records; JSON ones come back as dicts.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(binary.MAGIC)) == binary.MAGIC:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return binary.decode(data)
+        f.seek(0)
+        return {str(k): v for k, v in json.load(f).items()}
+
+
+def _generation(line):
+    """Returns the generation recorded in the first line of a journal, 0 if it has none."""
+    try:
+        record = json.loads(line.decode("utf-8"))
+    except ValueError:
+        return 0
+    return record.get('generation', 0) if record.get('op') == 'gen' else 0
+
+
+class ReminderJournal:
+    """Append-only write-ahead journal kept next to the reminders.json snapshot.
+
+    Every save appends its changes with write_batch(), one JSON line per change
+    ({"op": "put", "reminder": {...}} or {"op": "del", "id": ...}). Lines are
+    flushed immediately but only fsynced every `sync_every` records or
+    `sync_interval` seconds. Once the journal holds `compact_every` records the
+    owner folds it into a new snapshot with compact(), written to a temp file
+    and renamed over the old one, and the journal is truncated. The snapshot
+    is kept in `snapshot_format`, see SNAPSHOT_FORMATS.
+
+    Several processes may share the files as long as they write under the same
+    FileLock. Compaction bumps a generation number kept in the first journal
+    line ({"op": "gen", ...}), and read_tail() returns what others appended
+    since this process last read, so nobody has to reload the whole store.
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, sync_every=32, sync_interval=1.0, compact_every=1000,
+                 snapshot_format="auto"):
+        self.snapshot_path = snapshot_path
+        self.snapshot_format = snapshot_format
+        self.journal_path = journal_path or snapshot_path + ".journal"
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self.record_count = 0
+        self.generation = 0
+        self.offset = 0  # bytes of the journal applied so far
+        self.snapshot_signature = None  # file_signature() of the snapshot that was read
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def load(self):
+        """Returns the date -> reminders mapping from the snapshot plus the journal tail."""
+        self.snapshot_format = resolve_format(self.snapshot_path, self.snapshot_format)
+        self.snapshot_signature = file_signature(self.snapshot_path)
+        try:
+            reminders = read_snapshot(self.snapshot_path)
+        except FileNotFoundError:
+            reminders = {}
+
+        locations = {}  # reminder id -> date key
+        for date, reminders_list in reminders.items():
+            for reminder in reminders_list:
+                locations[reminder.get('id')] = date
+
+        self.record_count = 0
+        self.generation = 0
+        self.offset = 0
+        try:
+            with open(self.journal_path, "rb") as f:
+                good_offset = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated journal record")
+                        record = json.loads(line.decode("utf-8"))
+                    except ValueError:
+                        # A torn write from a crash can only affect the tail, cut it off
+                        # so that new records are not appended to a partial line
+                        print(f"Discarding incomplete journal record in {self.journal_path}", file=sys.stderr)
+                        break
+                    if record.get('op') == 'gen':
+                        self.generation = record['generation']
+                    else:
+                        self._apply(reminders, locations, record)
+                        self.record_count += 1
+                    good_offset += len(line)
+                else:
+                    good_offset = None
+                self.offset = f.tell() if good_offset is None else good_offset
+            if good_offset is not None:
+                os.truncate(self.journal_path, good_offset)
+        except FileNotFoundError:
+            pass
+        return reminders
+
+    def changed(self):
+        """Tells from file metadata alone whether another process wrote since the last read."""
+        if file_signature(self.snapshot_path) != self.snapshot_signature:
+            return True
+        try:
+            return os.path.getsize(self.journal_path) != self.offset
+        except FileNotFoundError:
+            return self.offset != 0
+
+    def read_tail(self):
+        """Returns the records appended by other processes since load() or the last read_tail().
+
+        Returns None if the snapshot was rewritten or the journal compacted in the
+        meantime, then only a new load() gives the current state.
+        """
+        if file_signature(self.snapshot_path) != self.snapshot_signature:
+            return None
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return None if self.offset else []
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == self.offset:
+                return []
+            if size < self.offset or _generation(f.readline()) != self.generation:
+                return None
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        # A line that is still being written is picked up by the next read
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                records.append(json.loads(line.decode("utf-8")))
+            except ValueError:
+                print(f"Skipping unreadable journal record in {self.journal_path}", file=sys.stderr)
+        self.offset += end
+        self.record_count += len(records)
+        return records
+
+    def _apply(self, reminders, locations, record):
+        op = record.get('op')
+        if op == 'put':
+            reminder = record['reminder']
+            reminder_id = reminder.get('id')
+            self._remove(reminders, locations, reminder_id)
+            date = reminder.get('date', '')
+            reminders.setdefault(date, []).append(reminder)
+            locations[reminder_id] = date
+        elif op == 'del':
+            self._remove(reminders, locations, record.get('id'))
+
+    def _remove(self, reminders, locations, reminder_id):
+        date = locations.pop(reminder_id, None)
+        if date is None:
+            return
+        remaining = [r for r in reminders.get(date, []) if r.get('id') != reminder_id]
+        if remaining:
+            reminders[date] = remaining
+        else:
+            reminders.pop(date, None)
+
+    def write_batch(self, changes):
+        """Records a reminder id -> reminder mapping, None meaning deleted, with a single write."""
+        self._append([{'op': 'put', 'reminder': reminder} if reminder is not None else {'op': 'del', 'id': reminder_id}
+                      for reminder_id, reminder in changes.items()])
+
+    def _append(self, records):
+        if not records:
+            return
+        if self._file is None:
+            self._file = open(self.journal_path, "ab")
+        data = b"".join((json.dumps(record, separators=(',', ':'), default=to_json) + "\n").encode("utf-8")
+                        for record in records)
+        self._file.write(data)
+        self._file.flush()
+        self.offset += len(data)
+        self.record_count += len(records)
+        self._unsynced += len(records)
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Forces journal records written so far to disk."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self, reminders):
+        """Writes `reminders` as the new snapshot and empties the journal."""
+        self.sync()
+        self.generation += 1
+        write_snapshot(self.snapshot_path, reminders, self.snapshot_format)
+        self.snapshot_signature = file_signature(self.snapshot_path)
+        # Replaying the old journal over the new snapshot is harmless, so a crash
+        # between the rename and the truncation loses nothing
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        header = (json.dumps({'op': 'gen', 'generation': self.generation}) + "\n").encode("utf-8")
+        with open(self.journal_path, "wb") as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        self.offset = len(header)
+        self.record_count = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
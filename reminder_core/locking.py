@@ -0,0 +1,80 @@
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows, msvcrt is used instead
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class FileLock:
+    """Advisory lock shared by every process that writes the same store.
+
+    It locks a separate `path` (reminders.json.lock), because the snapshot itself
+    is replaced by renaming. Use it as a context manager; nesting in one process
+    is allowed and only the outermost release unlocks. Processes that do not take
+    the lock are not stopped, it only orders writers that cooperate.
+    """
+
+    def __init__(self, path, poll_interval=0.05):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._file = None
+        self._depth = 0
+
+    def acquire(self):
+        if self._depth == 0:
+            f = open(self.path, "a+b")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                elif msvcrt is not None:
+                    self._lock_windows(f)
+            except BaseException:
+                f.close()
+                raise
+            self._file = f
+        self._depth += 1
+
+    def _lock_windows(self, f):
+        f.seek(0)
+        while True:
+            try:
+                # LK_NBLCK fails at once rather than after LK_LOCK's ten one-second retries
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            f, self._file = self._file, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                f.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def file_signature(path):
+    """Returns what changes when `path` is rewritten or replaced, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
@@ -0,0 +1,148 @@
+import bisect
+import functools
+import json
+import time
+
+# Upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "reminder_app"
+
+
+class Histogram:
+    """Call count, total and bucketed latencies of one operation."""
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # the last one counts calls slower than every bound
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        """Returns the upper bound of the bucket holding the q-th quantile, None if nothing was observed."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+
+class Metrics:
+    """Opt-in counters for the hot paths of the app.
+
+    instrument() wraps methods of one object with timing wrappers, so nothing is
+    measured, and nothing costs anything, unless the app created a Metrics.
+    Gauges are callables evaluated only when the stats are read, such as the
+    store size or the number of widgets.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.timers = {}  # operation -> Histogram
+        self.gauges = {}  # name -> callable returning a number
+
+    def observe(self, name, seconds):
+        histogram = self.timers.get(name)
+        if histogram is None:
+            histogram = self.timers[name] = Histogram()
+        histogram.observe(seconds)
+
+    def timed(self, name, fn):
+        """Returns fn wrapped so every call is recorded under `name`."""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start)
+        return wrapper
+
+    def instrument(self, obj, names):
+        """Replaces the methods `names` of `obj` by timed ones, before anything has bound them."""
+        for name in names:
+            setattr(obj, name, self.timed(name, getattr(obj, name)))
+
+    def gauge(self, name, read):
+        self.gauges[name] = read
+
+    def reset(self):
+        self.started = time.time()
+        self.timers = {}
+
+    def _gauge_values(self):
+        values = {}
+        for name, read in self.gauges.items():
+            try:
+                values[name] = read()
+            except Exception as e:
+                print(f"Error reading gauge {name}: {e}")
+        return values
+
+    def snapshot(self):
+        """Returns every counter and gauge as plain data."""
+        return {
+            'uptime_s': time.time() - self.started,
+            'timers': {
+                name: {
+                    'count': h.count,
+                    'total_s': h.total,
+                    'mean_s': h.total / h.count if h.count else None,
+                    'p50_s': h.quantile(0.5),
+                    'p95_s': h.quantile(0.95),
+                    'max_s': h.max,
+                    'buckets': {str(bound): count for bound, count in zip(BUCKETS + ("+Inf",), h.buckets)},
+                } for name, h in sorted(self.timers.items())
+            },
+            'gauges': self._gauge_values(),
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Returns the stats in the Prometheus text exposition format."""
+        lines = [f"# HELP {PREFIX}_call_seconds Time spent in instrumented calls.",
+                 f"# TYPE {PREFIX}_call_seconds histogram"]
+        for name, h in sorted(self.timers.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), h.buckets):
+                cumulative += count
+                lines.append(f'{PREFIX}_call_seconds_bucket{{op="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_call_seconds_sum{{op="{name}"}} {h.total}')
+            lines.append(f'{PREFIX}_call_seconds_count{{op="{name}"}} {h.count}')
+        for name, value in self._gauge_values().items():
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"{PREFIX}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Returns a human-readable table of the stats."""
+        lines = [f"{'operation':<24} {'calls':>7} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for name, h in sorted(self.timers.items()):
+            p95 = h.quantile(0.95)
+            lines.append(f"{name:<24} {h.count:>7} {h.total / h.count * 1000:>9.2f} "
+                         f"{'-' if p95 is None else f'<{p95 * 1000:g}':>9} {h.max * 1000:>9.2f}")
+        lines.append("")
+        lines.extend(f"{name:<24} {value}" for name, value in self._gauge_values().items())
+        return "\n".join(lines)
+
+    def dump(self, path, fmt=None):
+        """Writes the stats to `path` as "json" or "prometheus" text, by default JSON if it ends in .json."""
+        if fmt is None:
+            fmt = "json" if path.endswith(".json") else "prometheus"
+        text = self.to_json() if fmt == "json" else self.to_prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
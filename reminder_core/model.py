@@ -0,0 +1,62 @@
+import datetime
+
+from .rules import normalize_rule
+
+VALID_RECURRENCES = ["", "daily", "weekly", "monthly"]
+
+
+def parse_tags(text):
+    """Splits a comma-separated tag string."""
+    return [t.strip() for t in text.split(',') if t.strip()]
+
+
+def make_reminder(date, time, title, desc="", recurrence="", end_date="", tags=(), reminder_id=None):
+    """Validates the fields of a reminder and returns it as a dict.
+
+    Raises ValueError with a message suitable for showing to the user.
+    """
+    recurrence = recurrence.lower()
+    end_date = end_date.strip()
+
+    if not date or not title:
+        raise ValueError("Date and Title are required.")
+
+    try:
+        datetime.datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Invalid date format. Please use YYYY-MM-DD.")
+
+    if time:
+        try:
+            datetime.datetime.strptime(time, "%H:%M")
+        except ValueError:
+            raise ValueError("Invalid time format. Please use HH:MM.")
+
+    if recurrence not in VALID_RECURRENCES:
+        try:
+            recurrence = normalize_rule(recurrence)
+        except ValueError as e:
+            raise ValueError(f"Invalid recurrence. {e} Please use daily, weekly, monthly or a rule "
+                             "such as FREQ=WEEKLY;INTERVAL=2;BYDAY=TU.")
+
+    if end_date:
+        try:
+            datetime.datetime.strptime(end_date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("Invalid end date format. Please use YYYY-MM-DD.")
+
+    if not reminder_id:
+        # uuid pulls in platform detection, so it is only imported when an id is needed
+        import uuid
+        reminder_id = str(uuid.uuid4())
+
+    return {
+        'id': reminder_id,
+        'date': date,
+        'time': time,
+        'title': title,
+        'desc': desc,
+        'recurrence': recurrence,
+        'end_date': end_date,
+        'tags': list(tags)
+    }
@@ -0,0 +1,193 @@
+import datetime
+import json
+import queue
+import socket
+import sys
+import threading
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+from .recurrence import is_recurring
+
+try:
+    import winsound
+except ImportError:  # Not on Windows, SoundBackend is unavailable
+    winsound = None
+
+
+def describe(reminder):
+    """Returns the notification text for a reminder."""
+    if is_recurring(reminder.get('recurrence', '')):
+        return (f"Recurring Reminder: {reminder.get('title', 'N/A')} at {reminder.get('time', 'N/A')} "
+                f"(originally on {reminder.get('date', 'N/A')})")
+    return f"Reminder: {reminder.get('title', 'N/A')} at {reminder.get('time', 'N/A')}"
+
+
+class StdoutBackend:
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def send(self, batch):
+        stream = self.stream or sys.stdout
+        for fire_time, reminder in batch:
+            print(f"Notification: {describe(reminder)}", file=stream)
+        stream.flush()
+
+
+class LogFileBackend:
+    """Appends one timestamped line per notification to a file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, batch):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for fire_time, reminder in batch:
+                f.write(f"{fire_time:%Y-%m-%d %H:%M}\t{reminder.get('id', '')}\t{describe(reminder)}\n")
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class WebhookBackend:
+    """POSTs every batch as one JSON document to a local webhook.
+
+    `url` is either http://host:port/path or unix:///path/to/socket, in which
+    case the request goes to / over the Unix socket.
+    """
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, batch):
+        parts = urlsplit(self.url)
+        if parts.scheme == "unix":
+            conn = _UnixHTTPConnection(parts.path, self.timeout)
+            target = "/"
+        elif parts.scheme == "http":
+            conn = HTTPConnection(parts.hostname, parts.port or 80, timeout=self.timeout)
+            target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        else:
+            raise ValueError(f"Unsupported webhook URL: {self.url}")
+        body = json.dumps({
+            'count': len(batch),
+            'reminders': [{'fire_time': fire_time.isoformat(timespec="minutes"), 'text': describe(reminder),
+                           **reminder} for fire_time, reminder in batch],
+        }).encode("utf-8")
+        try:
+            conn.request("POST", target, body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                raise OSError(f"Webhook answered {response.status} {response.reason}")
+        finally:
+            conn.close()
+
+
+class SoundBackend:
+    """Beeps once per batch, at the higher pitch if any reminder in it recurs. Windows only."""
+
+    @staticmethod
+    def available():
+        return winsound is not None
+
+    def send(self, batch):
+        recurring = any(is_recurring(reminder.get('recurrence', '')) for _, reminder in batch)
+        winsound.Beep(1200 if recurring else 1000, 500)
+
+
+class NotificationDispatcher(threading.Thread):
+    """Delivers due reminders to the backends from a worker thread.
+
+    notify() only enqueues, so the caller (the Tk main thread) never waits for a
+    backend. Notifications arriving within `coalesce` seconds of each other are
+    delivered as one batch, and batches are at least `min_interval` seconds
+    apart; anything due in between joins the next batch rather than being
+    dropped. A failing backend is reported and does not stop the others.
+    """
+
+    def __init__(self, backends, coalesce=0.5, min_interval=2.0, max_latencies=1000):
+        super().__init__(daemon=True)
+        self.backends = list(backends)
+        self.coalesce = coalesce
+        self.min_interval = min_interval
+        self.queue = queue.Queue()
+        self.max_latencies = max_latencies
+        self.latencies = []  # seconds from the fire time to delivery, most recent last
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self._last_batch = None  # monotonic time of the last delivery
+
+    def notify(self, fire_time, reminder):
+        self.queue.put((fire_time, reminder))
+
+    def close(self, timeout=2.0):
+        """Delivers what is queued and stops the worker."""
+        if self.is_alive():
+            self.queue.put(None)
+            self.join(timeout)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = self._collect(batch)
+            self._deliver(batch)
+            if stopping:
+                return
+
+    def _collect(self, batch):
+        """Adds notifications to `batch` until the burst is over. Returns True if close() was called."""
+        deadline = time.monotonic() + self.coalesce
+        if self._last_batch is not None:
+            deadline = max(deadline, self._last_batch + self.min_interval)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if item is None:
+                return True
+            batch.append(item)
+
+    def _deliver(self, batch):
+        for backend in self.backends:
+            try:
+                backend.send(batch)
+            except Exception as e:
+                self.failures += 1
+                print(f"Error delivering notifications with {type(backend).__name__}: {e}", file=sys.stderr)
+        self._last_batch = time.monotonic()
+        now = datetime.datetime.now()
+        self.latencies.extend((now - fire_time).total_seconds() for fire_time, _ in batch)
+        del self.latencies[:-self.max_latencies]
+        self.delivered += len(batch)
+        self.batches += 1
+
+    def stats(self):
+        """Returns delivery counts and latency figures, in seconds, over the recent notifications."""
+        latencies = sorted(self.latencies)
+        return {
+            'delivered': self.delivered,
+            'batches': self.batches,
+            'failures': self.failures,
+            'pending': self.queue.qsize(),
+            'latency_median': latencies[len(latencies) // 2] if latencies else None,
+            'latency_max': latencies[-1] if latencies else None,
+        }
@@ -0,0 +1,74 @@
+import datetime
+
+from .recurrence import ONCE, _numpy, days_in_month, occurrence_ordinals
+
+# Months kept in the cache, enough to page back and forth across several years
+MAX_CACHED_MONTHS = 120
+
+
+def _month_key(ordinal):
+    date = datetime.date.fromordinal(ordinal)
+    return date.year * 12 + date.month - 1
+
+
+class MonthOccupancy:
+    """Caches which days of each month have reminders, recurring ones included.
+
+    A month is stored as a bit mask (bit 0 is the 1st) plus the number of
+    occurrences on every day. `between` is the storage query returning the
+    reminders that can occur in a [start, end) range of YYYY-MM-DD strings. The
+    owner calls invalidate() with the old and new Reminder record of every
+    reminder it changes, which drops only the months that reminder occurs in.
+    """
+
+    def __init__(self, between):
+        self._between = between
+        self._months = {}  # year * 12 + month - 1 -> (mask, counts)
+
+    def __len__(self):
+        return len(self._months)
+
+    def month(self, year, month):
+        """Returns (mask, counts) for a month, counts being one number per day."""
+        key = year * 12 + month - 1
+        cached = self._months.get(key)
+        if cached is None:
+            cached = self._months[key] = self._compute(year, month)
+            if len(self._months) > MAX_CACHED_MONTHS:
+                # Dicts keep insertion order, so this drops the month computed first
+                del self._months[next(iter(self._months))]
+        return cached
+
+    def _compute(self, year, month):
+        first = datetime.date(year, month, 1)
+        end = first + datetime.timedelta(days=days_in_month(year, month))
+        days = (end - first).days
+        ordinals = occurrence_ordinals(self._between(first.isoformat(), end.isoformat()), first, end)
+        if isinstance(ordinals, list):
+            counts = [0] * days
+            for ordinal in ordinals:
+                counts[ordinal - first.toordinal()] += 1
+        else:
+            counts = _numpy().bincount(ordinals - first.toordinal(), minlength=days).tolist()
+        mask = 0
+        for i, count in enumerate(counts):
+            if count:
+                mask |= 1 << i
+        return mask, tuple(counts)
+
+    def invalidate(self, reminder):
+        """Forgets the cached months `reminder` has occurrences in."""
+        if not self._months or reminder is None:
+            return
+        if not reminder.ordinal:
+            return
+        first = _month_key(reminder.ordinal)
+        if reminder.rule == ONCE:
+            self._months.pop(first, None)
+            return
+        last = _month_key(reminder.end_ordinal) if reminder.end_ordinal else None
+        for key in [k for k in self._months if k >= first and (last is None or k <= last)]:
+            del self._months[key]
+
+    def clear(self):
+        self._months.clear()
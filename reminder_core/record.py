@@ -0,0 +1,172 @@
+import datetime
+import sys
+from collections.abc import Mapping
+
+from .recurrence import RULE_NAMES, parse_date, rule_code
+
+FIELDS = ('id', 'date', 'time', 'title', 'desc', 'recurrence', 'end_date', 'tags')
+NO_TIME = -1
+
+
+def _date_ordinal(value):
+    """Returns (ordinal, exact) for a date value, exact when it is already in YYYY-MM-DD form."""
+    if not value:
+        return 0, value == ""
+    if isinstance(value, str) and len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return datetime.date.fromisoformat(value).toordinal(), True
+        except ValueError:
+            pass
+    day = parse_date(value) if isinstance(value, str) else None
+    return (day.toordinal() if day else 0), False
+
+
+def _minutes(value):
+    """Returns (minutes since midnight, exact) for an HH:MM value, NO_TIME when missing or invalid."""
+    if not value:
+        return NO_TIME, value == ""
+    try:
+        hour, minute = value.split(":")
+        at = datetime.time(int(hour), int(minute))
+    except (ValueError, AttributeError):
+        return NO_TIME, False
+    minutes = at.hour * 60 + at.minute
+    return minutes, len(value) == 5 and hour.isdigit() and minute.isdigit()
+
+
+def _iso(ordinal):
+    return datetime.date.fromordinal(ordinal).isoformat() if ordinal else ""
+
+
+_GETTERS = {
+    'id': lambda r: r.id,
+    'date': lambda r: _iso(r.ordinal),
+    'time': lambda r: "" if r.minutes == NO_TIME else f"{r.minutes // 60:02d}:{r.minutes % 60:02d}",
+    'title': lambda r: r.title,
+    'desc': lambda r: r.desc,
+    'recurrence': lambda r: RULE_NAMES.get(r.rule, ""),
+    'end_date': lambda r: _iso(r.end_ordinal),
+    'tags': lambda r: list(r.tags),
+}
+
+
+class Reminder(Mapping):
+    """Compact in-memory form of a reminder, converted once when it is stored.
+
+    Dates are date.toordinal() values (0 when missing), the time is minutes since
+    midnight (NO_TIME when missing), the recurrence is a rule code from
+    recurrence.RULE_CODES (RRULE with the rule text in `extra` for compiled
+    rules) and tags are a tuple of interned strings, so hot paths compare
+    integers instead of parsing strings. It still reads like the reminder
+    dict, reminder['date'] or reminder.get('tags', []), and to_dict() gives the
+    JSON schema back. Values that do not survive the conversion unchanged, such as
+    an unparsable date, and unknown keys are kept verbatim in `extra`.
+    """
+
+    __slots__ = ('id', 'ordinal', 'minutes', 'title', 'desc', 'rule', 'end_ordinal', 'tags', 'extra')
+
+    @classmethod
+    def from_dict(cls, data):
+        self = cls.__new__(cls)
+        extra = {key: value for key, value in data.items() if key not in _GETTERS}
+        self.id = data.get('id')
+        self.title = data.get('title', '')
+        self.desc = data.get('desc', '')
+
+        self.ordinal, exact = _date_ordinal(data.get('date', ''))
+        if not exact:
+            extra['date'] = data['date']
+        self.minutes, exact = _minutes(data.get('time', ''))
+        if not exact:
+            extra['time'] = data['time']
+        self.end_ordinal, exact = _date_ordinal(data.get('end_date', ''))
+        if not exact:
+            extra['end_date'] = data['end_date']
+
+        recurrence = data.get('recurrence', '')
+        self.rule = rule_code(recurrence)
+        if RULE_NAMES.get(self.rule) != recurrence:
+            extra['recurrence'] = recurrence
+
+        tags = data.get('tags', [])
+        if isinstance(tags, list) and all(isinstance(tag, str) for tag in tags):
+            self.tags = tuple(sys.intern(tag) for tag in tags)
+        else:
+            self.tags = ()
+            extra['tags'] = tags
+        self.extra = extra or None
+        return self
+
+    @classmethod
+    def from_fields(cls, reminder_id, ordinal, minutes, title, desc, rule, end_ordinal, tags, extra=None):
+        """Builds a record from fields that are already converted, as the binary snapshot stores them."""
+        self = cls.__new__(cls)
+        self.id = reminder_id
+        self.ordinal = ordinal
+        self.minutes = minutes
+        self.title = title
+        self.desc = desc
+        self.rule = rule
+        self.end_ordinal = end_ordinal
+        self.tags = tags
+        self.extra = extra
+        return self
+
+    def __getitem__(self, key):
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        return _GETTERS[key](self)
+
+    def __iter__(self):
+        yield from FIELDS
+        if self.extra is not None:
+            yield from (key for key in self.extra if key not in _GETTERS)
+
+    def __len__(self):
+        return len(FIELDS) + (sum(key not in _GETTERS for key in self.extra) if self.extra is not None else 0)
+
+    def __eq__(self, other):
+        if isinstance(other, Reminder):
+            return all(getattr(self, name) == getattr(other, name) for name in Reminder.__slots__)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Reminder({self.to_dict()!r})"
+
+    @property
+    def start(self):
+        return datetime.date.fromordinal(self.ordinal) if self.ordinal else None
+
+    @property
+    def end(self):
+        return datetime.date.fromordinal(self.end_ordinal) if self.end_ordinal else None
+
+    def to_dict(self):
+        minutes = self.minutes
+        data = {
+            'id': self.id,
+            'date': _iso(self.ordinal),
+            'time': "" if minutes == NO_TIME else f"{minutes // 60:02d}:{minutes % 60:02d}",
+            'title': self.title,
+            'desc': self.desc,
+            'recurrence': RULE_NAMES.get(self.rule, ""),
+            'end_date': _iso(self.end_ordinal),
+            'tags': list(self.tags),
+        }
+        if self.extra is not None:
+            data.update(self.extra)
+        return data
+
+
+def as_record(reminder):
+    """Returns `reminder` as a Reminder, converting it if it is a plain dict."""
+    return reminder if isinstance(reminder, Reminder) else Reminder.from_dict(reminder)
+
+
+def to_json(obj):
+    """json.dump default= hook that writes Reminders as plain dicts."""
+    if isinstance(obj, Reminder):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,310 @@
+import datetime
+import heapq
+
+from .rules import compile_rule, is_rule
+
+RECURRENCES = ("daily", "weekly", "monthly")
+
+# Rule codes used by the batch expander
+ONCE, DAILY, WEEKLY, MONTHLY = 0, 1, 2, 3
+RULE_CODES = {"": ONCE, "daily": DAILY, "weekly": WEEKLY, "monthly": MONTHLY}
+RULE_NAMES = {code: name for name, code in RULE_CODES.items()}
+# Any other rule from rules.py, such as FREQ=WEEKLY;INTERVAL=2;BYDAY=TU, kept as text
+RRULE = 4
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# Offset between date.toordinal() and days since 1970-01-01 (datetime64[D])
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# Below this many rules importing NumPy costs more than it saves
+NUMPY_MIN_BATCH = 1000
+
+
+def parse_date(date_str):
+    """Parses a YYYY-MM-DD string into a date, or returns None."""
+    if not date_str:
+        return None
+    try:
+        return datetime.date.fromisoformat(date_str)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+def rule_code(recurrence):
+    """Returns the rule code of a recurrence string, ONCE for blank or unknown ones."""
+    if not isinstance(recurrence, str):
+        return ONCE
+    code = RULE_CODES.get(recurrence)
+    if code is None:
+        code = RRULE if is_rule(recurrence) else ONCE
+    return code
+
+
+def is_recurring(recurrence):
+    return recurrence in RECURRENCES or is_rule(recurrence)
+
+
+def compiled_rule(start, recurrence):
+    """Returns the compiled rule of a recurrence other than daily/weekly/monthly, None if there is none."""
+    if recurrence in RULE_CODES or not is_rule(recurrence):
+        return None
+    return compile_rule(recurrence, start)
+
+
+def _month_day(month_index, day):
+    """Returns the date `day` of a month counted as year * 12 + month - 1, clamped to the month length."""
+    year, month = divmod(month_index, 12)
+    month += 1
+    return datetime.date(year, month, min(day, days_in_month(year, month)))
+
+
+def occurrence_on_or_after(start, recurrence, day):
+    """Returns the first occurrence of a rule starting at `start` that falls on or after `day`.
+
+    Monthly rules are clamped to the last day of shorter months, so a rule started
+    on the 31st fires on the 30th in April and the 28th/29th in February.
+    Compiled rules (see rules.py) answer from their own arithmetic.
+    """
+    rule = compiled_rule(start, recurrence)
+    if rule is not None:
+        return rule.next_on_or_after(day)
+    if day <= start:
+        return start
+    if recurrence == "daily":
+        return day
+    if recurrence == "weekly":
+        # Weekdays repeat every 7 ordinals, so the distance to the next match is a modulus
+        return day + datetime.timedelta(days=(start.toordinal() - day.toordinal()) % 7)
+    if recurrence == "monthly":
+        month_index = day.year * 12 + day.month - 1
+        candidate = _month_day(month_index, start.day)
+        if candidate < day:
+            candidate = _month_day(month_index + 1, start.day)
+        return candidate
+    return None
+
+
+def next_occurrence(start, recurrence, current_date, end_date=None):
+    """Returns the first occurrence on or after `current_date`, or None once the rule has ended."""
+    occurrence = occurrence_on_or_after(start, recurrence, current_date)
+    if occurrence is None or (end_date and occurrence > end_date):
+        return None
+    return occurrence
+
+
+def occurrences_between(start, recurrence, end_date, range_start, range_end):
+    """Yields the occurrence dates of one rule in [range_start, range_end).
+
+    A blank recurrence is a one-off reminder that occurs once on `start`.
+    """
+    if end_date and end_date < range_end - datetime.timedelta(days=1):
+        range_end = end_date + datetime.timedelta(days=1)
+    rule = compiled_rule(start, recurrence)
+    if rule is not None:
+        yield from rule.between(range_start, range_end)
+        return
+    if recurrence not in RECURRENCES:
+        if range_start <= start < range_end:
+            yield start
+        return
+    occurrence = occurrence_on_or_after(start, recurrence, range_start)
+    if recurrence == "monthly":
+        month_index = occurrence.year * 12 + occurrence.month - 1
+        while occurrence < range_end:
+            yield occurrence
+            month_index += 1
+            occurrence = _month_day(month_index, start.day)
+    else:
+        step = datetime.timedelta(days=1 if recurrence == "daily" else 7)
+        while occurrence < range_end:
+            yield occurrence
+            occurrence += step
+
+
+def merge_occurrences(reminders, range_start, range_end):
+    """Yields (date, reminder) for the occurrences of `reminders` in [range_start, range_end), by date and time.
+
+    Unlike expand() this is lazy, a k-way merge over the reminders: the heap
+    holds the next occurrence of each, so after an O(k) heapify every result
+    costs O(log k) however long the range is, and stopping early skips the rest.
+    `reminders` are Reminder records.
+    """
+    lo = range_start.toordinal()
+    hi = range_end.toordinal()
+    heap = []
+    compiled = {}  # position -> compiled rule of RRULE reminders
+    for position, reminder in enumerate(reminders):
+        ordinal = reminder.ordinal
+        if not ordinal:
+            continue
+        rule = reminder.rule
+        if rule == RRULE:
+            compiled[position] = compiled_rule(reminder.start, reminder['recurrence'])
+            first = compiled[position].next_ordinal(max(ordinal, lo))
+            if first is None:
+                continue
+        elif ordinal >= lo:
+            first = ordinal
+        elif rule == DAILY:
+            first = lo
+        elif rule == WEEKLY:
+            first = lo + (ordinal - lo) % 7
+        elif rule == MONTHLY:
+            first = occurrence_on_or_after(reminder.start, "monthly", range_start).toordinal()
+        else:
+            continue
+        if first < hi and (not reminder.end_ordinal or first <= reminder.end_ordinal):
+            heap.append((first, reminder.minutes, position, reminder))
+    heapq.heapify(heap)
+    fromordinal = datetime.date.fromordinal
+    while heap:
+        ordinal, minutes, position, reminder = heap[0]
+        day = fromordinal(ordinal)
+        yield day, reminder
+        rule = reminder.rule
+        if rule == DAILY:
+            ordinal += 1
+        elif rule == WEEKLY:
+            ordinal += 7
+        elif rule == MONTHLY:
+            ordinal = occurrence_on_or_after(reminder.start, "monthly", day + datetime.timedelta(days=1)).toordinal()
+        elif rule == RRULE:
+            ordinal = compiled[position].next_ordinal(ordinal + 1) or hi
+        else:
+            ordinal = hi
+        if ordinal < hi and (not reminder.end_ordinal or ordinal <= reminder.end_ordinal):
+            heapq.heapreplace(heap, (ordinal, minutes, position, reminder))
+        else:
+            heapq.heappop(heap)
+
+
+def _numpy():
+    # NumPy is optional and slow to import, so it is only loaded by the batch expander
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def expand_batch(starts, recurrences, end_dates, range_start, range_end):
+    """Expands many rules over [range_start, range_end) at once.
+
+    `starts` and `end_dates` are dates (end dates may be None) and `recurrences`
+    are recurrence strings. Returns parallel (indices, ordinals) sequences sorted
+    by date, where indices point back into the inputs and ordinals are
+    date.toordinal() values. For large batches with NumPy installed both are
+    int64 arrays.
+    """
+    np = _numpy() if len(starts) >= NUMPY_MIN_BATCH else None
+    if np is None:
+        pairs = []
+        for i, (start, recurrence, end_date) in enumerate(zip(starts, recurrences, end_dates)):
+            for occurrence in occurrences_between(start, recurrence, end_date, range_start, range_end):
+                pairs.append((occurrence.toordinal(), i))
+        pairs.sort()
+        return [i for _, i in pairs], [ordinal for ordinal, _ in pairs]
+
+    count = len(starts)
+    if count == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    start = np.fromiter((d.toordinal() for d in starts), dtype=np.int64, count=count) - EPOCH_ORDINAL
+    rule = np.fromiter(map(rule_code, recurrences), dtype=np.int8, count=count)
+    no_end = range_end.toordinal() - EPOCH_ORDINAL
+    end = np.fromiter((d.toordinal() - EPOCH_ORDINAL + 1 if d else no_end for d in end_dates), dtype=np.int64, count=count)
+    # Window of each rule, as half-open day numbers [lo, hi)
+    lo = np.maximum(start, range_start.toordinal() - EPOCH_ORDINAL)
+    hi = np.minimum(end, no_end)
+
+    indices = []
+    days = []
+
+    stepped = (rule == ONCE) | (rule == DAILY) | (rule == WEEKLY)
+    if stepped.any():
+        idx = np.nonzero(stepped)[0]
+        step = np.where(rule[idx] == WEEKLY, 7, 1)
+        s, l, h = start[idx], lo[idx], hi[idx]
+        first = s + -((s - l) // step) * step  # first occurrence >= lo
+        counts = np.where(h > first, -((first - h) // step), 0)
+        counts = np.where(rule[idx] == ONCE, (s >= l) & (s < h), counts).astype(np.int64)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        indices.append(np.repeat(idx, counts))
+        days.append(np.repeat(first, counts) + offsets * np.repeat(step, counts))
+
+    monthly = rule == MONTHLY
+    if monthly.any():
+        idx = np.nonzero(monthly & (hi > lo))[0]
+        s = start[idx].astype('datetime64[D]')
+        start_day = (s - s.astype('datetime64[M]')).astype(np.int64) + 1
+        first_month = lo[idx].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        last_month = (hi[idx] - 1).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        counts = last_month - first_month + 1
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        months = (np.repeat(first_month, counts) + offsets).astype('datetime64[M]')
+        month_start = months.astype('datetime64[D]')
+        month_length = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+        occurrence = month_start.astype(np.int64) + np.minimum(np.repeat(start_day, counts), month_length) - 1
+        rows = np.repeat(idx, counts)
+        # Clamping can land before the window start in the first month, drop those
+        keep = (occurrence >= lo[rows]) & (occurrence < hi[rows])
+        indices.append(rows[keep])
+        days.append(occurrence[keep])
+
+    custom = np.nonzero(rule == RRULE)[0].tolist()
+    if custom:
+        # Compiled rules have no vectorized form; their occurrences are few and found by arithmetic
+        pairs = [(i, occurrence.toordinal() - EPOCH_ORDINAL) for i in custom
+                 for occurrence in occurrences_between(starts[i], recurrences[i], end_dates[i], range_start, range_end)]
+        indices.append(np.array([i for i, _ in pairs], dtype=np.int64))
+        days.append(np.array([day for _, day in pairs], dtype=np.int64))
+
+    indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+    days = np.concatenate(days) if days else np.empty(0, dtype=np.int64)
+    order = np.lexsort((indices, days))
+    return indices[order], days[order] + EPOCH_ORDINAL
+
+
+def _batch_inputs(reminders):
+    """Returns the Reminder records that have a date, followed by their expand_batch() inputs."""
+    rows = []
+    starts = []
+    recurrences = []
+    end_dates = []
+    fromordinal = datetime.date.fromordinal
+    for reminder in reminders:
+        if not reminder.ordinal:
+            continue
+        rows.append(reminder)
+        starts.append(fromordinal(reminder.ordinal))
+        recurrences.append(reminder['recurrence'] if reminder.rule == RRULE else RULE_NAMES[reminder.rule])
+        end_dates.append(fromordinal(reminder.end_ordinal) if reminder.end_ordinal else None)
+    return rows, starts, recurrences, end_dates
+
+
+def expand(reminders, range_start, range_end):
+    """Returns (date, reminder) for every occurrence of `reminders` in [range_start, range_end), by date.
+
+    `reminders` are Reminder records (see record.py), as returned by the storage.
+    """
+    rows, starts, recurrences, end_dates = _batch_inputs(reminders)
+    indices, ordinals = expand_batch(starts, recurrences, end_dates, range_start, range_end)
+    return [(datetime.date.fromordinal(int(ordinal)), rows[i]) for i, ordinal in zip(indices, ordinals)]
+
+
+def occurrence_ordinals(reminders, range_start, range_end):
+    """Like expand(), but only returns the date.toordinal() of every occurrence.
+
+    The result is an int64 array when expand_batch() used NumPy and a list
+    otherwise; no date or tuple is built per occurrence.
+    """
+    _, starts, recurrences, end_dates = _batch_inputs(reminders)
+    return expand_batch(starts, recurrences, end_dates, range_start, range_end)[1]
@@ -0,0 +1,356 @@
+"""Compiled recurrence rules, a subset of the iCalendar (RFC 5545) RRULE.
+
+A rule is kept as the recurrence string of a reminder, such as
+
+    FREQ=WEEKLY;INTERVAL=2;BYDAY=TU
+    FREQ=MONTHLY;BYDAY=2TU;UNTIL=2025-12-31
+    FREQ=MONTHLY;BYMONTHDAY=1,15,-1;COUNT=12;EXDATE=2025-08-15
+
+so reminders.json stays readable and "daily", "weekly" and "monthly" keep their
+meaning. Supported parts are FREQ (DAILY, WEEKLY or MONTHLY), INTERVAL, BYDAY
+(with an ordinal such as 2TU or -1FR for monthly rules), BYMONTHDAY (monthly
+rules only), COUNT, UNTIL and EXDATE. Dates are YYYY-MM-DD or YYYYMMDD.
+
+compile_rule() parses a rule once per (text, start) pair. Daily and weekly
+rules repeat with a fixed period, so the compiled rule finds the next
+occurrence and counts occurrences with a divmod and a bisect over at most a
+week of offsets. Monthly rules look at one month per interval, normally one.
+"""
+import bisect
+import calendar
+import datetime
+import functools
+import math
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+# The recurrence strings the app always had, as rules
+LEGACY = {"daily": "FREQ=DAILY", "weekly": "FREQ=WEEKLY", "monthly": "FREQ=MONTHLY"}
+# Intervals a monthly rule is walked for a match before it is taken never to occur again,
+# enough for BYMONTHDAY=29 in February with INTERVAL=12 to skip a century year
+MAX_EMPTY_PERIODS = 100
+
+
+def _parse_date(value):
+    # UNTIL may carry a time in iCalendar files; reminders are whole days
+    value = value.split("T", 1)[0]
+    try:
+        if len(value) == 8 and value.isdigit():
+            return datetime.date(int(value[:4]), int(value[4:6]), int(value[6:]))
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r} in recurrence rule.")
+
+
+def _parse_int(name, value, low, high, signed=False):
+    """Parses a number in [low, high], or in [-high, -low] too when `signed`."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number.")
+    if not low <= (abs(number) if signed else number) <= high:
+        raise ValueError(f"{name} is out of range.")
+    return number
+
+
+def _parse_weekday(value, freq):
+    """Returns (ordinal, weekday) for MO or 2TU style BYDAY entries, the ordinal being 0 when missing."""
+    weekday = value[-2:]
+    if weekday not in WEEKDAYS:
+        raise ValueError(f"Invalid BYDAY entry {value!r}.")
+    ordinal = 0
+    if value[:-2]:
+        if freq != "MONTHLY":
+            raise ValueError("BYDAY ordinals such as 2TU need FREQ=MONTHLY.")
+        ordinal = _parse_int("BYDAY", value[:-2], 1, 5, signed=True)
+    return ordinal, WEEKDAYS.index(weekday)
+
+
+def parse_rule(text):
+    """Parses a rule into a dict of its parts, raising ValueError with a message for the user if it is not one.
+
+    "daily", "weekly" and "monthly" are accepted as FREQ-only rules.
+    """
+    if not isinstance(text, str):
+        raise ValueError("A recurrence rule must be text.")
+    text = LEGACY.get(text, text).strip()
+    if text[:6].upper() == "RRULE:":
+        text = text[6:]
+    parts = {}
+    for item in text.split(";"):
+        if not item:
+            continue
+        name, sep, value = item.partition("=")
+        name = name.strip().upper()
+        value = value.strip().upper()
+        if not sep or not value:
+            raise ValueError(f"Invalid recurrence rule part {item!r}, expected NAME=VALUE.")
+        if name in parts:
+            raise ValueError(f"{name} is given twice.")
+        parts[name] = value
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError("A recurrence rule needs FREQ=DAILY, WEEKLY or MONTHLY.")
+    rule = {'freq': freq, 'interval': 1, 'by_weekday': (), 'by_month_day': (), 'count': None, 'until': None,
+            'exdates': ()}
+    for name, value in parts.items():
+        if name == "INTERVAL":
+            rule['interval'] = _parse_int(name, value, 1, 1000)
+        elif name == "BYDAY":
+            rule['by_weekday'] = tuple(sorted({_parse_weekday(v.strip(), freq) for v in value.split(",")}))
+        elif name == "BYMONTHDAY":
+            if freq != "MONTHLY":
+                raise ValueError("BYMONTHDAY needs FREQ=MONTHLY.")
+            days = {_parse_int(name, v, 1, 31, signed=True) for v in value.split(",")}
+            rule['by_month_day'] = tuple(sorted(days))
+        elif name == "COUNT":
+            rule['count'] = _parse_int(name, value, 1, 100000)
+        elif name == "UNTIL":
+            rule['until'] = _parse_date(value)
+        elif name == "EXDATE":
+            rule['exdates'] = tuple(sorted({_parse_date(v.strip()) for v in value.split(",")}))
+        else:
+            raise ValueError(f"Unsupported recurrence rule part {name}.")
+    return rule
+
+
+def format_rule(rule):
+    """Returns the canonical text of parsed rule parts, the legacy name for a plain FREQ rule."""
+    freq = rule['freq']
+    items = [f"FREQ={freq}"]
+    if rule['interval'] != 1:
+        items.append(f"INTERVAL={rule['interval']}")
+    if rule['by_weekday']:
+        items.append("BYDAY=" + ",".join(f"{n or ''}{WEEKDAYS[w]}" for n, w in rule['by_weekday']))
+    if rule['by_month_day']:
+        items.append("BYMONTHDAY=" + ",".join(map(str, rule['by_month_day'])))
+    if rule['count'] is not None:
+        items.append(f"COUNT={rule['count']}")
+    if rule['until'] is not None:
+        items.append(f"UNTIL={rule['until'].isoformat()}")
+    if rule['exdates']:
+        items.append("EXDATE=" + ",".join(day.isoformat() for day in rule['exdates']))
+    if len(items) == 1:
+        return freq.lower()
+    return ";".join(items)
+
+
+def normalize_rule(text):
+    """Returns the canonical text of a rule, raising ValueError if it is not one."""
+    return format_rule(parse_rule(text))
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_parts(text):
+    try:
+        return parse_rule(text)
+    except ValueError:
+        return None
+
+
+def is_rule(text):
+    """Tells whether `text` parses as a recurrence rule, legacy names included."""
+    return isinstance(text, str) and _cached_parts(text) is not None
+
+
+@functools.lru_cache(maxsize=65536)
+def compile_rule(text, start):
+    """Returns the Rule of a recurrence string for a reminder starting on `start`, parsed once and cached.
+
+    Raises ValueError if `text` is not a rule.
+    """
+    parts = _cached_parts(text)
+    if parts is None:
+        raise ValueError(f"Invalid recurrence rule {text!r}.")
+    return Rule(start, **parts)
+
+
+class Rule:
+    """A recurrence rule bound to the start date of a reminder.
+
+    Occurrences are the dates on or after `start` that match the rule, so a
+    weekly rule on Tuesdays that starts on a Monday first occurs the next day.
+    Internally dates are date.toordinal() values; next_ordinal() is the form
+    used by the hot paths.
+    """
+
+    __slots__ = ('start', 'freq', 'interval', 'by_weekday', 'by_month_day', 'count', 'until', 'exdates',
+                 '_start', '_last', '_exdates', '_anchor', '_period', '_offsets', '_skipped', '_start_month')
+
+    def __init__(self, start, freq, interval=1, by_weekday=(), by_month_day=(), count=None, until=None, exdates=()):
+        self.start = start
+        self.freq = freq
+        self.interval = interval
+        self.by_weekday = tuple(by_weekday)
+        self.by_month_day = tuple(by_month_day)
+        self.count = count
+        self.until = until
+        self.exdates = tuple(exdates)
+        self._start = start.toordinal()
+        self._exdates = frozenset(day.toordinal() for day in exdates)
+        self._start_month = start.year * 12 + start.month - 1
+        self._offsets = None
+        if freq == "DAILY":
+            self._anchor = self._start
+            if by_weekday:
+                # Every interval days, filtered by weekday, repeats after lcm(interval, 7) days
+                self._period = interval * 7 // math.gcd(interval, 7)
+                weekdays = {w for _, w in by_weekday}
+                self._offsets = [offset for offset in range(0, self._period, interval)
+                                 if (start.weekday() + offset) % 7 in weekdays]
+            else:
+                self._period = interval
+                self._offsets = [0]
+        elif freq == "WEEKLY":
+            # Weeks run Monday to Sunday and are counted from the week of the start date
+            self._anchor = self._start - start.weekday()
+            self._period = 7 * interval
+            self._offsets = sorted({w for _, w in by_weekday}) if by_weekday else [start.weekday()]
+        if self._offsets is not None:
+            self._skipped = bisect.bisect_left(self._offsets, self._start - self._anchor)
+        self._last = until.toordinal() if until is not None else None
+        if count is not None:
+            # COUNT includes the exception dates, as in RFC 5545
+            nth = self._nth(count - 1)
+            if nth is not None and (self._last is None or nth < self._last):
+                self._last = nth
+
+    def __repr__(self):
+        return f"Rule({self.text!r}, start={self.start.isoformat()})"
+
+    @property
+    def text(self):
+        return format_rule({name: getattr(self, name) for name in
+                            ('freq', 'interval', 'by_weekday', 'by_month_day', 'count', 'until', 'exdates')})
+
+    def _month_days(self, month_index):
+        """Returns the sorted days of a month, counted as year * 12 + month - 1, that match the rule."""
+        year, month = divmod(month_index, 12)
+        month += 1
+        length = calendar.monthrange(year, month)[1]
+        if not self.by_weekday and not self.by_month_day:
+            # Like the legacy "monthly", clamped to the last day of shorter months
+            return [min(self.start.day, length)]
+        days = None
+        if self.by_month_day:
+            days = {day if day > 0 else length + 1 + day for day in self.by_month_day}
+            days = {day for day in days if 1 <= day <= length}
+        if self.by_weekday:
+            first_weekday = datetime.date(year, month, 1).weekday()
+            matches = set()
+            for ordinal, weekday in self.by_weekday:
+                same = range(1 + (weekday - first_weekday) % 7, length + 1, 7)
+                if not ordinal:
+                    matches.update(same)
+                elif ordinal <= len(same) and -ordinal <= len(same):
+                    matches.add(same[ordinal - 1] if ordinal > 0 else same[ordinal])
+            days = matches if days is None else days & matches
+        return sorted(days)
+
+    def _first(self, ordinal):
+        """Returns the first ordinal on or after `ordinal` matching the rule, ignoring its end and exceptions."""
+        if ordinal < self._start:
+            ordinal = self._start
+        if self._offsets is not None:
+            if not self._offsets:
+                return None
+            k, r = divmod(ordinal - self._anchor, self._period)
+            i = bisect.bisect_left(self._offsets, r)
+            if i == len(self._offsets):
+                k += 1
+                i = 0
+            return self._anchor + k * self._period + self._offsets[i]
+        day = datetime.date.fromordinal(ordinal)
+        month_index = day.year * 12 + day.month - 1
+        threshold = day.day
+        lag = (month_index - self._start_month) % self.interval
+        if lag:
+            month_index += self.interval - lag
+            threshold = 1
+        for _ in range(MAX_EMPTY_PERIODS):
+            for month_day in self._month_days(month_index):
+                if month_day >= threshold:
+                    year, month = divmod(month_index, 12)
+                    return datetime.date(year, month + 1, month_day).toordinal()
+            month_index += self.interval
+            threshold = 1
+        return None
+
+    def _nth(self, index):
+        """Returns the ordinal of the index-th occurrence from the start, or None if there is none."""
+        if self._offsets is not None:
+            if not self._offsets:
+                return None
+            k, i = divmod(self._skipped + index, len(self._offsets))
+            return self._anchor + k * self._period + self._offsets[i]
+        ordinal = self._first(self._start)
+        for _ in range(index):
+            if ordinal is None:
+                break
+            ordinal = self._first(ordinal + 1)
+        return ordinal
+
+    def next_ordinal(self, ordinal):
+        """Returns the first occurrence on or after an ordinal as an ordinal, or None once the rule has ended."""
+        ordinal = self._first(ordinal)
+        while ordinal is not None and ordinal in self._exdates:
+            ordinal = self._first(ordinal + 1)
+        if ordinal is None or (self._last is not None and ordinal > self._last):
+            return None
+        return ordinal
+
+    def next_on_or_after(self, day):
+        """Returns the first occurrence on or after `day`, or None once the rule has ended."""
+        ordinal = self.next_ordinal(day.toordinal())
+        return datetime.date.fromordinal(ordinal) if ordinal is not None else None
+
+    def next_after(self, day):
+        """Returns the first occurrence after `day`, or None once the rule has ended."""
+        ordinal = self.next_ordinal(day.toordinal() + 1)
+        return datetime.date.fromordinal(ordinal) if ordinal is not None else None
+
+    def occurs_on(self, day):
+        return self.next_ordinal(day.toordinal()) == day.toordinal()
+
+    def _count_before(self, ordinal):
+        """Returns the number of matching days of a daily or weekly rule in [start, ordinal)."""
+        if ordinal <= self._start:
+            return 0
+        k, r = divmod(ordinal - self._anchor, self._period)
+        return k * len(self._offsets) + bisect.bisect_left(self._offsets, r) - self._skipped
+
+    def count_between(self, range_start, range_end):
+        """Returns the number of occurrences in [range_start, range_end).
+
+        Daily and weekly rules count in constant time, monthly rules in time
+        proportional to the months in the range divided by the interval.
+        """
+        lo = max(range_start.toordinal(), self._start)
+        hi = range_end.toordinal()
+        if self._last is not None:
+            hi = min(hi, self._last + 1)
+        if hi <= lo:
+            return 0
+        if self._offsets is not None:
+            count = self._count_before(hi) - self._count_before(lo)
+        else:
+            count = 0
+            ordinal = self._first(lo)
+            while ordinal is not None and ordinal < hi:
+                day = datetime.date.fromordinal(ordinal)
+                month_index = day.year * 12 + day.month - 1
+                end_day = hi - ordinal + day.day  # days of this month before hi
+                count += sum(1 for d in self._month_days(month_index) if day.day <= d < end_day)
+                year, month = divmod(month_index + 1, 12)
+                ordinal = self._first(datetime.date(year, month + 1, 1).toordinal())
+        return count - sum(1 for ordinal in self._exdates
+                           if lo <= ordinal < hi and self._first(ordinal) == ordinal)
+
+    def between(self, range_start, range_end):
+        """Yields the occurrence dates in [range_start, range_end)."""
+        hi = range_end.toordinal()
+        ordinal = self.next_ordinal(range_start.toordinal())
+        fromordinal = datetime.date.fromordinal
+        while ordinal is not None and ordinal < hi:
+            yield fromordinal(ordinal)
+            ordinal = self.next_ordinal(ordinal + 1)
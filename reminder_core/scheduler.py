@@ -0,0 +1,95 @@
+import datetime
+import heapq
+import itertools
+
+from .record import NO_TIME, as_record
+from .recurrence import ONCE, next_occurrence
+
+
+class ReminderScheduler:
+    """Keeps the next firing instant of every reminder in a min-heap.
+
+    Entries are invalidated lazily: rescheduling or removing a reminder marks its
+    old heap entry as dead instead of searching the heap for it.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}  # reminder id -> live heap entry
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def next_fire_time(self, reminder, after):
+        """Returns the first firing datetime of a reminder at or after `after`, or None."""
+        reminder = as_record(reminder)
+        if not reminder.ordinal or reminder.minutes == NO_TIME:
+            return None
+        start = datetime.date.fromordinal(reminder.ordinal)
+        at = datetime.time(*divmod(reminder.minutes, 60))
+        if reminder.rule == ONCE:
+            fire = datetime.datetime.combine(start, at)
+            return fire if fire >= after else None
+
+        day = after.date()
+        if at < after.time():
+            day += datetime.timedelta(days=1)
+        occurrence = next_occurrence(start, reminder['recurrence'], day, reminder.end)
+        if occurrence is None:
+            return None
+        return datetime.datetime.combine(occurrence, at)
+
+    def rebuild(self, reminders, now):
+        """Rebuilds the queue from an iterable of reminders."""
+        now = now.replace(second=0, microsecond=0)
+        self._heap = []
+        self._entries = {}
+        for reminder in map(as_record, reminders):
+            fire = self.next_fire_time(reminder, now)
+            if fire is not None:
+                entry = [fire, next(self._counter), reminder]
+                self._entries[reminder['id']] = entry
+                self._heap.append(entry)
+        heapq.heapify(self._heap)
+
+    def schedule(self, reminder, now):
+        """Adds or reschedules a single reminder."""
+        self.unschedule(reminder['id'])
+        self._push(as_record(reminder), now.replace(second=0, microsecond=0))
+
+    def unschedule(self, reminder_id):
+        """Drops a reminder from the queue if it is scheduled."""
+        entry = self._entries.pop(reminder_id, None)
+        if entry is not None:
+            entry[2] = None
+
+    def next_due(self):
+        """Returns the datetime of the earliest scheduled firing, or None."""
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Removes and returns (fire_time, reminder) for everything due at or before `now`.
+
+        Recurring reminders are pushed back with their following occurrence.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire, _, reminder = heapq.heappop(self._heap)
+            if reminder is None:
+                continue
+            del self._entries[reminder['id']]
+            due.append((fire, reminder))
+            if reminder.rule != ONCE:
+                self._push(reminder, fire + datetime.timedelta(minutes=1))
+        return due
+
+    def _push(self, reminder, after):
+        fire = self.next_fire_time(reminder, after)
+        if fire is None:
+            return
+        entry = [fire, next(self._counter), reminder]
+        self._entries[reminder['id']] = entry
+        heapq.heappush(self._heap, entry)
@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+
+def _haystack(reminder):
+    """Lower-cased searchable text of a reminder, one field per line."""
+    fields = [reminder.get('title', ''), reminder.get('desc', '')]
+    fields.extend(reminder.get('tags', []))
+    return "\n".join(fields).lower()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Trigram inverted index over the title, desc and tags of every reminder.
+
+    A query of three or more characters is answered by intersecting the posting
+    sets of its trigrams and checking the few remaining candidates for the full
+    substring. When a query extends the previous one (the usual case while
+    typing) only the previous results are filtered.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(set)  # trigram -> reminder ids
+        self._docs = {}  # reminder id -> (haystack, (date, reminder))
+        self._last_query = ""
+        self._last_ids = set()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def rebuild(self, reminders):
+        """Re-indexes a date -> reminders mapping from scratch."""
+        self._postings = defaultdict(set)
+        self._docs = {}
+        self._last_query = ""
+        self._last_ids = set()
+        for date, reminders_list in reminders.items():
+            for reminder in reminders_list:
+                self.add(date, reminder)
+
+    def add(self, date, reminder):
+        """Indexes a reminder, replacing any previous version with the same id."""
+        reminder_id = reminder['id']
+        self.remove(reminder_id)
+        haystack = _haystack(reminder)
+        self._docs[reminder_id] = (haystack, (date, reminder))
+        for trigram in _trigrams(haystack):
+            self._postings[trigram].add(reminder_id)
+        if self._last_query and self._last_query in haystack:
+            self._last_ids.add(reminder_id)
+
+    def remove(self, reminder_id):
+        """Drops a reminder from the index if it is indexed."""
+        doc = self._docs.pop(reminder_id, None)
+        if doc is None:
+            return
+        for trigram in _trigrams(doc[0]):
+            posting = self._postings.get(trigram)
+            if posting is not None:
+                posting.discard(reminder_id)
+                if not posting:
+                    del self._postings[trigram]
+        self._last_ids.discard(reminder_id)
+
+    def search(self, query):
+        """Returns (date, reminder) for every reminder whose text contains `query`."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        if self._last_query and self._last_query in query:
+            candidates = self._last_ids
+        elif len(query) >= 3:
+            postings = []
+            for trigram in _trigrams(query):
+                posting = self._postings.get(trigram)
+                if not posting:
+                    postings = []
+                    break
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set.intersection(*postings) if postings else set()
+        else:
+            candidates = self._docs.keys()
+
+        docs = self._docs
+        ids = {reminder_id for reminder_id in candidates if query in docs[reminder_id][0]}
+        self._last_query = query
+        self._last_ids = ids
+        return [docs[reminder_id][1] for reminder_id in ids]
@@ -0,0 +1,405 @@
+import datetime
+import json
+import os
+import zlib
+from collections import OrderedDict
+
+from .journal import write_snapshot
+from .occupancy import MonthOccupancy
+from .record import Reminder, _date_ordinal, as_record
+from .search_index import SearchIndex
+from .storage import JsonStorage, ReminderStorage, _is_rule
+from .tag_index import TagIndex
+
+# Shards kept in memory; a year of navigation either side of the current month
+MAX_LOADED_SHARDS = 24
+MAX_LOADED_BUCKETS = 64
+ID_BUCKETS = 256
+
+
+def _month(date):
+    """Returns the shard key of a date, "undated" for dates not in YYYY-MM-DD form."""
+    if len(date) == 10 and date[4] == "-" and date[:4].isdigit() and date[5:7].isdigit():
+        return date[:7]
+    return "undated"
+
+
+def _bucket(reminder_id):
+    return f"{zlib.crc32(str(reminder_id).encode('utf-8')) % ID_BUCKETS:02x}"
+
+
+def _months_between(start, end):
+    """Yields the YYYY-MM keys of the months overlapping [start, end)."""
+    year, month = int(start[:4]), int(start[5:7])
+    last = _month(end)
+    while True:
+        key = f"{year:04d}-{month:02d}"
+        if key > last or (key == last and end[8:10] == "01"):
+            return
+        yield key
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def _read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+class _Shard:
+    """The one-off reminders of one month."""
+
+    __slots__ = ('by_date', 'by_id', 'dirty')
+
+    def __init__(self, data):
+        self.by_date = {}
+        self.by_id = {}
+        self.dirty = False
+        for date, reminders_list in data.items():
+            for reminder in map(as_record, reminders_list):
+                self.add(date, reminder)
+
+    def add(self, date, reminder):
+        self.by_date.setdefault(date, []).append(reminder)
+        self.by_id[reminder.id] = (date, reminder)
+
+    def remove(self, reminder_id):
+        date, reminder = self.by_id.pop(reminder_id)
+        reminders_list = self.by_date[date]
+        reminders_list.remove(reminder)
+        if not reminders_list:
+            del self.by_date[date]
+        return reminder
+
+
+class ShardedStorage(ReminderStorage):
+    """Stores reminders in a directory with one file per month, loaded on demand.
+
+    One-off reminders live in months/YYYY-MM.json, laid out like reminders.json.
+    Recurring reminders can occur in any month, so they are kept together in
+    rules.json and always loaded. A manifest lists the months that have shards,
+    and ids/XX.json buckets map the id of every one-off reminder to its month, so
+    a reminder can be found by id without loading other months. The manifest
+    also counts the reminders carrying each tag, for the tag list shown at startup.
+
+    Month shards and id buckets are kept in LRU caches, so startup time and
+    resident memory do not grow with the years of history on disk. save() only
+    rewrites the files that changed. all() reads every shard; shards that are
+    not cached are read from disk and dropped again. The first search or tag
+    query does the same to build its index, which is then kept up to date, so
+    only stores that are searched pay for it.
+    """
+
+    def __init__(self, directory, migrate_from=None, max_shards=MAX_LOADED_SHARDS):
+        self.directory = directory
+        self.migrate_from = migrate_from
+        self.max_shards = max_shards
+        self.months = {}  # YYYY-MM -> number of reminders in the shard
+        self.rules = {}  # reminder id -> recurring reminder
+        self._shards = OrderedDict()  # YYYY-MM -> _Shard, least recently used first
+        self._buckets = OrderedDict()  # bucket -> {reminder id: YYYY-MM}
+        self._dirty_buckets = {}  # bucket -> mapping not yet written
+        self._rules_dirty = False
+        self._manifest_dirty = False
+        self.search_index = None  # built from every shard on the first search
+        self.tag_index = None  # built from every shard on the first tag query
+        self.tags = {}  # lower-cased tag -> [tag as shown, number of reminders], None until counted
+        self.occupancy = MonthOccupancy(self.between)
+
+    def _path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    def load(self):
+        self._shards.clear()
+        self._buckets.clear()
+        self._dirty_buckets = {}
+        self._rules_dirty = self._manifest_dirty = False
+        self.search_index = None
+        self.tag_index = None
+        self.occupancy.clear()
+        manifest = _read_json(self._path("manifest.json"), None)
+        if manifest is None:
+            self.months = {}
+            self.rules = {}
+            self.tags = {}
+            if self.migrate_from and (os.path.exists(self.migrate_from)
+                                      or os.path.exists(self.migrate_from + ".journal")):
+                count = self._migrate(self.migrate_from)
+                print(f"Migrated {count} reminders from {self.migrate_from} to {self.directory}")
+            return
+        self.months = manifest['months']
+        # Manifests written before tags were counted get their counts on first use
+        tags = manifest.get('tags')
+        self.tags = None if tags is None else {tag.lower(): [tag, count] for tag, count in tags.items()}
+        self.rules = {}
+        for reminder in map(as_record, _read_json(self._path("rules.json"), [])):
+            self.rules[reminder.id] = reminder
+
+    def _migrate(self, path):
+        source = JsonStorage(path)
+        source.load()
+        months = {}
+        buckets = {}
+        count = 0
+        for reminder in source.all():
+            count += 1
+            self._count_tags(reminder, 1)
+            if _is_rule(reminder):
+                self.rules[reminder.id] = reminder
+                continue
+            date = reminder['date']
+            month = _month(date)
+            months.setdefault(month, {}).setdefault(date, []).append(reminder)
+            buckets.setdefault(_bucket(reminder.id), {})[reminder.id] = month
+        # Every file is written once, rather than putting reminders one by one
+        os.makedirs(self._path("months"), exist_ok=True)
+        os.makedirs(self._path("ids"), exist_ok=True)
+        for month, by_date in months.items():
+            write_snapshot(self._path("months", month + ".json"), by_date)
+            self.months[month] = sum(len(reminders_list) for reminders_list in by_date.values())
+        for bucket, mapping in buckets.items():
+            write_snapshot(self._path("ids", bucket + ".json"), mapping)
+        source.close()
+        self._rules_dirty = self._manifest_dirty = True
+        self.save()
+        return count
+
+    def _shard(self, month, create=False):
+        shard = self._shards.get(month)
+        if shard is not None:
+            self._shards.move_to_end(month)
+            return shard
+        if month not in self.months and not create:
+            return None
+        shard = _Shard(_read_json(self._path("months", month + ".json"), {}))
+        self._shards[month] = shard
+        while len(self._shards) > self.max_shards:
+            old_month, old = self._shards.popitem(last=False)
+            if old.dirty:
+                self._write_shard(old_month, old)
+        return shard
+
+    def _shard_data(self, month):
+        """Returns a month's date -> reminders mapping without caching it."""
+        shard = self._shards.get(month)
+        if shard is not None:
+            return shard.by_date
+        return _Shard(_read_json(self._path("months", month + ".json"), {})).by_date
+
+    def _bucket_map(self, bucket):
+        mapping = self._dirty_buckets.get(bucket)
+        if mapping is None:
+            mapping = self._buckets.get(bucket)
+        if mapping is None:
+            mapping = _read_json(self._path("ids", bucket + ".json"), {})
+            self._buckets[bucket] = mapping
+            while len(self._buckets) > MAX_LOADED_BUCKETS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets[bucket] = mapping
+            self._buckets.move_to_end(bucket)
+        return mapping
+
+    def _month_of(self, reminder_id):
+        return self._bucket_map(_bucket(reminder_id)).get(reminder_id)
+
+    def _set_month(self, reminder_id, month):
+        bucket = _bucket(reminder_id)
+        mapping = self._bucket_map(bucket)
+        if month is None:
+            mapping.pop(reminder_id, None)
+        else:
+            mapping[reminder_id] = month
+        self._dirty_buckets[bucket] = mapping
+
+    def get(self, reminder_id):
+        reminder = self.rules.get(reminder_id)
+        if reminder is not None:
+            return reminder
+        month = self._month_of(reminder_id)
+        if month is None:
+            return None
+        shard = self._shard(month)
+        found = shard.by_id.get(reminder_id) if shard is not None else None
+        return found[1] if found else None
+
+    def on_date(self, date):
+        shard = self._shard(_month(date))
+        found = list(shard.by_date.get(date, [])) if shard is not None else []
+        ordinal = _date_ordinal(date)[0]
+        # Comparing ordinals first avoids formatting the date of every rule
+        found.extend(reminder for reminder in self.rules.values()
+                     if reminder.ordinal == ordinal and reminder['date'] == date)
+        return found
+
+    def between(self, start, end):
+        start_ordinal = datetime.date.fromisoformat(start).toordinal()
+        end_ordinal = datetime.date.fromisoformat(end).toordinal()
+        found = [reminder for reminder in self.rules.values()
+                 if 0 < reminder.ordinal < end_ordinal
+                 and (not reminder.end_ordinal or reminder.end_ordinal >= start_ordinal)]
+        for month in _months_between(start, end):
+            shard = self._shard(month)
+            if shard is not None:
+                for date, reminders_list in shard.by_date.items():
+                    if start <= date < end:
+                        found.extend(reminders_list)
+        return found
+
+    def search(self, query):
+        if not query.strip():
+            return []
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            for reminder in self.all():
+                self.search_index.add(reminder['date'], reminder)
+        return self.search_index.search(query)
+
+    def _tag_index(self):
+        if self.tag_index is None:
+            self.tag_index = TagIndex()
+            self.tag_index.rebuild(self.all())
+        return self.tag_index
+
+    def tagged(self, groups=(), exclude=()):
+        found = []
+        for reminder_id in self._tag_index().query(groups, exclude):
+            reminder = self.get(reminder_id)
+            if reminder is not None:
+                found.append((reminder['date'], reminder))
+        return found
+
+    def tag_counts(self, ids=None):
+        if ids is not None:
+            return self._tag_index().counts(ids)
+        if self.tags is None:
+            self.tags = {}
+            for reminder in self.all():
+                self._count_tags(reminder, 1)
+            self._manifest_dirty = True
+        return {tag: count for tag, count in self.tags.values()}
+
+    def _count_tags(self, reminder, step):
+        """Adds `step` to the count of every tag of a reminder, each tag counted once per reminder."""
+        if reminder is None or not reminder.tags or self.tags is None:
+            return
+        keys = {}
+        for tag in reminder.tags:
+            keys.setdefault(tag.lower(), tag)
+        for key, tag in keys.items():
+            entry = self.tags.get(key)
+            if entry is None:
+                if step > 0:
+                    self.tags[key] = [tag, step]
+                continue
+            entry[1] += step
+            if entry[1] <= 0:
+                del self.tags[key]
+        self._manifest_dirty = True
+
+    def all(self):
+        yield from list(self.rules.values())
+        for month in sorted(self.months):
+            for reminders_list in self._shard_data(month).values():
+                yield from reminders_list
+
+    def count(self):
+        return len(self.rules) + sum(self.months.values())
+
+    def snapshot(self):
+        # Reads the saved shards, so it is safe to consume from another thread
+        rules = list(self.rules.values())
+        months = sorted(self.months)
+        yield from rules
+        for month in months:
+            for reminders_list in _read_json(self._path("months", month + ".json"), {}).values():
+                yield from map(Reminder.from_dict, reminders_list)
+
+    def put(self, reminder):
+        reminder = as_record(reminder)
+        old = self._take(reminder.id)
+        self.occupancy.invalidate(old)
+        self.occupancy.invalidate(reminder)
+        self._count_tags(old, -1)
+        self._count_tags(reminder, 1)
+        if _is_rule(reminder):
+            self.rules[reminder.id] = reminder
+            self._rules_dirty = True
+        else:
+            date = reminder['date']
+            month = _month(date)
+            shard = self._shard(month, create=True)
+            shard.add(date, reminder)
+            shard.dirty = True
+            self.months[month] = self.months.get(month, 0) + 1
+            self._manifest_dirty = True
+            self._set_month(reminder.id, month)
+        if self.search_index is not None:
+            self.search_index.add(reminder['date'], reminder)
+        if self.tag_index is not None:
+            self.tag_index.add(reminder)
+        return reminder
+
+    def delete(self, reminder_id):
+        reminder = self._take(reminder_id)
+        self.occupancy.invalidate(reminder)
+        self._count_tags(reminder, -1)
+        if reminder is not None:
+            if self.search_index is not None:
+                self.search_index.remove(reminder_id)
+            if self.tag_index is not None:
+                self.tag_index.remove(reminder_id)
+        return reminder
+
+    def _take(self, reminder_id):
+        """Removes a reminder from wherever it is stored and returns it, or None."""
+        reminder = self.rules.pop(reminder_id, None)
+        if reminder is not None:
+            self._rules_dirty = True
+            return reminder
+        month = self._month_of(reminder_id)
+        if month is None:
+            return None
+        shard = self._shard(month)
+        if shard is None or reminder_id not in shard.by_id:
+            return None
+        reminder = shard.remove(reminder_id)
+        shard.dirty = True
+        self.months[month] -= 1
+        self._manifest_dirty = True
+        self._set_month(reminder_id, None)
+        return reminder
+
+    def _write_shard(self, month, shard):
+        path = self._path("months", month + ".json")
+        if shard.by_date:
+            os.makedirs(self._path("months"), exist_ok=True)
+            write_snapshot(path, shard.by_date)
+        elif os.path.exists(path):
+            os.remove(path)
+        shard.dirty = False
+
+    def save(self):
+        os.makedirs(self._path("months"), exist_ok=True)
+        os.makedirs(self._path("ids"), exist_ok=True)
+        for month, shard in self._shards.items():
+            if shard.dirty:
+                self._write_shard(month, shard)
+        for bucket, mapping in self._dirty_buckets.items():
+            write_snapshot(self._path("ids", bucket + ".json"), mapping)
+        self._dirty_buckets = {}
+        if self._rules_dirty:
+            write_snapshot(self._path("rules.json"), list(self.rules.values()))
+            self._rules_dirty = False
+        if self._manifest_dirty:
+            self.months = {month: count for month, count in self.months.items() if count > 0}
+            # The manifest goes last, so a crash never lists a month that was not written
+            manifest = {'version': 1, 'months': self.months}
+            if self.tags is not None:
+                manifest['tags'] = {tag: count for tag, count in self.tags.values()}
+            write_snapshot(self._path("manifest.json"), manifest)
+            self._manifest_dirty = False
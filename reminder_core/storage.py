@@ -0,0 +1,701 @@
+import datetime
+import itertools
+import os
+import sqlite3
+
+from .journal import ReminderJournal, read_snapshot, resolve_format, write_snapshot
+from .locking import FileLock, file_signature
+from .occupancy import MonthOccupancy
+from .record import Reminder, as_record
+from .recurrence import ONCE, RECURRENCES, merge_occurrences
+from .search_index import SearchIndex
+from .tag_index import TagIndex, parse_query
+
+
+class ReminderStorage:
+    """Interface every storage backend implements.
+
+    Dates are YYYY-MM-DD strings and ranges are half-open [start, end). Mutations
+    (put/delete) take effect immediately for queries; save() makes them durable.
+    Reminders can be passed in as dicts but always come back as Reminder records.
+    """
+
+    def load(self):
+        raise NotImplementedError
+
+    def get(self, reminder_id):
+        """Returns the reminder with this id, or None."""
+        raise NotImplementedError
+
+    def on_date(self, date):
+        """Returns the reminders stored under a date."""
+        raise NotImplementedError
+
+    def between(self, start, end):
+        """Returns the reminders that can occur in [start, end).
+
+        That is one-off reminders dated in the range plus every recurring reminder
+        that starts before `end` and has not ended before `start`.
+        """
+        raise NotImplementedError
+
+    def occurrences_between(self, start, end, limit=None):
+        """Yields (date, reminder) for the occurrences, one-off or recurring, in [start, end) by date and time.
+
+        Occurrences are generated as they are consumed (see merge_occurrences),
+        so the first `limit` of a long range cost little more than a short one.
+        """
+        occurrences = merge_occurrences(self.between(start, end), datetime.date.fromisoformat(start),
+                                        datetime.date.fromisoformat(end))
+        yield from itertools.islice(occurrences, limit)
+
+    def month_occupancy(self, year, month):
+        """Returns (mask, counts) describing which days of a month have occurrences.
+
+        Bit d - 1 of mask is set when day d has a one-off or recurring occurrence
+        and counts holds the number of occurrences per day. Backends keep the
+        result in self.occupancy and invalidate it as reminders change.
+        """
+        return self.occupancy.month(year, month)
+
+    def search(self, query):
+        """Returns (date, reminder) for reminders whose title, desc or tags contain `query`."""
+        raise NotImplementedError
+
+    def prepare_search(self):
+        """Builds whatever search() would otherwise build on the first query, such as an index."""
+
+    def tagged(self, groups=(), exclude=()):
+        """Returns (date, reminder) for reminders with a tag of every group in `groups` and none of `exclude`.
+
+        Each group is a tuple of alternative tags; tags compare case-insensitively.
+        """
+        raise NotImplementedError
+
+    def tag_counts(self, ids=None):
+        """Returns {tag: number of reminders carrying it}, only counting the reminders in the set `ids` if given."""
+        raise NotImplementedError
+
+    def find(self, query):
+        """Like search(), but tag:work, tag:work|home and -tag:done terms filter by tag (see parse_query)."""
+        text, groups, exclude = parse_query(query)
+        if not groups and not exclude:
+            return self.search(text)
+        found = self.tagged(groups, exclude)
+        if text:
+            matching = {reminder.id for _, reminder in self.search(text)}
+            found = [(date, reminder) for date, reminder in found if reminder.id in matching]
+        return found
+
+    def all(self):
+        """Iterates over every reminder."""
+        raise NotImplementedError
+
+    def count(self):
+        """Returns the number of reminders stored."""
+        raise NotImplementedError
+
+    def snapshot(self):
+        """Returns an iterator over every saved reminder that may be consumed from another thread."""
+        raise NotImplementedError
+
+    def put(self, reminder):
+        """Inserts a reminder or replaces the one with the same id, returning the stored record."""
+        raise NotImplementedError
+
+    def delete(self, reminder_id):
+        """Removes a reminder, returning it, or None if there was none."""
+        raise NotImplementedError
+
+    def put_new(self, reminders):
+        """Stores the reminders whose id is not in the store yet.
+
+        Returns (added, duplicates). Duplicates are detected across the whole
+        store, not just the reminder's date.
+        """
+        added = []
+        duplicates = []
+        for reminder in reminders:
+            if self.get(reminder['id']) is None:
+                added.append(self.put(reminder))
+            else:
+                duplicates.append(reminder)
+        return added, duplicates
+
+    def save(self):
+        raise NotImplementedError
+
+    def poll_changes(self):
+        """Merges in what other processes saved since the last call.
+
+        Returns the ids of the reminders that changed, or None when the backend
+        cannot tell which did and everything should be refreshed. Backends that
+        are not shared return an empty set.
+        """
+        return set()
+
+    def sync(self):
+        """Flushes any batched writes to disk."""
+
+    def close(self):
+        """Releases files and connections."""
+
+
+def _is_rule(reminder):
+    return reminder.rule != ONCE
+
+
+class JsonStorage(ReminderStorage):
+    """Keeps the whole store in memory and persists it to reminders.json.
+
+    With `use_journal` changes are appended to a write-ahead journal (see
+    ReminderJournal), otherwise every save rewrites the file. The file is JSON or
+    the binary format of binary.py, per `snapshot_format`. Reminders are held
+    as Reminder records, converted once on load. A primary-key index maps every
+    id to its (date, position) slot, so lookups, updates, moves between dates and
+    deletes never scan the lists.
+
+    Other processes may use the same file: loads and saves hold an advisory lock
+    on path + ".lock", save() first merges what the others saved, and
+    poll_changes() picks up their changes by reminder id. Changes not saved yet
+    win over the ones read from disk.
+    """
+
+    def __init__(self, path, use_journal=True, snapshot_format="auto"):
+        self.path = path
+        self.snapshot_format = snapshot_format
+        self.journal = ReminderJournal(path, snapshot_format=snapshot_format) if use_journal else None
+        self.lock = FileLock(path + ".lock")
+        self._signature = None  # file_signature() of the snapshot last read or written, without a journal
+        self._changed = set()  # ids changed by other processes, not yet returned by poll_changes()
+        self.reminders = {}  # date -> list of reminders
+        self._slots = {}  # reminder id -> (date, position in self.reminders[date])
+        self._rules = {}  # reminder id -> recurring reminder
+        self.search_index = None  # built by prepare_search() or the first search
+        self.tag_index = None  # built on the first tag query
+        self.occupancy = MonthOccupancy(self.between)
+        self._pending = {}  # reminder id -> reminder, or None once deleted
+
+    def load(self):
+        with self.lock:
+            self.reminders = self._read()
+        self._changed = set()
+        self._pending = {}
+        self._build_slots()
+        self.search_index = None
+        self.tag_index = None
+        self.occupancy.clear()
+
+    def _read(self):
+        """Returns the date -> reminders mapping on disk. Called with the lock held."""
+        try:
+            if self.journal is not None:
+                # Snapshot plus whatever the journal recorded since the last compaction
+                reminders = self.journal.load()
+                self.snapshot_format = self.journal.snapshot_format
+                return reminders
+            self.snapshot_format = resolve_format(self.path, self.snapshot_format)
+            self._signature = file_signature(self.path)
+            return read_snapshot(self.path)
+        except FileNotFoundError:
+            return {}
+
+    def _build_slots(self):
+        self._slots = {}
+        self._rules = {}
+        for date in list(self.reminders):
+            unique = []
+            for reminder in map(as_record, self.reminders[date]):
+                reminder_id = reminder.id
+                if reminder_id in self._slots:
+                    print(f"Skipping duplicate reminder with ID: {reminder_id}")
+                    continue
+                self._slots[reminder_id] = (date, len(unique))
+                unique.append(reminder)
+                if _is_rule(reminder):
+                    self._rules[reminder_id] = reminder
+            if unique:
+                self.reminders[date] = unique
+            else:
+                del self.reminders[date]
+
+    def get(self, reminder_id):
+        slot = self._slots.get(reminder_id)
+        if slot is None:
+            return None
+        date, position = slot
+        return self.reminders[date][position]
+
+    def on_date(self, date):
+        return list(self.reminders.get(date, []))
+
+    def between(self, start, end):
+        found = []
+        start_ordinal = datetime.date.fromisoformat(start).toordinal()
+        end_ordinal = datetime.date.fromisoformat(end).toordinal()
+        for reminder in self._rules.values():
+            if (0 < reminder.ordinal < end_ordinal
+                    and (not reminder.end_ordinal or reminder.end_ordinal >= start_ordinal)):
+                found.append(reminder)
+        for date in self._dates_between(start, end):
+            found.extend(reminder for reminder in self.reminders[date] if not _is_rule(reminder))
+        return found
+
+    def _dates_between(self, start, end):
+        """Returns the stored dates in [start, end), probing day by day when the range is short."""
+        try:
+            day = datetime.date.fromisoformat(start)
+            end_day = datetime.date.fromisoformat(end)
+        except ValueError:
+            day = end_day = None
+        if day is None or (end_day - day).days > len(self.reminders):
+            return [date for date in self.reminders if start <= date < end]
+        dates = []
+        while day < end_day:
+            date = day.isoformat()
+            if date in self.reminders:
+                dates.append(date)
+            day += datetime.timedelta(days=1)
+        return dates
+
+    def search(self, query):
+        return self._search_index().search(query)
+
+    def prepare_search(self):
+        self._search_index()
+
+    def _search_index(self):
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            self.search_index.rebuild(self.reminders)
+        return self.search_index
+
+    def _tag_index(self):
+        if self.tag_index is None:
+            self.tag_index = TagIndex()
+            self.tag_index.rebuild(self.all())
+        return self.tag_index
+
+    def tagged(self, groups=(), exclude=()):
+        found = []
+        for reminder_id in self._tag_index().query(groups, exclude):
+            date, position = self._slots[reminder_id]
+            found.append((date, self.reminders[date][position]))
+        return found
+
+    def tag_counts(self, ids=None):
+        return self._tag_index().counts(ids)
+
+    def all(self):
+        for reminders_list in self.reminders.values():
+            yield from reminders_list
+
+    def count(self):
+        return len(self._slots)
+
+    def snapshot(self):
+        # Reminder dicts are replaced rather than modified, so copying the references is enough
+        return iter(list(self.all()))
+
+    def put(self, reminder):
+        reminder = as_record(reminder)
+        reminder_id = reminder.id
+        date = reminder['date']
+        slot = self._slots.get(reminder_id)
+        if slot is not None:
+            self.occupancy.invalidate(self.reminders[slot[0]][slot[1]])
+        self.occupancy.invalidate(reminder)
+        if _is_rule(reminder):
+            self._rules[reminder_id] = reminder
+        else:
+            self._rules.pop(reminder_id, None)
+        if slot is not None and slot[0] == date:
+            self.reminders[date][slot[1]] = reminder
+        else:
+            if slot is not None:
+                self._remove(reminder_id)
+            reminders_list = self.reminders.setdefault(date, [])
+            self._slots[reminder_id] = (date, len(reminders_list))
+            reminders_list.append(reminder)
+        if self.search_index is not None:
+            self.search_index.add(date, reminder)
+        if self.tag_index is not None:
+            self.tag_index.add(reminder)
+        self._pending[reminder_id] = reminder
+        return reminder
+
+    def delete(self, reminder_id):
+        reminder = self._remove(reminder_id)
+        if reminder is not None:
+            self._rules.pop(reminder_id, None)
+            self.occupancy.invalidate(reminder)
+            if self.search_index is not None:
+                self.search_index.remove(reminder_id)
+            if self.tag_index is not None:
+                self.tag_index.remove(reminder_id)
+            self._pending[reminder_id] = None
+        return reminder
+
+    def _remove(self, reminder_id):
+        slot = self._slots.pop(reminder_id, None)
+        if slot is None:
+            return None
+        date, position = slot
+        reminders_list = self.reminders[date]
+        reminder = reminders_list[position]
+        # Move the last reminder of the date into the freed slot, so removal is O(1)
+        last = reminders_list.pop()
+        if last is not reminder:
+            reminders_list[position] = last
+            self._slots[last.id] = (date, position)
+        if not reminders_list:
+            del self.reminders[date]
+        return reminder
+
+    def save(self):
+        with self.lock:
+            # Whatever other processes saved in the meantime is kept, not overwritten
+            self._catch_up()
+            pending, self._pending = self._pending, {}
+            if self.journal is None:
+                write_snapshot(self.path, self.reminders, self.snapshot_format)
+                self._signature = file_signature(self.path)
+                return
+            if self.journal.record_count + len(pending) >= self.journal.compact_every:
+                # The batch would be compacted right away, so the snapshot is written alone
+                self.journal.compact(self.reminders)
+                return
+            self.journal.write_batch(pending)
+
+    def convert(self, snapshot_format):
+        """Rewrites the snapshot in `snapshot_format` ("json" or "binary"), folding in the journal."""
+        with self.lock:
+            self._catch_up()
+            self.snapshot_format = resolve_format(self.path, snapshot_format)
+            self._pending = {}
+            if self.journal is None:
+                write_snapshot(self.path, self.reminders, self.snapshot_format)
+                self._signature = file_signature(self.path)
+            else:
+                self.journal.snapshot_format = self.snapshot_format
+                self.journal.compact(self.reminders)
+
+    def poll_changes(self):
+        # Only stat() calls when nothing changed, which is nearly always
+        if self.journal is not None:
+            changed = self.journal.changed()
+        else:
+            changed = file_signature(self.path) != self._signature
+        if changed:
+            with self.lock:
+                self._catch_up()
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def _catch_up(self):
+        """Merges the changes other processes saved. Called with the lock held."""
+        records = self.journal.read_tail() if self.journal is not None else None
+        if records is None:
+            if self.journal is not None or file_signature(self.path) != self._signature:
+                self._merge_all(self._read())
+            return
+        for record in records:
+            op = record.get('op')
+            if op == 'put':
+                self._merge_put(as_record(record['reminder']))
+            elif op == 'del':
+                self._merge_delete(record.get('id'))
+
+    def _merge_all(self, reminders):
+        """Brings the store in line with a full date -> reminders mapping read from disk."""
+        seen = set()
+        for reminders_list in reminders.values():
+            for reminder in map(as_record, reminders_list):
+                seen.add(reminder.id)
+                if self.get(reminder.id) != reminder:
+                    self._merge_put(reminder)
+        for reminder_id in [reminder_id for reminder_id in self._slots if reminder_id not in seen]:
+            self._merge_delete(reminder_id)
+
+    def _merge_put(self, reminder):
+        if reminder.id in self._pending:
+            return
+        self.put(reminder)
+        del self._pending[reminder.id]
+        self._changed.add(reminder.id)
+
+    def _merge_delete(self, reminder_id):
+        if reminder_id in self._pending or self.delete(reminder_id) is None:
+            return
+        del self._pending[reminder_id]
+        self._changed.add(reminder_id)
+
+    def sync(self):
+        if self.journal is not None:
+            self.journal.sync()
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+
+def open_storage(backend="json", path="reminders.json", db_path="reminders.db", use_journal=True,
+                 shard_dir="reminders.d", snapshot_format="auto"):
+    """Creates the storage backend called `backend` ("json", "sqlite" or "sharded").
+
+    `snapshot_format` applies to the json backend, see JsonStorage.
+    """
+    if backend == "sqlite":
+        return SqliteStorage(db_path, migrate_from=path)
+    if backend == "sharded":
+        from .sharded import ShardedStorage  # sharded.py builds on this module
+        return ShardedStorage(shard_dir, migrate_from=path)
+    if backend == "json":
+        return JsonStorage(path, use_journal=use_journal, snapshot_format=snapshot_format)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    recurrence TEXT NOT NULL DEFAULT '',
+    end_date TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_date ON reminders (date, time);
+CREATE INDEX IF NOT EXISTS idx_reminders_rules ON reminders (recurrence, date);
+CREATE INDEX IF NOT EXISTS idx_reminders_end_date ON reminders (end_date);
+CREATE TABLE IF NOT EXISTS reminder_tags (
+    reminder_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (reminder_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_reminder_tags_tag ON reminder_tags (tag);
+CREATE INDEX IF NOT EXISTS idx_reminder_tags_tag_nocase ON reminder_tags (tag COLLATE NOCASE, reminder_id);
+"""
+
+# Tags are returned as one string joined with the ASCII unit separator
+_TAG_SEPARATOR = "\x1f"
+# Ids bound per statement, below SQLITE_MAX_VARIABLE_NUMBER of every SQLite version
+_MAX_PARAMS = 900
+
+_SELECT = """
+SELECT r.id, r.date, r.time, r.title, r.description, r.recurrence, r.end_date,
+       (SELECT group_concat(tag, char(31)) FROM
+            (SELECT tag FROM reminder_tags WHERE reminder_id = r.id ORDER BY position))
+FROM reminders AS r
+"""
+
+
+def _row_to_reminder(row):
+    return Reminder.from_dict({
+        'id': row[0],
+        'date': row[1],
+        'time': row[2],
+        'title': row[3],
+        'desc': row[4],
+        'recurrence': row[5],
+        'end_date': row[6],
+        'tags': row[7].split(_TAG_SEPARATOR) if row[7] else [],
+    })
+
+
+class SqliteStorage(ReminderStorage):
+    """Stores reminders in a SQLite database and answers every query from disk.
+
+    Nothing is cached in memory, so the resident size does not grow with the
+    number of reminders. Search uses an FTS5 trigram table when the SQLite build
+    provides one and falls back to LIKE otherwise.
+    """
+
+    def __init__(self, path, migrate_from=None):
+        self.path = path
+        self.migrate_from = migrate_from
+        self.conn = None
+        self.fts = False
+        self.occupancy = MonthOccupancy(self.between)
+        self._data_version = None
+
+    def load(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(_SCHEMA)
+            try:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS reminders_fts USING fts5(text, tokenize='trigram')")
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+        empty = self.conn.execute("SELECT 1 FROM reminders LIMIT 1").fetchone() is None
+        if empty and self.migrate_from and (os.path.exists(self.migrate_from)
+                                            or os.path.exists(self.migrate_from + ".journal")):
+            count = self.import_json(self.migrate_from)
+            print(f"Migrated {count} reminders from {self.migrate_from} to {self.path}")
+        self.occupancy.clear()
+        self._data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get(self, reminder_id):
+        row = self.conn.execute(_SELECT + "WHERE r.id = ?", (reminder_id,)).fetchone()
+        return _row_to_reminder(row) if row else None
+
+    def on_date(self, date):
+        rows = self.conn.execute(_SELECT + "WHERE r.date = ? ORDER BY r.time", (date,))
+        return [_row_to_reminder(row) for row in rows]
+
+    def between(self, start, end):
+        # LIKE is case-insensitive, so it finds every spelling of a compiled rule; anything
+        # else it matches is still expanded correctly, as a one-off
+        recurring = ("(r.recurrence IN (" + ", ".join("?" * len(RECURRENCES)) + ") "
+                     "OR r.recurrence LIKE 'FREQ=%' OR r.recurrence LIKE 'RRULE:%')")
+        rows = self.conn.execute(
+            _SELECT + "WHERE NOT " + recurring + " AND r.date >= ? AND r.date < ? "
+            "UNION ALL " +
+            _SELECT + "WHERE " + recurring + " AND r.date < ? "
+            "AND (r.end_date = '' OR r.end_date >= ?)",
+            (*RECURRENCES, start, end, *RECURRENCES, end, start))
+        return [_row_to_reminder(row) for row in rows]
+
+    def search(self, query):
+        query = query.strip()
+        if not query:
+            return []
+        if self.fts and len(query) >= 3:
+            # A quoted trigram phrase matches any substring, case-insensitively
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = self.conn.execute(
+                _SELECT + "WHERE r.rowid IN (SELECT rowid FROM reminders_fts WHERE reminders_fts MATCH ?)",
+                (phrase,))
+        else:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = self.conn.execute(
+                _SELECT + "WHERE r.title LIKE ?1 ESCAPE '\\' OR r.description LIKE ?1 ESCAPE '\\' "
+                "OR r.id IN (SELECT reminder_id FROM reminder_tags WHERE tag LIKE ?1 ESCAPE '\\')",
+                (pattern,))
+        return [(reminder['date'], reminder) for reminder in map(_row_to_reminder, rows)]
+
+    def tagged(self, groups=(), exclude=()):
+        def having(tags):
+            params.extend(tags)
+            return ("SELECT reminder_id FROM reminder_tags WHERE tag COLLATE NOCASE IN ("
+                    + ", ".join("?" * len(tags)) + ")")
+
+        params = []
+        # Compound selects over the tag index; nothing outside the matching ids is read
+        ids = " INTERSECT ".join(having(group) for group in groups) or "SELECT id FROM reminders"
+        if exclude:
+            ids += " EXCEPT " + having(exclude)
+        rows = self.conn.execute(_SELECT + "WHERE r.id IN (" + ids + ")", params)
+        return [(reminder['date'], reminder) for reminder in map(_row_to_reminder, rows)]
+
+    def tag_counts(self, ids=None):
+        if ids is None:
+            rows = self.conn.execute(
+                "SELECT tag, COUNT(DISTINCT reminder_id) FROM reminder_tags GROUP BY tag COLLATE NOCASE")
+            return dict(rows)
+        counts = {}  # lower-cased tag -> [tag as shown, count]
+        ids = list(ids)
+        for i in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[i:i + _MAX_PARAMS]
+            rows = self.conn.execute(
+                "SELECT tag, COUNT(DISTINCT reminder_id) FROM reminder_tags WHERE reminder_id IN ("
+                + ", ".join("?" * len(chunk)) + ") GROUP BY tag COLLATE NOCASE", chunk)
+            # Every id is in one chunk only, so the per-chunk counts add up
+            for tag, count in rows:
+                counts.setdefault(tag.lower(), [tag, 0])[1] += count
+        return {tag: count for tag, count in counts.values()}
+
+    def all(self):
+        for row in self.conn.execute(_SELECT + "ORDER BY r.date, r.time"):
+            yield _row_to_reminder(row)
+
+    def snapshot(self):
+        # Runs in the consuming thread, which needs its own connection
+        conn = sqlite3.connect(self.path)
+        try:
+            for row in conn.execute(_SELECT + "ORDER BY r.date, r.time"):
+                yield _row_to_reminder(row)
+        finally:
+            conn.close()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+
+    def put(self, reminder):
+        reminder = as_record(reminder)
+        reminder_id = reminder.id
+        if self.occupancy:
+            # The months the old version occurs in need redrawing too
+            self.occupancy.invalidate(self.get(reminder_id))
+            self.occupancy.invalidate(reminder)
+        self.conn.execute(
+            "INSERT INTO reminders (id, date, time, title, description, recurrence, end_date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET date = excluded.date, time = excluded.time, "
+            "title = excluded.title, description = excluded.description, "
+            "recurrence = excluded.recurrence, end_date = excluded.end_date",
+            (reminder_id, reminder.get('date', ''), reminder.get('time', ''), reminder.get('title', ''),
+             reminder.get('desc', ''), reminder.get('recurrence', ''), reminder.get('end_date', '')))
+        tags = reminder.get('tags', [])
+        self.conn.execute("DELETE FROM reminder_tags WHERE reminder_id = ?", (reminder_id,))
+        self.conn.executemany(
+            "INSERT INTO reminder_tags (reminder_id, position, tag) VALUES (?, ?, ?)",
+            [(reminder_id, i, tag) for i, tag in enumerate(tags)])
+        if self.fts:
+            rowid = self.conn.execute("SELECT rowid FROM reminders WHERE id = ?", (reminder_id,)).fetchone()[0]
+            text = "\n".join([reminder.get('title', ''), reminder.get('desc', '')] + list(tags))
+            self.conn.execute("DELETE FROM reminders_fts WHERE rowid = ?", (rowid,))
+            self.conn.execute("INSERT INTO reminders_fts (rowid, text) VALUES (?, ?)", (rowid, text))
+        return reminder
+
+    def delete(self, reminder_id):
+        reminder = self.get(reminder_id)
+        if reminder is None:
+            return None
+        if self.fts:
+            self.conn.execute(
+                "DELETE FROM reminders_fts WHERE rowid = (SELECT rowid FROM reminders WHERE id = ?)", (reminder_id,))
+        self.conn.execute("DELETE FROM reminder_tags WHERE reminder_id = ?", (reminder_id,))
+        self.conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+        self.occupancy.invalidate(reminder)
+        return reminder
+
+    def save(self):
+        self.conn.commit()
+
+    def poll_changes(self):
+        # data_version changes whenever another connection commits. Queries always
+        # read the database, so only the cached month occupancy goes stale
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return set()
+        self._data_version = version
+        self.occupancy.clear()
+        return None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def import_json(self, path):
+        """Copies every reminder of a reminders.json store into the database.
+
+        The store is read like JsonStorage reads it, so the snapshot may be in
+        either format and changes still only in its journal are copied too.
+        """
+        source = JsonStorage(path)
+        source.load()
+        count = 0
+        with self.conn:
+            for reminder in source.all():
+                self.put(reminder)
+                count += 1
+        source.close()
+        return count
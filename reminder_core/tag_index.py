@@ -0,0 +1,128 @@
+import re
+
+# tag:work, tag:work|home (either), -tag:done (not) and tag:"on call" for tags with spaces
+_TAG_TERM = re.compile(r'(?:^|(?<=\s))(-?)tag:(?:"([^"]*)"|(\S+))', re.IGNORECASE)
+_EMPTY = frozenset()
+
+
+def parse_query(query):
+    """Splits a search query into (text, groups, exclude).
+
+    `groups` lists one tuple of alternatives per tag: term, so
+    "tag:work tag:urgent|soon -tag:done call" means work AND (urgent OR soon)
+    AND NOT done, with "call" left as the text to search for.
+    """
+    groups = []
+    exclude = []
+    for negated, quoted, bare in _TAG_TERM.findall(query):
+        alternatives = tuple(tag.strip() for tag in (quoted if quoted else bare).split("|") if tag.strip())
+        if not alternatives:
+            continue
+        if negated:
+            exclude.extend(alternatives)
+        else:
+            groups.append(alternatives)
+    text = " ".join(_TAG_TERM.sub(" ", query).split())
+    return text, groups, exclude
+
+
+def format_query(text, groups, exclude):
+    """Returns the query parse_query() splits into these parts."""
+    def term(tags):
+        joined = "|".join(tags)
+        return f'tag:"{joined}"' if any(c.isspace() for c in joined) else f"tag:{joined}"
+
+    terms = [term(group) for group in groups]
+    terms.extend("-" + term((tag,)) for tag in exclude)
+    if text:
+        terms.append(text)
+    return " ".join(terms)
+
+
+class TagIndex:
+    """Tag -> reminder ids index, for tag queries and per-tag counts without a scan.
+
+    Tags match case-insensitively; counts are reported under the spelling that
+    was indexed first. Every reminder is known to the index, tagged or not, so
+    a query made only of exclusions still starts from the whole store.
+    """
+
+    def __init__(self):
+        self._postings = {}  # lower-cased tag -> reminder ids
+        self._names = {}  # lower-cased tag -> tag as shown
+        self._tags = {}  # reminder id -> lower-cased tags
+
+    def __len__(self):
+        return len(self._tags)
+
+    def rebuild(self, reminders):
+        """Re-indexes an iterable of Reminder records from scratch."""
+        self._postings = postings = {}
+        self._names = names = {}
+        self._tags = tags_of = {}
+        for reminder in reminders:
+            tags_of[reminder.id] = self._link(reminder.id, reminder.tags, postings, names)
+
+    @staticmethod
+    def _link(reminder_id, tags, postings, names):
+        """Adds an id to the postings of its tags and returns their keys."""
+        if not tags:
+            return ()
+        keys = []
+        for tag in tags:
+            key = tag.lower()
+            posting = postings.get(key)
+            if posting is None:
+                posting = postings[key] = set()
+                names[key] = tag
+            elif reminder_id in posting:
+                continue
+            posting.add(reminder_id)
+            keys.append(key)
+        return tuple(keys)
+
+    def add(self, reminder):
+        """Indexes a Reminder record, replacing any previous version with the same id."""
+        self.remove(reminder.id)
+        self._tags[reminder.id] = self._link(reminder.id, reminder.tags, self._postings, self._names)
+
+    def remove(self, reminder_id):
+        """Drops a reminder from the index if it is indexed."""
+        for key in self._tags.pop(reminder_id, ()):
+            posting = self._postings[key]
+            posting.discard(reminder_id)
+            if not posting:
+                del self._postings[key]
+                del self._names[key]
+
+    def counts(self, ids=None):
+        """Returns {tag: number of reminders carrying it}, only counting the reminders in the set `ids` if given."""
+        if ids is None:
+            return {self._names[key]: len(posting) for key, posting in self._postings.items()}
+        # Each intersection iterates over the smaller set, in C, rather than over every reminder's tags
+        counts = {}
+        for key, posting in self._postings.items():
+            count = len(posting & ids)
+            if count:
+                counts[self._names[key]] = count
+        return counts
+
+    def query(self, groups=(), exclude=()):
+        """Returns the set of ids carrying a tag of every group in `groups` and none of `exclude`."""
+        sets = []
+        for group in groups:
+            alternatives = [self._postings.get(tag.lower(), _EMPTY) for tag in group]
+            sets.append(alternatives[0] if len(alternatives) == 1 else set().union(*alternatives))
+        if sets:
+            # Intersecting from the smallest set keeps every step at most that size
+            sets.sort(key=len)
+            ids = set(sets[0])
+            for other in sets[1:]:
+                if not ids:
+                    break
+                ids &= other
+        else:
+            ids = set(self._tags)
+        for tag in exclude:
+            ids -= self._postings.get(tag.lower(), _EMPTY)
+        return ids
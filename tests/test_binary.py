@@ -0,0 +1,55 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+from reminder_core import binary, make_reminder
+from reminder_core.journal import read_snapshot, write_snapshot
+
+
+class BinarySnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        first = make_reminder("2025-03-01", "09:00", "One", tags=["work", "home"])
+        second = make_reminder("2025-01-01", "", "Two", recurrence="weekly")
+        # Keys out of date order, and one of them without reminders
+        self.reminders = {"2025-03-01": [first], "2025-02-01": [], "2025-01-01": [second]}
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def read(self, name):
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def test_json_to_binary_to_json_is_lossless(self):
+        write_snapshot(self.path("original.json"), self.reminders)
+        write_snapshot(self.path("converted.bin"), read_snapshot(self.path("original.json")), "binary")
+        write_snapshot(self.path("converted.json"), read_snapshot(self.path("converted.bin")), "json")
+        self.assertEqual(self.read("converted.json"), self.read("original.json"))
+
+    def test_decodes_date_keys_in_order(self):
+        decoded = binary.decode(binary.encode(self.reminders))
+        self.assertEqual(list(decoded), ["2025-03-01", "2025-02-01", "2025-01-01"])
+        self.assertEqual(decoded["2025-02-01"], [])
+        self.assertEqual(decoded["2025-03-01"][0]['tags'], ["work", "home"])
+
+    def test_rejects_a_truncated_dates_section(self):
+        data = binary.encode(self.reminders)
+        header = list(binary._HEADER.unpack_from(data))
+        body = data[binary._HEADER.size:-4]
+        header[7] = zlib.crc32(body)
+        with self.assertRaises(ValueError):
+            binary.decode(binary._HEADER.pack(*header) + body)
+
+    def test_rejects_newer_versions(self):
+        data = bytearray(binary.encode(self.reminders))
+        struct.pack_into("<H", data, 4, binary.VERSION + 1)
+        with self.assertRaises(ValueError):
+            binary.decode(bytes(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
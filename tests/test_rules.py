@@ -0,0 +1,130 @@
+import datetime
+import unittest
+
+from reminder_core.rules import Rule, compile_rule, normalize_rule, parse_rule
+
+try:
+    from dateutil import rrule
+except ImportError:  # python-dateutil is only needed to cross-check the rules
+    rrule = None
+
+# Rules whose occurrences dateutil computes the same way. Plain FREQ=MONTHLY is left out:
+# like the legacy "monthly" it clamps to the end of shorter months, where RFC 5545 skips them
+RULES = [
+    "FREQ=DAILY",
+    "FREQ=DAILY;INTERVAL=3",
+    "FREQ=DAILY;INTERVAL=4;BYDAY=MO,WE,FR",
+    "FREQ=WEEKLY",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,SU",
+    "FREQ=WEEKLY;INTERVAL=3;BYDAY=MO;COUNT=5",
+    "FREQ=MONTHLY;BYMONTHDAY=31",
+    "FREQ=MONTHLY;BYMONTHDAY=30,-1",
+    "FREQ=MONTHLY;BYMONTHDAY=-3;INTERVAL=2",
+    "FREQ=MONTHLY;BYMONTHDAY=29;INTERVAL=12",
+    "FREQ=MONTHLY;BYDAY=-1FR",
+    "FREQ=MONTHLY;BYDAY=2TU,-2TH",
+    "FREQ=MONTHLY;BYDAY=5MO",
+    "FREQ=MONTHLY;BYDAY=FR;BYMONTHDAY=13",
+    "FREQ=MONTHLY;BYDAY=SA,SU;INTERVAL=3",
+    "FREQ=DAILY;COUNT=10;EXDATE=2024-01-03,2024-01-05",
+    "FREQ=MONTHLY;BYMONTHDAY=1,15,-1;COUNT=12;EXDATE=2024-03-15,2024-04-30",
+    "FREQ=WEEKLY;BYDAY=MO,TH;COUNT=7;EXDATE=2024-01-01",
+    "FREQ=WEEKLY;BYDAY=WE;UNTIL=2024-06-30",
+    "FREQ=MONTHLY;BYDAY=-1FR;UNTIL=2025-02-28",
+    "FREQ=DAILY;INTERVAL=2;UNTIL=2024-02-10;EXDATE=2024-01-09",
+]
+STARTS = [datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), datetime.date(2024, 2, 29),
+          datetime.date(2023, 12, 27)]
+RANGE_START = datetime.date(2023, 12, 1)
+RANGE_END = datetime.date(2026, 3, 1)
+
+
+def _dateutil_rule(text, start):
+    """Returns the dateutil rruleset equivalent to a rule."""
+    parts = parse_rule(text)
+    kwargs = {'dtstart': datetime.datetime.combine(start, datetime.time()), 'interval': parts['interval'],
+              'wkst': rrule.MO, 'count': parts['count']}
+    if parts['until'] is not None:
+        kwargs['until'] = datetime.datetime.combine(parts['until'], datetime.time())
+    if parts['by_weekday']:
+        kwargs['byweekday'] = [rrule.weekday(weekday, ordinal or None) for ordinal, weekday in parts['by_weekday']]
+    if parts['by_month_day']:
+        kwargs['bymonthday'] = parts['by_month_day']
+    rules = rrule.rruleset()
+    rules.rrule(rrule.rrule(getattr(rrule, parts['freq']), **kwargs))
+    for day in parts['exdates']:
+        rules.exdate(datetime.datetime.combine(day, datetime.time()))
+    return rules
+
+
+@unittest.skipIf(rrule is None, "needs python-dateutil")
+class DateutilComparisonTest(unittest.TestCase):
+    def test_between_matches_dateutil(self):
+        for text in RULES:
+            for start in STARTS:
+                with self.subTest(rule=text, start=start):
+                    expected = [occurrence.date() for occurrence in _dateutil_rule(text, start).between(
+                        datetime.datetime.combine(RANGE_START, datetime.time()),
+                        datetime.datetime.combine(RANGE_END, datetime.time()), inc=True)
+                        if occurrence.date() < RANGE_END]
+                    self.assertEqual(list(compile_rule(text, start).between(RANGE_START, RANGE_END)), expected)
+
+    def test_next_ordinal_matches_dateutil(self):
+        for text in RULES:
+            for start in STARTS:
+                rule = compile_rule(text, start)
+                expected_rule = _dateutil_rule(text, start)
+                for day in range(RANGE_START.toordinal(), RANGE_END.toordinal(), 5):
+                    with self.subTest(rule=text, start=start, day=datetime.date.fromordinal(day)):
+                        expected = expected_rule.after(
+                            datetime.datetime.combine(datetime.date.fromordinal(day), datetime.time()), inc=True)
+                        self.assertEqual(rule.next_ordinal(day), expected.date().toordinal() if expected else None)
+
+
+class CountTest(unittest.TestCase):
+    def test_count_between_matches_between(self):
+        rules = RULES + ["daily", "weekly", "monthly", "FREQ=MONTHLY;INTERVAL=5"]
+        ranges = [(RANGE_START, RANGE_END), (datetime.date(2024, 2, 10), datetime.date(2024, 2, 11)),
+                  (datetime.date(2024, 3, 15), datetime.date(2024, 5, 1)),
+                  (datetime.date(2025, 1, 1), datetime.date(2025, 1, 1)),
+                  (datetime.date(2020, 1, 1), datetime.date(2024, 1, 2))]
+        for text in rules:
+            for start in STARTS:
+                rule = compile_rule(text, start)
+                for range_start, range_end in ranges:
+                    with self.subTest(rule=text, start=start, range=(range_start, range_end)):
+                        self.assertEqual(rule.count_between(range_start, range_end),
+                                         len(list(rule.between(range_start, range_end))))
+
+    def test_plain_monthly_clamps_to_short_months(self):
+        rule = compile_rule("monthly", datetime.date(2024, 1, 31))
+        self.assertEqual(list(rule.between(datetime.date(2024, 1, 1), datetime.date(2024, 5, 1))),
+                         [datetime.date(2024, 1, 31), datetime.date(2024, 2, 29), datetime.date(2024, 3, 31),
+                          datetime.date(2024, 4, 30)])
+
+    def test_rule_without_matching_days_never_occurs(self):
+        rule = Rule(datetime.date(2024, 1, 1), "MONTHLY", by_weekday=((1, 0),), by_month_day=(31,))
+        self.assertIsNone(rule.next_ordinal(datetime.date(2024, 1, 1).toordinal()))
+
+
+class ParseRuleTest(unittest.TestCase):
+    def test_rejects_bad_input(self):
+        for text in ["", "FREQ", "FREQ=", "FREQ=YEARLY", "INTERVAL=2", "FREQ=DAILY;FREQ=WEEKLY",
+                     "FREQ=DAILY;INTERVAL=0", "FREQ=DAILY;INTERVAL=two", "FREQ=DAILY;BYMONTHDAY=3",
+                     "FREQ=WEEKLY;BYDAY=2TU", "FREQ=MONTHLY;BYDAY=XX", "FREQ=MONTHLY;BYDAY=6MO",
+                     "FREQ=MONTHLY;BYDAY=0MO", "FREQ=MONTHLY;BYMONTHDAY=0", "FREQ=MONTHLY;BYMONTHDAY=32",
+                     "FREQ=MONTHLY;BYMONTHDAY=-32", "FREQ=DAILY;COUNT=0", "FREQ=DAILY;UNTIL=2024-02-30",
+                     "FREQ=DAILY;EXDATE=tomorrow", "FREQ=DAILY;BYSETPOS=1", None, 5]:
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    parse_rule(text)
+
+    def test_normalizes_spelling(self):
+        self.assertEqual(normalize_rule("RRULE:freq=monthly;byday=-1fr;until=20251231"),
+                         "FREQ=MONTHLY;BYDAY=-1FR;UNTIL=2025-12-31")
+        self.assertEqual(normalize_rule("FREQ=WEEKLY"), "weekly")
+        self.assertEqual(normalize_rule("daily"), "daily")
+
+
+if __name__ == "__main__":
+    unittest.main()
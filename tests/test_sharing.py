@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+from reminder_core import JsonStorage, make_reminder
+from reminder_core.locking import file_signature
+
+
+class SharedStoreTest(unittest.TestCase):
+    """Two JsonStorage objects on one path stand in for two processes sharing the store."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "reminders.json")
+        self.first = self.open()
+        self.second = self.open()
+
+    def open(self):
+        storage = JsonStorage(self.path)
+        storage.load()
+        self.addCleanup(storage.close)
+        return storage
+
+    def append_to_journal(self, data):
+        with open(self.path + ".journal", "ab") as f:
+            f.write(data)
+
+    def test_merges_puts_and_deletes(self):
+        kept = self.first.put(make_reminder("2025-05-01", "09:00", "Kept"))
+        gone = self.first.put(make_reminder("2025-05-02", "10:00", "Gone"))
+        self.first.save()
+        self.assertEqual(self.second.poll_changes(), {kept.id, gone.id})
+        self.assertEqual(self.second.get(kept.id), kept)
+
+        self.first.delete(gone.id)
+        self.first.put(dict(kept, title="Kept, renamed", date="2025-05-03"))
+        self.first.save()
+        self.assertEqual(self.second.poll_changes(), {kept.id, gone.id})
+        self.assertIsNone(self.second.get(gone.id))
+        self.assertEqual(self.second.get(kept.id)['title'], "Kept, renamed")
+        self.assertEqual([r.id for r in self.second.on_date("2025-05-03")], [kept.id])
+        self.assertEqual(self.second.on_date("2025-05-01"), [])
+        self.assertEqual(self.second.poll_changes(), set())
+
+    def test_unsaved_changes_win_over_merged_ones(self):
+        reminder = self.first.put(make_reminder("2025-05-01", "09:00", "Original"))
+        self.first.save()
+        self.second.poll_changes()
+
+        self.second.put(dict(reminder, title="Second"))
+        self.first.put(dict(reminder, title="First"))
+        self.first.save()
+        self.assertEqual(self.second.poll_changes(), set())
+        self.assertEqual(self.second.get(reminder.id)['title'], "Second")
+
+        self.second.save()
+        self.assertEqual(self.first.poll_changes(), {reminder.id})
+        self.assertEqual(self.first.get(reminder.id)['title'], "Second")
+
+    def test_reloads_after_another_process_compacts(self):
+        gone = self.first.put(make_reminder("2025-05-01", "09:00", "Gone"))
+        self.first.save()
+        self.second.poll_changes()
+
+        self.first.journal.compact_every = 1  # the next save compacts
+        self.first.delete(gone.id)
+        added = self.first.put(make_reminder("2025-05-02", "10:00", "Added"))
+        self.first.save()
+        self.assertEqual(self.first.journal.record_count, 0)
+        self.assertEqual(self.second.poll_changes(), {gone.id, added.id})
+        self.assertIsNone(self.second.get(gone.id))
+        self.assertEqual(self.second.get(added.id), added)
+
+        # Appends after the compaction are read incrementally again
+        self.first.journal.compact_every = 1000
+        later = self.first.put(make_reminder("2025-05-03", "11:00", "Later"))
+        self.first.save()
+        self.assertEqual(self.second.journal.read_tail(), [{'op': 'put', 'reminder': later.to_dict()}])
+
+    def test_read_tail_returns_none_on_a_new_generation(self):
+        self.first.put(make_reminder("2025-05-01", "09:00", "Before"))
+        self.first.save()
+        self.second.poll_changes()
+        self.first.journal.compact(self.first.reminders)
+        # Even if the snapshot looked unchanged, the journal header tells it was compacted
+        self.second.journal.snapshot_signature = file_signature(self.path)
+        self.assertIsNone(self.second.journal.read_tail())
+
+    def test_torn_final_line(self):
+        reminder = self.first.put(make_reminder("2025-05-01", "09:00", "Complete"))
+        self.first.save()
+        self.second.poll_changes()
+        size = os.path.getsize(self.path + ".journal")
+        torn = b'{"op":"del","id":"'
+
+        # A line still being written is left for the next read_tail()
+        self.append_to_journal(torn)
+        self.assertEqual(self.second.journal.read_tail(), [])
+        self.append_to_journal(reminder.id.encode("utf-8") + b'"}\n')
+        self.assertEqual(self.second.journal.read_tail(), [{'op': 'del', 'id': reminder.id}])
+
+        # After a crash load() cuts the torn line off, so new records start on a line of their own
+        self.append_to_journal(torn)
+        reopened = self.open()
+        self.assertIsNone(reopened.get(reminder.id))
+        self.assertEqual(os.path.getsize(self.path + ".journal"), size + len(torn) + len(reminder.id) + 3)
+        added = reopened.put(make_reminder("2025-05-02", "10:00", "After the crash"))
+        reopened.save()
+        self.assertEqual(self.open().get(added.id), added)
+
+
+if __name__ == "__main__":
+    unittest.main()
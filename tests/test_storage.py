@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from reminder_core import JsonStorage, SqliteStorage, make_reminder
+from reminder_core.journal import write_snapshot
+
+
+class SqliteMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "reminders.json")
+        self.db_path = os.path.join(self.directory.name, "reminders.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def migrate(self):
+        storage = SqliteStorage(self.db_path, migrate_from=self.path)
+        storage.load()
+        self.addCleanup(storage.close)
+        return storage
+
+    def test_migrates_changes_still_in_the_journal(self):
+        first = make_reminder("2025-03-01", "09:00", "Compacted")
+        second = make_reminder("2025-03-02", "10:00", "Also compacted", recurrence="weekly")
+        write_snapshot(self.path, {first['date']: [first], second['date']: [second]})
+        source = JsonStorage(self.path)
+        source.load()
+        third = source.put(make_reminder("2025-03-03", "11:00", "Journal only", tags=["work"]))
+        source.delete(first['id'])
+        source.save()
+        source.close()
+
+        storage = self.migrate()
+        self.assertEqual(storage.count(), 2)
+        self.assertIsNone(storage.get(first['id']))
+        self.assertEqual(storage.get(second['id'])['recurrence'], "weekly")
+        self.assertEqual(storage.get(third['id'])['tags'], ["work"])
+
+    def test_migrates_a_store_without_a_snapshot(self):
+        source = JsonStorage(self.path)
+        source.load()
+        reminder = source.put(make_reminder("2025-03-03", "11:00", "Never compacted"))
+        source.save()
+        source.close()
+        self.assertFalse(os.path.exists(self.path))
+
+        storage = self.migrate()
+        self.assertEqual(storage.get(reminder['id'])['title'], "Never compacted")
+
+
+if __name__ == "__main__":
+    unittest.main()